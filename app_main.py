@@ -4,37 +4,34 @@
 import os
 import sys
 import time
-import yaml # type: ignore
 import logging
 from datetime import datetime
 from typing import Dict, Any
-from damai.app_api import DamaiAppAPI
+from damai.profiling import startup_profiler, live_profiler_from_config
+from damai.memprof import memory_profiler_from_config
+
+# 启动分析（--profile-startup），需在导入其他依赖之前创建
+PROFILER = startup_profiler("app_main")
+
+with PROFILER.phase("import"):
+    from damai.config import load_config as load_config_file
+    from damai import log
+    from damai.app_api import DamaiAppAPI
 
 def setup_logging(config: Dict[str, Any]) -> None:
     """设置日志配置"""
     log_config = config.get("logging", {})
     log_level = getattr(logging, log_config.get("level", "INFO"))
-    log_file = log_config.get("file", "damai_app.log")
-    
-    # 创建日志目录
-    log_dir = os.path.dirname(log_file)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # 仅保留必要的日志处理器，避免重复日志
-    handlers = [
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
     
-    # 简洁的日志格式
-    log_format = '%(asctime)s - %(levelname)s - %(message)s'
-    
-    # 配置根日志
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=handlers
+    # 异步写入按大小轮转的日志文件
+    log.setup_logging(
+        log_level,
+        log_file=log_config.get("file", "damai_app.log"),
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        max_bytes=log_config.get("max_bytes", 10 * 1024 * 1024),
+        backup_count=log_config.get("backup_count", 5),
+        queue_size=log_config.get("queue_size", 10000),
+        stream=sys.stdout
     )
 
 def load_config(config_file: str = "config_mobile.yaml") -> Dict[str, Any]:
@@ -44,8 +41,7 @@ def load_config(config_file: str = "config_mobile.yaml") -> Dict[str, Any]:
             print(f"配置文件 {config_file} 不存在，请创建配置文件")
             sys.exit(1)
             
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_config_file(config_file)
             
         # 验证必要的配置项
         if not config.get("account", {}).get("username") or not config.get("account", {}).get("password"):
@@ -109,10 +105,18 @@ def main():
     print("大麦APP抢票程序启动...")
     
     # 加载配置
-    config = load_config()
+    with PROFILER.phase("config"):
+        config = load_config()
     
     # 设置日志
-    setup_logging(config)
+    with PROFILER.phase("logging"):
+        setup_logging(config)
+    
+    # 运行期采样分析（如果配置），可通过SIGUSR2或控制文件开关
+    live_profiler = live_profiler_from_config(config)
+    
+    # 内存分析（如果配置），可通过SIGUSR1或触发文件写出报告
+    memory_profiler = memory_profiler_from_config(config)
     logger = logging.getLogger("damai.main")
     
     try:
@@ -122,15 +126,19 @@ def main():
             return
         
         # 初始化API
-        api = DamaiAppAPI(config)
+        with PROFILER.phase("driver"):
+            api = DamaiAppAPI(config)
         logger.info("初始化APP自动化成功")
         
         # 检查登录状态
-        if not api.login_if_needed():
+        with PROFILER.phase("login"):
+            logged_in = api.login_if_needed()
+        if not logged_in:
             logger.error("登录失败，程序退出")
             return
         
         logger.info("登录成功，开始抢票")
+        PROFILER.finish()
         
         # 获取目标演出ID
         show_id = config["target"]["show_id"]
@@ -178,6 +186,13 @@ def main():
         logger.error(f"程序运行时发生错误: {str(e)}")
     
     finally:
+        PROFILER.finish()
+        if live_profiler:
+            live_profiler.stop()
+        if memory_profiler:
+            memory_profiler.write_report()
+            memory_profiler.stop()
+        
         # 清理资源
         try:
             if 'api' in locals():
@@ -125,24 +125,13 @@ def check_config():
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
         
-        # 检查必要的配置项
-        required_keys = [
-            ("account", "username"),
-            ("account", "password"),
-            ("target", "show_id"),
-            ("target", "start_time"),
-            ("buyer", 0, "name")
-        ]
-        
-        for keys in required_keys:
-            if len(keys) == 2:
-                if keys[0] not in config or keys[1] not in config[keys[0]]:
-                    print(f"✗ 配置文件缺少必要项: {keys[0]}.{keys[1]}")
-                    return False
-            elif len(keys) == 3:
-                if keys[0] not in config or len(config[keys[0]]) <= keys[1] or keys[2] not in config[keys[0]][keys[1]]:
-                    print(f"✗ 配置文件缺少必要项: {keys[0]}[{keys[1]}].{keys[2]}")
-                    return False
+        # 按配置声明检查，列出全部错误
+        from damai.schema import validate_app_config
+        errors = validate_app_config.errors(config)
+        for error in errors:
+            print(f"✗ 配置文件错误: {error}")
+        if errors:
+            return False
         
         print("✓ 配置文件有效")
         return True
@@ -5,4 +5,28 @@
 """
 
 __version__ = '1.1.0'
-__author__ = 'DamaiTicket'
\ No newline at end of file
+__author__ = 'DamaiTicket'
+
+# 常用类按需导入，import damai 时不加载 selenium/Appium 等依赖
+_LAZY_ATTRS = {
+    "DamaiAPI": "damai.api",
+    "DamaiMobileAPI": "damai.mobile_api",
+    "DamaiAppAPI": "damai.app_api",
+    "Browser": "damai.browser",
+    "TicketMonitor": "damai.monitor",
+    "OrderProcessor": "damai.order",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'damai' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
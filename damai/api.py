@@ -6,29 +6,69 @@ import random
 import logging
 import requests # type: ignore
 from typing import Dict, Any, Optional
-from selenium import webdriver # type: ignore           
-from selenium.webdriver.chrome.options import Options # type: ignore    
-from selenium.webdriver.chrome.service import Service # type: ignore
-from selenium.webdriver.common.by import By # type: ignore
-from selenium.webdriver.support.ui import WebDriverWait # type: ignore
-from selenium.webdriver.support import expected_conditions as EC # type: ignore
-from webdriver_manager.chrome import ChromeDriverManager # type: ignore
+
+from . import budget, metrics
+from .lazy import lazy_import
+from .cache import TTLCache
+from .circuit import CircuitOpenError, breakers_from_config
+from .sku_index import SkuIndex, normalize_web_price
+from .settings import Settings, as_settings
+
+# selenium 和 webdriver_manager 导入较慢，推迟到首次使用浏览器时再导入
+webdriver = lazy_import("selenium.webdriver")
+Options = lazy_import("selenium.webdriver.chrome.options", "Options")
+Service = lazy_import("selenium.webdriver.chrome.service", "Service")
+By = lazy_import("selenium.webdriver.common.by", "By")
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
+ChromeDriverManager = lazy_import("webdriver_manager.chrome", "ChromeDriverManager")
+
+PAGE_LOAD_SECONDS = metrics.histogram("damai_page_load_seconds", "浏览器页面加载耗时", ("page",))
 
 class DamaiAPI:
     """大麦网API请求类,负责处理与大麦网的所有网络交互"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Any):
         """初始化API请求类
         
         Args:
-            config: 配置信息，包含账号、浏览器设置等
+            config: Settings 或配置信息，包含账号、浏览器设置等，未校验时在这里校验
+            
+        Raises:
+            ConfigError: 配置校验失败
         """
-        self.config = config
         self.logger = logging.getLogger("damai.api")
         self.session = requests.Session()
         self.browser = None
         self.cookies = {}
+        self.sku_indexes: Dict[str, SkuIndex] = {}
+        self.apply_settings(as_settings(config))
+        config = self.config
+        
+        # 进程内缓存，减少重复搜索和重复加载详情页
+        cache_config = config.get("cache", {})
+        self.search_cache = TTLCache(
+            maxsize=cache_config.get("search_size", 32),
+            ttl=cache_config.get("search_ttl", 300),
+            name="search"
+        )
+        self.detail_ttl_cache = TTLCache(
+            maxsize=cache_config.get("detail_size", 64),
+            ttl=cache_config.get("detail_ttl", 10),
+            name="detail"
+        )
+        # 进程内共享的请求预算，已由入口或其他API类配置时沿用；代理连接测试也受预算限制
+        budget.configure_budget(config, replace=False)
+        
         self._setup_session()
+        
+        # 按接口类别熔断，网站故障时跳过注定超时的页面加载，半开时先发HEAD探测
+        self.breakers = breakers_from_config(config, probe=self._probe_endpoint)
+        
+        # 导出请求和缓存指标
+        metrics.instrument_session(self.session)
+        metrics.register_cache("search", self.search_cache.stats)
+        metrics.register_cache("detail", self.detail_ttl_cache.stats)
     
     def _setup_session(self):
         """设置请求会话，包括请求头、代理等"""
@@ -69,6 +109,7 @@ class DamaiAPI:
                 # 测试代理连接
                 test_url = "https://www.damai.cn/"
                 timeout = proxy_config.get("timeout", 10)
+                budget.acquire("probe")
                 self.session.get(test_url, timeout=timeout)
                 
                 self.logger.info(f"代理设置成功: {proxy_url}")
@@ -114,6 +155,12 @@ class DamaiAPI:
     
     def close_browser(self):
         """关闭浏览器"""
+        for cache in (self.search_cache, self.detail_ttl_cache):
+            stats = cache.stats()
+            self.logger.info(
+                f"缓存[{stats['name']}]: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次 "
+                f"({stats['hit_rate']:.1%})"
+            )
         if self.browser:
             self.browser.quit()
             self.browser = None
@@ -131,6 +178,7 @@ class DamaiAPI:
         try:
             # 访问登录页面
             if self.browser:
+                budget.acquire("login")
                 self.browser.get("https://passport.damai.cn/login")
             self.logger.info("正在访问登录页面")
             
@@ -219,11 +267,12 @@ class DamaiAPI:
         
         self.logger.debug(f"已更新 {len(browser_cookies)} 个cookies")
     
-    def search_shows(self, keyword: str | None = None) -> Dict[str, Any]:
+    def search_shows(self, keyword: str | None = None, use_cache: bool = True) -> Dict[str, Any]:
         """搜索演出信息
         
         Args:
             keyword: 搜索关键词，默认使用配置中的关键词
+            use_cache: 是否使用进程内缓存，False时强制重新搜索
             
         Returns:
             Dict: 搜索结果
@@ -231,29 +280,38 @@ class DamaiAPI:
         if not keyword:
             keyword = self.config["target"]["keyword"]
         
+        if use_cache:
+            cached = self.search_cache.get(keyword)
+            if cached is not None:
+                return cached
+        
         # 使用浏览器访问搜索页面获取加密参数
         if not self.browser:
             self.init_browser()
         
         search_url = f"https://search.damai.cn/search.html?keyword={keyword}"
-        self.browser.get(search_url)
         
         # 带重试的搜索结果等待（修正版）
         from selenium.common.exceptions import TimeoutException # type: ignore  
         
-        retry_count = 0
-        while retry_count < 3:
-            try:
-                WebDriverWait(self.browser, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "search__itemlist"))
-                )
-                break
-            except TimeoutException:
-                retry_count += 1
-                if retry_count >= 3:
-                    raise
-                self.logger.info(f"搜索列表加载超时，重新加载页面(第{retry_count}次重试)")
-                self.browser.refresh()
+        with self.breakers["search"].guard(search_url):
+            budget.acquire("search")
+            with PAGE_LOAD_SECONDS.labels("search").time():
+                self.browser.get(search_url)
+                retry_count = 0
+                while retry_count < 3:
+                    try:
+                        WebDriverWait(self.browser, 10).until(
+                            EC.presence_of_element_located((By.CLASS_NAME, "search__itemlist"))
+                        )
+                        break
+                    except TimeoutException:
+                        retry_count += 1
+                        if retry_count >= 3:
+                            raise
+                        self.logger.info(f"搜索列表加载超时，重新加载页面(第{retry_count}次重试)")
+                        budget.acquire("search")
+                        self.browser.refresh()
         
         # 提取搜索结果
         show_elements = self.browser.find_elements(By.CLASS_NAME, "search__item")
@@ -278,28 +336,54 @@ class DamaiAPI:
                 self.logger.warning(f"提取演出信息失败: {str(e)}")
         
         self.logger.info(f"搜索到 {len(results)} 个演出")
-        return {"keyword": keyword, "results": results}
+        search_result = {"keyword": keyword, "results": results}
+        # 空结果不缓存，便于下次循环立即重新搜索
+        if results:
+            self.search_cache.set(keyword, search_result)
+        return search_result
     
-    def get_show_detail(self, show_url: str) -> Dict[str, Any]:
+    def get_show_detail(self, show_url: str, use_cache: bool = True) -> Dict[str, Any]:
         """获取演出详情
         
         Args:
             show_url: 演出详情页URL
+            use_cache: 是否使用进程内缓存，False时强制重新获取
             
         Returns:
             Dict: 演出详情信息
         """
+        if use_cache:
+            cached = self.detail_ttl_cache.get(show_url)
+            if cached is not None:
+                return cached
+        
         if not self.browser:
             self.init_browser()
         
-        self.browser.get(show_url)
+        with self.breakers["detail"].guard(show_url):
+            budget.acquire("detail")
+            with PAGE_LOAD_SECONDS.labels("detail").time():
+                self.browser.get(show_url)
+                
+                # 等待详情页加载
+                WebDriverWait(self.browser, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
+                )
         
-        # 等待详情页加载
-        WebDriverWait(self.browser, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
-        )
+        detail = self._extract_show_detail(show_url)
+        if "error" not in detail:
+            self.detail_ttl_cache.set(show_url, detail)
+        return detail
+    
+    def _extract_show_detail(self, show_url: str) -> Dict[str, Any]:
+        """从浏览器当前已加载的详情页提取演出详情
         
-        # 提取演出详情
+        Args:
+            show_url: 演出详情页URL
+            
+        Returns:
+            Dict: 演出详情信息，失败时包含error字段
+        """
         try:
             title = self.browser.find_element(By.CLASS_NAME, "perform__title").text
             price_elements = self.browser.find_elements(By.CLASS_NAME, "perform__price__item")
@@ -323,6 +407,9 @@ class DamaiAPI:
                 "url": show_url
             }
             
+            # 每次获取详情时刷新票档索引，供监控和下单共用
+            self._update_sku_index(show_url, [normalize_web_price(p) for p in prices])
+            
             self.logger.info(f"获取演出详情成功: {title}")
             return detail
             
@@ -331,6 +418,100 @@ class DamaiAPI:
             self.logger.debug("异常详细信息:", exc_info=True)
             return {"error": str(e)}
     
+    def _probe_endpoint(self, url: Optional[str]) -> bool:
+        """熔断器半开时的轻量探测，用HEAD请求代替完整的页面加载
+        
+        Args:
+            url: 即将访问的页面URL
+            
+        Returns:
+            bool: 服务是否恢复
+        """
+        if not url:
+            return True
+        budget.acquire("probe")
+        response = self.session.head(url, timeout=5, allow_redirects=True)
+        self.logger.info(f"熔断探测 {url}: HTTP {response.status_code}")
+        return response.status_code < 500
+    
+    def apply_settings(self, settings: Settings):
+        """应用设置，初始化和配置热更新时调用
+        
+        每轮监控都会用到的设置在这里取出一次；票档偏好变化时已有的
+        票档索引按新偏好重建。
+        
+        Args:
+            settings: 已校验的设置
+        """
+        self.settings = settings
+        self.config = settings.config
+        self.sku_preference = settings.preference
+        self.delay_range = settings.risk.delay_range
+        for index in self.sku_indexes.values():
+            index.set_preference(settings.preference)
+    
+    def _update_sku_index(self, show_url: str, entries):
+        """构建或原地刷新演出的票档索引
+        
+        Args:
+            show_url: 演出详情页URL
+            entries: 票档条目列表
+        """
+        index = self.sku_indexes.get(show_url)
+        if index is None:
+            index = SkuIndex(self.sku_preference)
+            for entry in entries:
+                index.add(entry)
+            self.sku_indexes[show_url] = index
+        else:
+            index.refresh(entries)
+    
+    def invalidate_show(self, show_url: str):
+        """使演出详情缓存失效，票务状态变化时调用
+        
+        Args:
+            show_url: 演出详情页URL
+        """
+        self.detail_ttl_cache.invalidate(show_url)
+    
+    def prime_show_detail(self, show_url: str) -> Dict[str, Any]:
+        """从浏览器当前已加载的详情页提取详情并写入缓存
+        
+        在 check_ticket_status 之后调用，下单流程可直接复用，无需重新加载页面。
+        
+        Args:
+            show_url: 演出详情页URL
+            
+        Returns:
+            Dict: 演出详情信息
+        """
+        detail = self._extract_show_detail(show_url)
+        if "error" not in detail:
+            self.detail_ttl_cache.set(show_url, detail)
+        return detail
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各级缓存的统计信息
+        
+        Returns:
+            Dict: 搜索缓存和详情缓存的统计
+        """
+        return {
+            "search": self.search_cache.stats(),
+            "detail": self.detail_ttl_cache.stats()
+        }
+    
+    def sku_index(self, show_url: str) -> Optional[SkuIndex]:
+        """获取演出的票档索引
+        
+        Args:
+            show_url: 演出详情页URL
+            
+        Returns:
+            SkuIndex: 票档索引，尚未获取过详情时返回None
+        """
+        return self.sku_indexes.get(show_url)
+    
     def check_ticket_status(self, show_url: str) -> Dict[str, Any]:
         """检查票务状态
         
@@ -343,12 +524,16 @@ class DamaiAPI:
         if not self.browser:
             self.init_browser()
         
-        self.browser.get(show_url)
-        
-        # 等待详情页加载
-        WebDriverWait(self.browser, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
-        )
+        # 与详情页共用熔断器，熔断期间直接抛出 CircuitOpenError
+        with self.breakers["detail"].guard(show_url):
+            budget.acquire("status")
+            with PAGE_LOAD_SECONDS.labels("status").time():
+                self.browser.get(show_url)
+                
+                # 等待详情页加载
+                WebDriverWait(self.browser, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
+                )
         
         # 检查是否有可购买的票
         buy_btn = self.browser.find_element(By.CLASS_NAME, "buybtn")
@@ -381,15 +566,18 @@ class DamaiAPI:
             self.init_browser()
         
         try:
-            # 访问演出详情页
-            self.browser.get(show_url)
-            self.logger.info("正在加载演出详情页")
-            
-            # 等待页面加载
+            # 访问演出详情页并等待加载
             try:
-                WebDriverWait(self.browser, 15).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
-                )
+                with self.breakers["order"].guard(show_url):
+                    budget.acquire("order")
+                    self.browser.get(show_url)
+                    self.logger.info("正在加载演出详情页")
+                    WebDriverWait(self.browser, 15).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "perform__order__select"))
+                    )
+            except CircuitOpenError as e:
+                self.logger.warning(str(e))
+                return {"success": False, "message": str(e)}
             except Exception as e:
                 self.logger.error("演出详情页加载失败")
                 return {"success": False, "message": "页面加载失败"}
@@ -467,7 +655,7 @@ class DamaiAPI:
                 submit_btn = self.browser.find_element(By.CLASS_NAME, "submit-wrapper")
                 
                 # 根据配置决定是否自动提交
-                if self.config["strategy"]["auto_submit"]:
+                if self.settings.strategy.auto_submit:
                     submit_btn.click()
                     
                     # 等待跳转到支付页面
@@ -600,7 +788,6 @@ class DamaiAPI:
     
     def add_random_delay(self):
         """添加随机延迟，避免被识别为机器人"""
-        delay_config = self.config["risk_control"]["request_delay"]
-        delay_time = random.uniform(delay_config["min"], delay_config["max"])
+        delay_time = random.uniform(*self.delay_range)
         time.sleep(delay_time)
         return delay_time
\ No newline at end of file
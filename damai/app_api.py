@@ -7,9 +7,14 @@ import time
 import random
 import logging
 from typing import Dict, Any, Optional, List
-from appium import webdriver # type: ignore
-from appium.webdriver.common.mobileby import MobileBy # type: ignore
-from appium.webdriver.common.touch_action import TouchAction # type: ignore
+
+from . import budget
+from .lazy import lazy_import
+from .appium_session import AppiumSession
+
+# Appium 导入较慢，推迟到建立会话时再导入
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+TouchAction = lazy_import("appium.webdriver.common.touch_action", "TouchAction")
 
 class DamaiAppAPI:
     """大麦APP自动化API类"""
@@ -26,6 +31,8 @@ class DamaiAppAPI:
         self.password = config["account"]["password"]
         self.buyers = config["buyer"]
         self.driver = None
+        self.appium_session: Optional[AppiumSession] = None
+        budget.configure_budget(config, replace=False)
         self._setup_appium()
     
     def _setup_appium(self):
@@ -45,11 +52,9 @@ class DamaiAppAPI:
                 "resetKeyboard": True
             }
             
-            # 连接Appium服务器
-            self.driver = webdriver.Remote(
-                f"http://localhost:{appium_config.get('port', 4723)}/wd/hub",
-                desired_caps
-            )
+            # 连接Appium服务器，优先复用已有会话
+            self.appium_session = AppiumSession("app", appium_config, desired_caps)
+            self.driver = self.appium_session.connect()
             
             self.driver.implicitly_wait(10)
             self.logger.info("Appium初始化成功")
@@ -72,6 +77,7 @@ class DamaiAppAPI:
                 return True
             
             self.logger.info("未登录，开始登录流程")
+            budget.acquire("login")
             
             # 点击"我的"tab
             self.driver.find_element(MobileBy.ANDROID_UIAUTOMATOR,
@@ -138,6 +144,7 @@ class DamaiAppAPI:
             bool: 是否成功跳转
         """
         self.logger.info(f"跳转到演出 {show_id} 详情页")
+        budget.acquire("detail")
         try:
             # 回到首页
             self.driver.find_element(MobileBy.ANDROID_UIAUTOMATOR,
@@ -176,6 +183,7 @@ class DamaiAppAPI:
             bool: 是否抢票成功
         """
         self.logger.info("尝试购票")
+        budget.acquire("order")
         try:
             # 检查是否有"立即购买"按钮
             buy_btns = self.driver.find_elements(MobileBy.ANDROID_UIAUTOMATOR,
@@ -263,7 +271,8 @@ class DamaiAppAPI:
     
     def close(self):
         """关闭驱动"""
-        if self.driver:
-            self.driver.quit()
+        if self.appium_session:
+            self.appium_session.close()
+            self.appium_session = None
             self.driver = None
             self.logger.info("已关闭APP驱动") 
\ No newline at end of file
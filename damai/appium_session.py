@@ -0,0 +1,246 @@
+# 大麦网Appium会话管理模块
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from . import codec, metrics
+from .lazy import lazy_import
+
+appium_webdriver = lazy_import("appium.webdriver")
+
+CONNECT_SECONDS = metrics.histogram(
+    "damai_appium_connect_seconds", "Appium会话建立耗时", ("mode",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+
+DEFAULT_STATE_FILE = ".appium_session.json"
+
+# 设备已装好UiAutomator2服务端并完成初始化后，可以跳过的启动步骤
+WARM_CAPABILITIES = {
+    "skipServerInstallation": True,
+    "skipDeviceInitialization": True,
+}
+
+
+def _attach_remote(server: str, session_id: str, capabilities: Dict[str, Any]):
+    """连接到Appium服务器上已有的会话，不创建新会话
+
+    Args:
+        server: Appium服务器地址
+        session_id: 会话ID
+        capabilities: 创建该会话时使用的能力
+
+    Returns:
+        WebDriver: 绑定到已有会话的驱动
+    """
+    class AttachedRemote(appium_webdriver.Remote):
+        def start_session(self, *args, **kwargs):
+            # 跳过 POST /session，直接使用已有的会话ID
+            self.session_id = session_id
+            self.caps = dict(capabilities)
+
+    return AttachedRemote(server, dict(capabilities))
+
+
+class AppiumSession:
+    """Appium会话管理
+
+    建立会话时依次尝试：配置中指定的会话ID、上次保留的会话、新建会话。
+    启用 keep_alive 时关闭后不结束会话，会话ID写入状态文件供下次运行复用；
+    运行期间后台心跳防止会话因空闲超时被服务器回收。设备上一次成功建立
+    会话后记为已预热，之后新建会话时跳过UiAutomator2服务端安装和设备初始化。
+    """
+
+    def __init__(self, name: str, appium_config: Dict[str, Any], capabilities: Dict[str, Any]):
+        """初始化会话管理
+
+        Args:
+            name: 会话名称，不同用途（浏览器、APP）的会话分别保存
+            appium_config: 配置中的 appium 项，读取 server、port、session_id、
+                keep_alive、keep_alive_timeout、heartbeat、fast_start 和 state_file
+            capabilities: 会话能力
+        """
+        self.name = name
+        self.logger = logging.getLogger("damai.appium_session")
+        self.server = appium_config.get("server") or f"http://localhost:{appium_config.get('port', 4723)}/wd/hub"
+        self.session_id: Optional[str] = appium_config.get("session_id")
+        self.keep_alive = appium_config.get("keep_alive", False)
+        self.heartbeat_interval = appium_config.get("heartbeat", 60)
+        self.fast_start = appium_config.get("fast_start", True)
+        self.state_file = appium_config.get("state_file", DEFAULT_STATE_FILE)
+        self.driver = None
+        self.mode: Optional[str] = None
+
+        self.capabilities = dict(capabilities)
+        if self.keep_alive:
+            # 保留的会话在两次运行之间没有命令，超时时间需要覆盖间隔
+            self.capabilities["newCommandTimeout"] = appium_config.get("keep_alive_timeout", 3600)
+        if self.fast_start:
+            self.capabilities.setdefault("disableWindowAnimation", True)
+        # 能力变化后不能复用旧会话
+        self.fingerprint = hashlib.sha1(codec.dumps_bytes(sorted(capabilities.items()))).hexdigest()
+        self.device = f"{self.server}|{capabilities.get('udid') or capabilities.get('deviceName', '')}"
+
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, "rb") as f:
+                return codec.loads(f.read()) or {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]):
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+        except OSError as e:
+            self.logger.warning(f"保存Appium会话状态失败: {str(e)}")
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(codec.dumps_bytes(state, 2))
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            self.logger.warning(f"保存Appium会话状态失败: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _update_state(self, session: Optional[Dict[str, Any]] = None, warm: Optional[bool] = None):
+        state = self._load_state()
+        sessions = state.setdefault("sessions", {})
+        if session is None:
+            sessions.pop(self.name, None)
+        else:
+            sessions[self.name] = session
+        if warm is not None:
+            devices = state.setdefault("warm_devices", [])
+            if warm and self.device not in devices:
+                devices.append(self.device)
+            elif not warm and self.device in devices:
+                devices.remove(self.device)
+        self._save_state(state)
+
+    def _saved_session_id(self) -> Optional[str]:
+        session = self._load_state().get("sessions", {}).get(self.name)
+        if not session or session.get("server") != self.server or session.get("fingerprint") != self.fingerprint:
+            return None
+        return session.get("session_id")
+
+    def _is_warm(self) -> bool:
+        return self.device in self._load_state().get("warm_devices", [])
+
+    def _attach(self, session_id: str):
+        try:
+            driver = _attach_remote(self.server, session_id, self.capabilities)
+            # 发送一个轻量命令确认会话仍然有效
+            driver.get_window_size()
+            return driver
+        except Exception as e:
+            self.logger.info(f"无法复用Appium会话 {session_id}: {str(e)}")
+            return None
+
+    def _create(self):
+        capabilities = dict(self.capabilities)
+        warm = self.fast_start and self._is_warm()
+        if warm:
+            capabilities.update(WARM_CAPABILITIES)
+        try:
+            return appium_webdriver.Remote(self.server, capabilities)
+        except Exception as e:
+            if not warm:
+                raise
+            # 设备上的服务端可能已被卸载或升级，去掉跳过项重试一次
+            self.logger.warning(f"跳过服务端安装建立会话失败，完整初始化后重试: {str(e)}")
+            self._update_state(warm=False)
+            return appium_webdriver.Remote(self.server, self.capabilities)
+
+    def connect(self):
+        """建立或复用会话
+
+        Returns:
+            WebDriver: Appium驱动
+
+        Raises:
+            Exception: 新建会话失败
+        """
+        start = time.perf_counter()
+        driver = None
+        for session_id in (self.session_id, self._saved_session_id() if self.keep_alive else None):
+            if session_id:
+                driver = self._attach(session_id)
+                if driver is not None:
+                    self.mode = "attach"
+                    break
+        if driver is None:
+            driver = self._create()
+            self.mode = "create"
+
+        elapsed = time.perf_counter() - start
+        CONNECT_SECONDS.labels(self.mode).observe(elapsed)
+        self.logger.info(f"Appium会话已{'复用' if self.mode == 'attach' else '建立'}: "
+                         f"{driver.session_id}，耗时 {elapsed:.2f} 秒")
+
+        self.driver = driver
+        session = None
+        if self.keep_alive:
+            session = {"session_id": driver.session_id, "server": self.server,
+                       "fingerprint": self.fingerprint, "updated": time.time()}
+        self._update_state(session, warm=True)
+        self.start_heartbeat()
+        return driver
+
+    def start_heartbeat(self):
+        """启动心跳线程，定期发送轻量命令防止会话空闲超时"""
+        if not self.heartbeat_interval or self._heartbeat_thread is not None:
+            return
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name=f"damai-appium-{self.name}",
+                                                  daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        """停止心跳线程"""
+        if self._heartbeat_thread is None:
+            return
+        self._heartbeat_stop.set()
+        self._heartbeat_thread.join()
+        self._heartbeat_thread = None
+
+    def _heartbeat(self):
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            driver = self.driver
+            if driver is None:
+                return
+            try:
+                driver.get_window_size()
+            except Exception as e:
+                self.logger.warning(f"Appium会话心跳失败: {str(e)}")
+
+    def close(self):
+        """关闭会话
+
+        启用 keep_alive 时保留会话供下次运行复用；通过配置的 session_id
+        连接的外部会话也不结束，由创建它的一方负责。
+        """
+        self.stop_heartbeat()
+        if self.driver is None:
+            return
+        if self.keep_alive:
+            self.logger.info(f"已保留Appium会话 {self.driver.session_id}，下次运行将直接复用")
+        elif self.session_id and self.driver.session_id == self.session_id:
+            self.logger.info(f"已断开外部Appium会话 {self.session_id}")
+        else:
+            try:
+                self.driver.quit()
+            finally:
+                self._update_state(None)
+        self.driver = None
@@ -10,14 +10,16 @@ import time
 import logging
 from typing import Dict, Any, Optional, Union, Tuple
 
-from selenium import webdriver # type: ignore
-from selenium.webdriver.chrome.options import Options # type: ignore    
-from selenium.webdriver.chrome.service import Service # type: ignore
-from selenium.webdriver.common.by import By # type: ignore
-from selenium.webdriver.support.ui import WebDriverWait # type: ignore
-from selenium.webdriver.support import expected_conditions as EC # type: ignore
-from selenium.common.exceptions import TimeoutException, NoSuchElementException # type: ignore
-from webdriver_manager.chrome import ChromeDriverManager # type: ignore
+from .lazy import lazy_import
+
+# selenium 和 webdriver_manager 导入较慢，推迟到首次使用浏览器时再导入
+webdriver = lazy_import("selenium.webdriver")
+Options = lazy_import("selenium.webdriver.chrome.options", "Options")
+Service = lazy_import("selenium.webdriver.chrome.service", "Service")
+By = lazy_import("selenium.webdriver.common.by", "By")
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
+ChromeDriverManager = lazy_import("webdriver_manager.chrome", "ChromeDriverManager")
 
 
 class Browser:
@@ -33,7 +35,7 @@ class Browser:
         self.browser = None
         self.logger = logging.getLogger("damai.browser")
     
-    def init_browser(self, headless: bool = None, mobile: bool = False) -> webdriver.Chrome:
+    def init_browser(self, headless: bool = None, mobile: bool = False) -> "webdriver.Chrome":
         """初始化Chrome浏览器
         
         Args:
@@ -108,7 +110,7 @@ class Browser:
             self.browser = None
             self.logger.info("浏览器已关闭")
     
-    def wait_for_element(self, by: str, value: str, timeout: int = 10) -> Optional[webdriver.remote.webelement.WebElement]:
+    def wait_for_element(self, by: str, value: str, timeout: int = 10) -> Optional["webdriver.remote.webelement.WebElement"]:
         """等待元素出现
         
         Args:
@@ -122,7 +124,8 @@ class Browser:
         if not self.browser:
             self.logger.error("浏览器未初始化")
             return None
-            
+        
+        from selenium.common.exceptions import TimeoutException # type: ignore
         try:
             element = WebDriverWait(self.browser, timeout).until(
                 EC.presence_of_element_located((by, value))
@@ -132,7 +135,7 @@ class Browser:
             self.logger.warning(f"等待元素 {by}={value} 超时")
             return None
     
-    def wait_for_clickable(self, by: str, value: str, timeout: int = 10) -> Optional[webdriver.remote.webelement.WebElement]:
+    def wait_for_clickable(self, by: str, value: str, timeout: int = 10) -> Optional["webdriver.remote.webelement.WebElement"]:
         """等待元素可点击
         
         Args:
@@ -146,7 +149,8 @@ class Browser:
         if not self.browser:
             self.logger.error("浏览器未初始化")
             return None
-            
+        
+        from selenium.common.exceptions import TimeoutException # type: ignore
         try:
             element = WebDriverWait(self.browser, timeout).until(
                 EC.element_to_be_clickable((by, value))
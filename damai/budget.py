@@ -0,0 +1,197 @@
+# 大麦网全局请求预算模块
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from . import metrics
+
+BUDGET_WAIT_SECONDS = metrics.histogram(
+    "damai_budget_wait_seconds", "请求预算等待时间", ("endpoint",),
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+BUDGET_ACQUIRED = metrics.counter("damai_budget_acquired_total", "从请求预算获取的令牌数", ("endpoint",))
+
+logger = logging.getLogger("damai.budget")
+
+
+class TokenBucket:
+    """线程安全的令牌桶
+
+    获取令牌时先在锁内预留（令牌数可以为负，表示排队中的请求），再在锁外等待，
+    多个线程按预留顺序依次放行。
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量，允许的突发请求数
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """预留令牌
+
+        Args:
+            tokens: 令牌数
+
+        Returns:
+            float: 需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌，令牌不足时阻塞等待
+
+        Args:
+            tokens: 令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def available(self) -> float:
+        """当前可用令牌数（负数表示有请求在排队）"""
+        with self._lock:
+            now = time.monotonic()
+            return min(self.burst, self._tokens + (now - self._updated) * self.rate)
+
+
+class RequestBudget:
+    """进程内共享的请求预算
+
+    所有对外的页面跳转和HTTP请求都需要先获取令牌：先从接口类别的子预算获取，
+    再从全局预算获取。未配置的接口类别只受全局预算限制。
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: float = 1.0,
+                 endpoints: Optional[Dict[str, Dict[str, float]]] = None):
+        """初始化请求预算
+
+        Args:
+            rate: 全局每秒请求数，None表示不限制
+            burst: 全局突发请求数
+            endpoints: 接口类别的子预算，如 {"order": {"rate": 1, "burst": 2}}
+        """
+        self.rate = rate
+        self.total = TokenBucket(rate, burst) if rate else None
+        self.endpoints: Dict[str, TokenBucket] = {}
+        for name, sub in (endpoints or {}).items():
+            if sub.get("rate"):
+                self.endpoints[name] = TokenBucket(sub["rate"], sub.get("burst", 1.0))
+        self._waited: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint: str = "default") -> float:
+        """获取一次请求的令牌，预算不足时阻塞等待
+
+        Args:
+            endpoint: 接口类别，如 search、detail、status、order、login
+
+        Returns:
+            float: 等待的总秒数
+        """
+        waited = 0.0
+        bucket = self.endpoints.get(endpoint)
+        if bucket is not None:
+            waited += bucket.acquire()
+        if self.total is not None:
+            waited += self.total.acquire()
+
+        BUDGET_WAIT_SECONDS.labels(endpoint).observe(waited)
+        BUDGET_ACQUIRED.labels(endpoint).inc()
+        with self._lock:
+            self._waited[endpoint] = self._waited.get(endpoint, 0.0) + waited
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+        if waited > 1.0:
+            logger.debug(f"请求预算[{endpoint}]等待 {waited:.2f}s")
+        return waited
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """获取各接口类别的请求次数和累计等待时间
+
+        Returns:
+            Dict: 接口类别 -> {"requests", "waited", "avg_wait"}
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": count,
+                    "waited": self._waited[endpoint],
+                    "avg_wait": self._waited[endpoint] / count,
+                }
+                for endpoint, count in self._counts.items()
+            }
+
+
+_budget = RequestBudget()
+_configured = False
+_config_lock = threading.Lock()
+
+
+def configure_budget(config: Dict[str, Any], replace: bool = True) -> RequestBudget:
+    """根据 risk_control.request_budget 配置全局请求预算
+
+    配置示例: {"rate": 2, "burst": 4, "endpoints": {"order": {"rate": 1, "burst": 2}}}
+
+    Args:
+        config: 配置信息
+        replace: 已配置过时是否替换，False时保留已有预算（各API类初始化时使用）
+
+    Returns:
+        RequestBudget: 当前的全局请求预算
+    """
+    global _budget, _configured
+    with _config_lock:
+        if _configured and not replace:
+            return _budget
+        budget_config = config.get("risk_control", {}).get("request_budget", {})
+        _budget = RequestBudget(
+            rate=budget_config.get("rate"),
+            burst=budget_config.get("burst", 1.0),
+            endpoints=budget_config.get("endpoints")
+        )
+        _configured = True
+        if _budget.rate:
+            logger.info(f"全局请求预算: {_budget.rate} 次/秒, 子预算: {', '.join(_budget.endpoints) or '无'}")
+        return _budget
+
+
+def get_budget() -> RequestBudget:
+    """获取当前的全局请求预算"""
+    return _budget
+
+
+def log_stats():
+    """把各接口类别的请求次数和等待时间写入日志"""
+    for endpoint, item in sorted(get_budget().stats().items()):
+        logger.info(f"请求预算[{endpoint}]: {item['requests']} 次请求, 累计等待 {item['waited']:.1f}s")
+
+
+def acquire(endpoint: str = "default") -> float:
+    """从全局请求预算获取一次请求的令牌
+
+    Args:
+        endpoint: 接口类别
+
+    Returns:
+        float: 等待的秒数
+    """
+    return _budget.acquire(endpoint)
@@ -0,0 +1,112 @@
+# 大麦网进程内缓存模块
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class TTLCache:
+    """带过期时间和容量上限（LRU淘汰）的线程安全缓存"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0, name: str = ""):
+        """初始化缓存
+
+        Args:
+            maxsize: 最大条目数，超出时淘汰最久未使用的条目
+            ttl: 默认过期时间（秒）
+            name: 缓存名称，用于统计输出
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[Hashable], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Any: 缓存值，不存在或已过期返回None
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒），None使用默认值
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add_invalidation_hook(self, hook: Callable[[Hashable], None]):
+        """添加失效回调，条目被主动失效时调用（参数为键，清空时为None）
+
+        Args:
+            hook: 回调函数
+        """
+        self._hooks.append(hook)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """使指定条目失效
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bool: 条目是否存在
+        """
+        with self._lock:
+            existed = self._data.pop(key, None) is not None
+        for hook in self._hooks:
+            hook(key)
+        return existed
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+        for hook in self._hooks:
+            hook(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            Dict: 命中数、未命中数、命中率和当前条目数
+        """
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data),
+        }
@@ -0,0 +1,189 @@
+# 大麦网接口熔断模块
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from . import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 指标中的状态取值
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = metrics.gauge("damai_circuit_state", "熔断器状态（0关闭 1半开 2打开）", ("endpoint",))
+CIRCUIT_REJECTED = metrics.counter("damai_circuit_rejected_total", "熔断期间被跳过的调用次数", ("endpoint",))
+CIRCUIT_TRANSITIONS = metrics.counter("damai_circuit_transitions_total", "熔断器状态切换次数", ("endpoint", "state"))
+
+logger = logging.getLogger("damai.circuit")
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开时调用被跳过"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} 接口熔断中，{retry_in:.0f} 秒后重试")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """按接口类别的熔断器
+
+    关闭状态下正常调用并统计连续失败次数，达到阈值后打开；打开状态下直接跳过调用，
+    冷却期过后进入半开状态，由一个调用先发送轻量探测，探测通过后再执行真实调用，
+    成功则关闭，失败则重新打开。半开期间其他调用仍被跳过。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 30.0,
+                 probe: Optional[Callable[[Any], bool]] = None):
+        """初始化熔断器
+
+        Args:
+            name: 接口类别名称，如 search、detail、order
+            failure_threshold: 连续失败多少次后打开
+            cooldown: 打开后的冷却时间（秒）
+            probe: 半开时的探测函数，参数为调用目标，返回是否可用；None表示不探测
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.probe = probe
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self._state_gauge = CIRCUIT_STATE.labels(name)
+        self._rejected = CIRCUIT_REJECTED.labels(name)
+        self._state_gauge.set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str):
+        # 调用方持有锁
+        if state == self.state:
+            return
+        logger.info(f"[{self.name}] 熔断器 {self.state} -> {state}")
+        self.state = state
+        self._state_gauge.set(_STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """距离冷却结束的秒数，未打开时为0"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def before_call(self, target: Any = None):
+        """调用前检查熔断状态
+
+        冷却结束后的第一个调用进入半开状态并执行探测。
+
+        Args:
+            target: 调用目标（如URL），传给探测函数
+
+        Raises:
+            CircuitOpenError: 熔断器打开、半开探测进行中或探测失败
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN or self.retry_in() > 0:
+                self._rejected.inc()
+                raise CircuitOpenError(self.name, self.retry_in() or self.cooldown)
+            self._set_state(HALF_OPEN)
+
+        if self.probe is not None:
+            try:
+                healthy = self.probe(target)
+            except Exception as e:
+                logger.debug(f"[{self.name}] 探测失败: {str(e)}")
+                healthy = False
+            if not healthy:
+                with self._lock:
+                    self._set_state(OPEN)
+                self._rejected.inc()
+                raise CircuitOpenError(self.name, self.cooldown)
+
+    def record_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            self.failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """记录一次失败调用，连续失败达到阈值或半开调用失败时打开"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"[{self.name}] 连续失败 {self.failures} 次，熔断 {self.cooldown:.0f} 秒")
+                self._set_state(OPEN)
+
+    def guard(self, target: Any = None) -> "_Guard":
+        """包裹一次调用的上下文管理器，块内抛出异常记为失败
+
+        Args:
+            target: 调用目标，传给探测函数
+
+        Returns:
+            上下文管理器，进入时可能抛出 CircuitOpenError
+        """
+        return _Guard(self, target)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取熔断器状态
+
+        Returns:
+            Dict: 状态、连续失败次数和剩余冷却时间
+        """
+        return {"state": self.state, "failures": self.failures, "retry_in": self.retry_in()}
+
+
+class _Guard:
+    def __init__(self, breaker: CircuitBreaker, target: Any):
+        self.breaker = breaker
+        self.target = target
+
+    def __enter__(self):
+        self.breaker.before_call(self.target)
+        return self.breaker
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return False
+
+
+def breakers_from_config(config: Dict[str, Any], probe: Optional[Callable[[Any], bool]] = None,
+                         endpoints=("search", "detail", "order")) -> Dict[str, CircuitBreaker]:
+    """根据 risk_control.circuit_breaker 配置创建各接口类别的熔断器
+
+    配置示例: {"failure_threshold": 3, "cooldown": 30, "endpoints": {"order": {"cooldown": 5}}}
+    enabled 为 false 时阈值设为极大值，相当于不熔断。
+
+    Args:
+        config: 配置信息
+        probe: 半开时的探测函数
+        endpoints: 接口类别列表
+
+    Returns:
+        Dict: 接口类别 -> 熔断器
+    """
+    breaker_config = config.get("risk_control", {}).get("circuit_breaker", {})
+    enabled = breaker_config.get("enabled", True)
+    breakers = {}
+    for name in endpoints:
+        sub = {**breaker_config, **breaker_config.get("endpoints", {}).get(name, {})}
+        breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=sub.get("failure_threshold", 3) if enabled else 2 ** 31,
+            cooldown=sub.get("cooldown", 30.0),
+            probe=probe
+        )
+    return breakers
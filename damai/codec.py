@@ -0,0 +1,175 @@
+# 大麦网JSON编解码模块
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson # type: ignore
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+logger = logging.getLogger("damai.codec")
+
+
+class JSONBackend:
+    """JSON编解码后端"""
+
+    def __init__(self, name: str, loads: Callable[[Any], Any], dumps: Callable[[Any, Optional[int]], bytes]):
+        """初始化编解码后端
+
+        Args:
+            name: 后端名称
+            loads: 解码函数，接收str或bytes
+            dumps: 编码函数，接收对象和缩进，返回UTF-8字节串
+        """
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+def _std_loads(data):
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def _std_dumps(obj, indent=None) -> bytes:
+    if indent is None:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=indent)
+    return text.encode("utf-8")
+
+
+def _orjson_dumps(obj, indent=None) -> bytes:
+    # orjson只支持2空格缩进，其余缩进交给标准库处理
+    if indent is None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if indent == 2:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+    return _std_dumps(obj, indent)
+
+
+_backends: Dict[str, JSONBackend] = {
+    "json": JSONBackend("json", _std_loads, _std_dumps),
+}
+if orjson is not None:
+    _backends["orjson"] = JSONBackend("orjson", orjson.loads, _orjson_dumps)
+
+# 按优先级选择可用的最快后端
+_backend = _backends.get("orjson") or _backends["json"]
+
+
+def register_backend(name: str, loads: Callable[[Any], Any], dumps: Callable[[Any, Optional[int]], bytes]):
+    """注册自定义编解码后端
+
+    Args:
+        name: 后端名称
+        loads: 解码函数
+        dumps: 编码函数，返回UTF-8字节串
+    """
+    _backends[name] = JSONBackend(name, loads, dumps)
+
+
+def use_backend(name: str) -> JSONBackend:
+    """切换当前使用的编解码后端
+
+    Args:
+        name: 后端名称，如"orjson"、"json"
+
+    Returns:
+        JSONBackend: 切换后的后端
+    """
+    global _backend
+    if name not in _backends:
+        raise ValueError(f"不可用的JSON后端: {name}")
+    _backend = _backends[name]
+    logger.debug(f"JSON后端已切换为 {name}")
+    return _backend
+
+
+def get_backend() -> JSONBackend:
+    """获取当前使用的编解码后端"""
+    return _backend
+
+
+def available_backends():
+    """获取所有可用后端名称"""
+    return list(_backends)
+
+
+def loads(data) -> Any:
+    """解码JSON
+
+    Args:
+        data: JSON文本或UTF-8字节串
+
+    Returns:
+        Any: 解码后的对象
+    """
+    return _backend.loads(data)
+
+
+def dumps_bytes(obj: Any, indent: Optional[int] = None) -> bytes:
+    """编码为UTF-8字节串（非ASCII字符不转义）
+
+    Args:
+        obj: 待编码对象
+        indent: 缩进空格数，None表示紧凑格式
+
+    Returns:
+        bytes: JSON字节串
+    """
+    return _backend.dumps(obj, indent)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """编码为JSON文本
+
+    Args:
+        obj: 待编码对象
+        indent: 缩进空格数，None表示紧凑格式
+
+    Returns:
+        str: JSON文本
+    """
+    return _backend.dumps(obj, indent).decode("utf-8")
+
+
+def response_json(response) -> Any:
+    """直接从响应字节解码JSON，避免requests先解码成文本再解析
+
+    Args:
+        response: requests响应对象
+
+    Returns:
+        Any: 解码后的对象
+    """
+    return _backend.loads(response.content)
+
+
+def load_file(path: str) -> Any:
+    """读取JSON文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        Any: 解码后的对象
+    """
+    with open(path, "rb") as f:
+        return _backend.loads(f.read())
+
+
+def dump_file(obj: Any, path: str, indent: Optional[int] = 2):
+    """写入JSON文件（UTF-8，非ASCII字符不转义）
+
+    Args:
+        obj: 待编码对象
+        path: 文件路径
+        indent: 缩进空格数
+    """
+    data = _backend.dumps(obj, indent)
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,136 @@
+# 大麦网条件请求缓存模块
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class _Entry:
+    __slots__ = ("etag", "last_modified", "value")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], value: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.value = value
+
+
+class ConditionalCache:
+    """基于 ETag / Last-Modified 的条件请求缓存
+
+    按演出保存最近一次解析结果和服务器返回的校验信息，下次请求时附带
+    If-None-Match / If-Modified-Since，服务器返回304时直接复用上次结果。
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """初始化条件请求缓存
+
+        Args:
+            max_entries: 最多保存的演出数量，超出时淘汰最久未使用的
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._unsupported = set()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified_count = 0
+
+    def supported(self, key: str) -> bool:
+        """服务器是否为该地址提供校验信息（未知时视为支持）"""
+        return key not in self._unsupported
+
+    def mark_unsupported(self, key: str):
+        """标记该地址不支持条件请求"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._unsupported.add(key)
+
+    def headers(self, key: str) -> Dict[str, str]:
+        """生成条件请求头，并计入请求次数
+
+        Args:
+            key: 缓存键，通常为请求URL
+
+        Returns:
+            Dict: 请求头，没有缓存时为空
+        """
+        with self._lock:
+            self.requests += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            headers = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            return headers
+
+    def not_modified(self, key: str) -> Optional[Any]:
+        """服务器返回304时取出上次的解析结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Any: 上次的解析结果，没有缓存时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.not_modified_count += 1
+            return entry.value
+
+    def store(self, key: str, response, value: Any) -> bool:
+        """保存响应的校验信息和解析结果
+
+        Args:
+            key: 缓存键
+            response: 响应对象，读取 ETag 和 Last-Modified 头
+            value: 解析结果
+
+        Returns:
+            bool: 服务器是否提供了校验信息
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                self._unsupported.add(key)
+                return False
+            self._unsupported.discard(key)
+            self._entries[key] = _Entry(etag, last_modified, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, key: Optional[str] = None):
+        """清除缓存
+
+        Args:
+            key: 缓存键，None表示清除全部
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._unsupported.clear()
+            else:
+                self._entries.pop(key, None)
+                self._unsupported.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            Dict: 请求数、304命中数和命中率
+        """
+        requests = self.requests
+        return {
+            "requests": requests,
+            "not_modified": self.not_modified_count,
+            "hit_rate": self.not_modified_count / requests if requests else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,236 @@
+# 大麦网配置加载模块
+
+import os
+import copy
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import codec
+from .settings import Settings
+
+logger = logging.getLogger("damai.config")
+
+# 运行中可以安全修改的配置项，其余配置项修改后需要重启
+HOT_RELOAD_KEYS: Tuple[Tuple[str, ...], ...] = (
+    ("strategy", "monitor_interval"),
+    ("target", "keyword"),
+    ("target", "price_range"),
+    ("target", "date_range"),
+)
+
+# 路径 -> (mtime_ns, 文件大小, 解析结果)
+_cache: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _yaml_loader():
+    # 优先使用libyaml的C加速加载器
+    import yaml # type: ignore
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_config(data: bytes, path: str) -> Dict[str, Any]:
+    """按扩展名解析配置内容，.json 使用JSON，其余按YAML解析
+
+    Args:
+        data: 文件内容
+        path: 文件路径
+
+    Returns:
+        Dict: 配置信息
+    """
+    if path.lower().endswith(".json"):
+        config = codec.loads(data)
+    else:
+        import yaml # type: ignore
+        config = yaml.load(data, Loader=_yaml_loader())
+    return config or {}
+
+
+def load_config(path: str, use_cache: bool = True, frozen: bool = False) -> Any:
+    """加载配置文件，按路径和修改时间缓存解析结果
+
+    默认返回缓存的副本，调用方可以自由修改；frozen 为 True 时校验配置，
+    返回只读的 Settings。
+
+    Args:
+        path: 配置文件路径，支持YAML和JSON
+        use_cache: 是否使用缓存
+        frozen: 是否返回只读的 Settings
+
+    Returns:
+        Dict: 配置信息，frozen 为 True 时为 Settings
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ConfigError: frozen 为 True 且配置校验失败
+    """
+    config = _load_dict(path, use_cache)
+    if frozen:
+        return Settings.from_config(config)
+    return config
+
+
+def _load_dict(path: str, use_cache: bool) -> Dict[str, Any]:
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    if use_cache:
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return copy.deepcopy(cached[2])
+
+    with open(key, "rb") as f:
+        data = f.read()
+    config = parse_config(data, key)
+    with _cache_lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+    return copy.deepcopy(config)
+
+
+def clear_cache():
+    """清空配置缓存"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _get_path(config: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(config, dict) or key not in config:
+            return None
+        config = config[key]
+    return config
+
+
+def apply_safe_keys(config: Dict[str, Any], new_config: Dict[str, Any],
+                    keys: Tuple[Tuple[str, ...], ...] = HOT_RELOAD_KEYS) -> List[str]:
+    """把新配置中可以安全修改的配置项原地更新到运行中的配置
+
+    其他配置项的变化只记录警告，需要重启才能生效。
+
+    Args:
+        config: 运行中的配置，原地修改
+        new_config: 新加载的配置
+        keys: 可以安全修改的配置项路径
+
+    Returns:
+        List: 已更新的配置项，如 ["strategy.monitor_interval"]
+    """
+    changed = []
+    for path in keys:
+        new_value = _get_path(new_config, path)
+        if new_value is None or new_value == _get_path(config, path):
+            continue
+        parent = config
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = copy.deepcopy(new_value)
+        changed.append(".".join(path))
+
+    safe_sections = {path[0] for path in keys}
+    for section in set(config) | set(new_config):
+        if section in safe_sections:
+            old_rest = {k: v for k, v in (config.get(section) or {}).items()
+                        if (section, k) not in keys}
+            new_rest = {k: v for k, v in (new_config.get(section) or {}).items()
+                        if (section, k) not in keys}
+            if old_rest != new_rest:
+                logger.warning(f"配置项 {section} 中有不支持热更新的修改，需要重启后生效")
+        elif config.get(section) != new_config.get(section):
+            logger.warning(f"配置项 {section} 已修改，需要重启后生效")
+    return changed
+
+
+class ConfigWatcher:
+    """配置文件监视器
+
+    后台线程定期检查文件的修改时间，变化时重新加载并回调。
+    """
+
+    def __init__(self, path: str, on_change: Callable[[Dict[str, Any]], None], interval: float = 2.0):
+        """初始化配置文件监视器
+
+        Args:
+            path: 配置文件路径
+            on_change: 文件变化时的回调，参数为新配置
+            interval: 检查间隔（秒）
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtime = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        """启动监视线程"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="damai-config-watch", daemon=True)
+        self._thread.start()
+        logger.info(f"已启用配置热更新: {self.path}")
+
+    def stop(self):
+        """停止监视线程"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def check(self) -> bool:
+        """检查一次文件是否变化，变化时重新加载并回调
+
+        Returns:
+            bool: 是否重新加载
+        """
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            new_config = load_config(self.path)
+        except Exception as e:
+            # 编辑器保存过程中可能读到不完整的文件，下次变化时再试
+            logger.warning(f"重新加载配置失败: {str(e)}")
+            return False
+        self.on_change(new_config)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"配置热更新失败: {str(e)}")
+
+
+def config_watcher_from_config(config: Dict[str, Any], path: str,
+                               on_change: Callable[[Dict[str, Any]], None]) -> Optional[ConfigWatcher]:
+    """根据配置创建并启动配置文件监视器
+
+    配置项为 hot_reload，包含 enabled 和 interval。未启用时返回None。
+
+    Args:
+        config: 配置信息
+        path: 配置文件路径
+        on_change: 文件变化时的回调
+
+    Returns:
+        ConfigWatcher: 已启动的监视器，未启用时为None
+    """
+    reload_config = config.get("hot_reload")
+    if not reload_config or not reload_config.get("enabled", False):
+        return None
+    watcher = ConfigWatcher(path, on_change, interval=reload_config.get("interval", 2.0))
+    watcher.start()
+    return watcher
@@ -0,0 +1,287 @@
+# 大麦网结构化事件日志模块
+
+import os
+import math
+import time
+import logging
+import struct
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+from . import codec
+
+logger = logging.getLogger("damai.events")
+
+# 事件类型，二进制格式中以编号存储
+EVENT_KINDS = (
+    "status_check",
+    "transition",
+    "order_step",
+    "error",
+    "search",
+    "monitor",
+)
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+_CUSTOM_KIND = 255
+
+BINARY_MAGIC = b"DMEV\x01"
+# 记录头: 记录体长度、时间戳、耗时（无耗时为NaN）、事件类型编号
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<ddB")
+
+
+class NullEventLog:
+    """未启用事件日志时使用的空实现"""
+
+    enabled = False
+
+    def emit(self, kind: str, duration: Optional[float] = None, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+class EventLog:
+    """结构化事件日志，写入JSON Lines或紧凑的长度前缀二进制格式"""
+
+    enabled = True
+
+    def __init__(self, path: str, fmt: str = "jsonl", flush_every: int = 50, flush_interval: float = 1.0):
+        """初始化事件日志
+
+        已有文件的格式与 fmt 不同时，先将其改名保留，再创建新文件，
+        避免两种格式混在同一个文件中无法读取。
+
+        Args:
+            path: 日志文件路径
+            fmt: 格式，"jsonl" 或 "binary"
+            flush_every: 每写入多少条刷新一次文件缓冲
+            flush_interval: 后台定期刷新文件缓冲的间隔（秒），进程异常退出时最多丢失这段时间的事件
+        """
+        if fmt not in ("jsonl", "binary"):
+            raise ValueError(f"不支持的事件日志格式: {fmt}")
+        log_dir = os.path.dirname(path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        self.path = path
+        self.fmt = fmt
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._pending = 0
+        existing = _file_format(path)
+        if existing is not None and existing != fmt:
+            rotated = _rotated_path(path)
+            os.replace(path, rotated)
+            logger.warning(f"事件日志 {path} 为 {existing} 格式，与配置的 {fmt} 不同，已改名为 {rotated}")
+            existing = None
+        self._file = open(path, "ab")
+        if fmt == "binary" and existing is None:
+            self._file.write(BINARY_MAGIC)
+
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,),
+                                             name="damai-events-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self, interval: float):
+        while not self._stop.wait(interval):
+            with self._lock:
+                if self._file is None:
+                    return
+                if self._pending:
+                    self._file.flush()
+                    self._pending = 0
+
+    def _encode(self, ts: float, kind: str, duration: Optional[float], fields: Dict[str, Any]) -> bytes:
+        if self.fmt == "jsonl":
+            record = {"ts": ts, "kind": kind}
+            if duration is not None:
+                record["duration"] = duration
+            record.update(fields)
+            return codec.dumps_bytes(record) + b"\n"
+
+        code = _KIND_CODES.get(kind, _CUSTOM_KIND)
+        if code == _CUSTOM_KIND:
+            fields = dict(fields, kind=kind)
+        body = _HEADER.pack(ts, math.nan if duration is None else duration, code)
+        if fields:
+            body += codec.dumps_bytes(fields)
+        return _LENGTH.pack(len(body)) + body
+
+    def emit(self, kind: str, duration: Optional[float] = None, **fields):
+        """记录事件
+
+        Args:
+            kind: 事件类型，见 EVENT_KINDS
+            duration: 耗时（秒）
+            **fields: 其他字段
+        """
+        data = self._encode(time.time(), kind, duration, fields)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self._pending += 1
+            if self._pending >= self.flush_every or kind == "error":
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        """关闭事件日志"""
+        self._stop.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _file_format(path: str) -> Optional[str]:
+    """识别已有事件日志的格式，文件不存在或为空时返回None"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(BINARY_MAGIC))
+    except OSError:
+        return None
+    if not head:
+        return None
+    return "binary" if head == BINARY_MAGIC else "jsonl"
+
+
+def _rotated_path(path: str) -> str:
+    """生成改名保留旧日志的路径，保留扩展名，如 events-20240420-120000.jsonl"""
+    root, ext = os.path.splitext(path)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    candidate = f"{root}-{stamp}{ext}"
+    n = 1
+    while os.path.exists(candidate):
+        candidate = f"{root}-{stamp}-{n}{ext}"
+        n += 1
+    return candidate
+
+
+_event_log = NullEventLog()
+
+
+def configure_events(path: Optional[str], fmt: str = "jsonl"):
+    """启用或关闭全局事件日志
+
+    Args:
+        path: 日志文件路径，None表示关闭
+        fmt: 格式，"jsonl" 或 "binary"
+
+    Returns:
+        EventLog: 当前的事件日志
+    """
+    global _event_log
+    old = _event_log
+    _event_log = EventLog(path, fmt) if path else NullEventLog()
+    old.close()
+    return _event_log
+
+
+def get_event_log():
+    """获取当前的全局事件日志"""
+    return _event_log
+
+
+def emit(kind: str, duration: Optional[float] = None, **fields):
+    """向全局事件日志记录事件"""
+    _event_log.emit(kind, duration, **fields)
+
+
+@contextmanager
+def timed(kind: str, **fields):
+    """记录代码块耗时的事件，代码块可通过返回的字典补充字段
+
+    Args:
+        kind: 事件类型
+        **fields: 其他字段
+    """
+    if not _event_log.enabled:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields["error"] = str(e)
+        raise
+    finally:
+        _event_log.emit(kind, time.perf_counter() - start, **fields)
+
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """读取事件日志，自动识别JSON Lines和二进制格式
+
+    Args:
+        path: 日志文件路径
+
+    Returns:
+        Iterator: 事件字典
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(BINARY_MAGIC))
+        if magic != BINARY_MAGIC:
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield codec.loads(line)
+            return
+
+        while True:
+            head = f.read(_LENGTH.size)
+            if len(head) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(head)
+            body = f.read(length)
+            if len(body) < length:
+                return  # 进程被中断时最后一条记录可能不完整
+            ts, duration, code = _HEADER.unpack_from(body)
+            record = {"ts": ts}
+            if not math.isnan(duration):
+                record["duration"] = duration
+            extra = codec.loads(body[_HEADER.size:]) if length > _HEADER.size else {}
+            record["kind"] = extra.pop("kind", None) if code == _CUSTOM_KIND else EVENT_KINDS[code]
+            record.update(extra)
+            yield record
+
+
+def load_columns(path: str) -> Dict[str, Any]:
+    """将事件日志加载为列式数组，便于分析
+
+    ts 和 duration 为 array('d')（缺失耗时为NaN），其余字段为列表（缺失为None）。
+
+    Args:
+        path: 日志文件路径
+
+    Returns:
+        Dict: 字段名到列数据的映射
+    """
+    ts = array("d")
+    duration = array("d")
+    columns: Dict[str, List[Any]] = {}
+    count = 0
+    for record in read_events(path):
+        ts.append(record.pop("ts"))
+        duration.append(record.pop("duration", math.nan))
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * count
+            column.append(value)
+        count += 1
+        for column in columns.values():
+            if len(column) < count:
+                column.append(None)
+    result: Dict[str, Any] = {"ts": ts, "duration": duration}
+    result.update(columns)
+    return result
@@ -0,0 +1,81 @@
+# 大麦网延迟导入模块
+
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("damai.lazy")
+
+_load_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyImport:
+    """延迟导入的模块或模块属性，首次访问属性或调用时才真正导入
+
+    注意: 不能直接用于 except 子句和类型注解，这两处需要在函数内部导入。
+    """
+
+    __slots__ = ("_module", "_attr", "_target")
+
+    def __init__(self, module: str, attr: Optional[str] = None):
+        """初始化延迟导入
+
+        Args:
+            module: 模块名，如 "selenium.webdriver"
+            attr: 模块中的属性名，None表示导入模块本身
+        """
+        object.__setattr__(self, "_module", module)
+        object.__setattr__(self, "_attr", attr)
+        object.__setattr__(self, "_target", None)
+
+    def _load(self) -> Any:
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            module_name = object.__getattribute__(self, "_module")
+            attr = object.__getattribute__(self, "_attr")
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            target = getattr(module, attr) if attr else module
+            elapsed = time.perf_counter() - start
+            with _lock:
+                _load_times.setdefault(module_name, elapsed)
+            logger.debug(f"延迟导入 {module_name}: {elapsed * 1000:.1f} ms")
+            object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        module_name = object.__getattribute__(self, "_module")
+        attr = object.__getattribute__(self, "_attr")
+        return f"<LazyImport {module_name}{'.' + attr if attr else ''}>"
+
+
+def lazy_import(module: str, attr: Optional[str] = None) -> LazyImport:
+    """创建延迟导入对象
+
+    Args:
+        module: 模块名
+        attr: 模块中的属性名
+
+    Returns:
+        LazyImport: 延迟导入对象
+    """
+    return LazyImport(module, attr)
+
+
+def load_times() -> List[Tuple[str, float]]:
+    """获取已触发的延迟导入及其耗时，按耗时降序排列
+
+    Returns:
+        List: (模块名, 耗时秒数)
+    """
+    with _lock:
+        return sorted(_load_times.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,149 @@
+# 大麦网日志模块
+
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+DEFAULT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s"
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """非阻塞的队列日志处理器，队列满时丢弃日志并计数"""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        # 多个线程可能同时丢弃日志，计数需要加锁；只在丢弃时才会用到
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class DropReportingListener(QueueListener):
+    """后台日志线程，定期把新丢弃的日志数量作为警告写出"""
+
+    def __init__(self, log_queue: "queue.Queue", queue_handler: DroppingQueueHandler, *handlers,
+                 report_interval: float = 10.0, respect_handler_level: bool = False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.queue_handler = queue_handler
+        self.report_interval = report_interval
+        self._reported = 0
+        self._last_report = time.monotonic()
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        dropped = self.queue_handler.dropped
+        if dropped > self._reported:
+            warning = logging.LogRecord(
+                "damai.log", logging.WARNING, __file__, 0,
+                f"日志队列已满，新丢弃 {dropped - self._reported} 条日志（累计 {dropped} 条）", None, None
+            )
+            self._reported = dropped
+            super().handle(warning)
+
+
+def setup_logging(level: int = logging.INFO,
+                  log_file: Optional[str] = os.path.join("logs", "damai.log"),
+                  fmt: str = DEFAULT_FORMAT,
+                  max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5,
+                  queue_size: int = 10000,
+                  stream=None,
+                  drop_report_interval: float = 10.0) -> logging.Logger:
+    """配置异步日志
+
+    业务线程只把日志记录放入有界队列，由后台线程写入按大小轮转的日志文件和控制台。
+    重复调用时会替换上一次的配置。
+
+    Args:
+        level: 日志级别
+        log_file: 日志文件路径，None表示不写文件
+        fmt: 日志格式
+        max_bytes: 单个日志文件的最大字节数
+        backup_count: 保留的历史日志文件数量
+        queue_size: 队列容量，队列满时丢弃新日志
+        stream: 控制台输出流，默认为stderr
+        drop_report_interval: 后台线程报告丢弃日志数量的最短间隔（秒）
+
+    Returns:
+        logging.Logger: 根日志记录器
+    """
+    global _listener, _queue_handler
+
+    formatter = logging.Formatter(fmt)
+    handlers = []
+
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(level)
+        handlers.append(file_handler)
+
+    console_handler = logging.StreamHandler(stream or sys.stderr)
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(level)
+    handlers.append(console_handler)
+
+    with _lock:
+        shutdown_logging()
+
+        log_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _listener = DropReportingListener(log_queue, _queue_handler, *handlers,
+                                          report_interval=drop_report_interval,
+                                          respect_handler_level=True)
+        _listener.start()
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+    return root
+
+
+def dropped_count() -> int:
+    """获取因队列已满而丢弃的日志数量"""
+    handler = _queue_handler
+    return handler.dropped if handler else 0
+
+
+def shutdown_logging():
+    """停止后台日志线程，写出队列中剩余的日志"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        if _queue_handler is not None and _queue_handler.dropped:
+            sys.stderr.write(f"日志队列已满，共丢弃 {_queue_handler.dropped} 条日志\n")
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,248 @@
+# 大麦网内存分析模块
+
+import os
+import time
+import signal
+import logging
+import threading
+import tracemalloc
+import importlib.util
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("damai.memprof")
+
+DEFAULT_PACKAGES = ("damai", "damai_ticket")
+
+
+def package_dirs(packages: Iterable[str]) -> List[str]:
+    """获取包所在目录，不导入包本身
+
+    Args:
+        packages: 包名列表
+
+    Returns:
+        List: 目录路径列表
+    """
+    dirs = []
+    for name in packages:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is not None and spec.submodule_search_locations:
+            dirs.extend(os.path.abspath(path) for path in spec.submodule_search_locations)
+    return dirs
+
+
+class MemoryProfiler:
+    """基于tracemalloc的内存分析器
+
+    定期拍摄内存快照并与基线比较，把增长的内存按 damai/damai_ticket 包内
+    最近的调用位置（文件:行号）汇总，报告按需写入文件。
+    """
+
+    def __init__(self, report_path: str = os.path.join("logs", "memory_report.txt"),
+                 interval: float = 300.0,
+                 frames: int = 25,
+                 top: int = 20,
+                 packages: Iterable[str] = DEFAULT_PACKAGES,
+                 trigger_file: Optional[str] = None):
+        """初始化内存分析器
+
+        Args:
+            report_path: 报告文件路径
+            interval: 定期快照间隔（秒）
+            frames: 每次分配记录的调用栈深度，需足够深才能从第三方库回溯到本项目代码
+            top: 报告中列出的增长位置数量
+            packages: 统计范围内的包名
+            trigger_file: 触发文件路径，文件出现时写出报告并删除该文件
+        """
+        self.report_path = report_path
+        self.interval = interval
+        self.frames = frames
+        self.top = top
+        self.dirs = tuple(os.path.join(path, "") for path in package_dirs(packages))
+        self.trigger_file = trigger_file
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._report_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _filters(self) -> List[tracemalloc.Filter]:
+        # 调用栈中任意一帧位于统计范围内即保留，排除分析器自身的分配
+        filters = [tracemalloc.Filter(True, path + "*", all_frames=True) for path in self.dirs]
+        filters.append(tracemalloc.Filter(False, os.path.abspath(__file__), all_frames=True))
+        return filters
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        """拍摄只包含统计范围内分配的快照
+
+        Returns:
+            tracemalloc.Snapshot: 内存快照
+        """
+        return tracemalloc.take_snapshot().filter_traces(self._filters())
+
+    def _site(self, traceback: tracemalloc.Traceback) -> str:
+        # 取统计范围内最近的一帧作为分配位置
+        for frame in reversed(traceback):
+            if frame.filename.startswith(self.dirs):
+                return f"{frame.filename}:{frame.lineno}"
+        frame = traceback[-1]
+        return f"{frame.filename}:{frame.lineno}"
+
+    def growth(self, snapshot: tracemalloc.Snapshot,
+               base: tracemalloc.Snapshot) -> List[Tuple[str, int, int]]:
+        """按分配位置汇总两次快照之间的内存增长
+
+        Args:
+            snapshot: 新快照
+            base: 基准快照
+
+        Returns:
+            List: (分配位置, 增长字节数, 增长块数)，按增长字节数降序排列
+        """
+        sites: Dict[str, List[int]] = {}
+        for diff in snapshot.compare_to(base, "traceback"):
+            site = sites.setdefault(self._site(diff.traceback), [0, 0])
+            site[0] += diff.size_diff
+            site[1] += diff.count_diff
+        return sorted(((site, size, count) for site, (size, count) in sites.items()),
+                      key=lambda item: item[1], reverse=True)
+
+    def start(self):
+        """开始跟踪内存分配，记录基线并启动定期快照线程"""
+        if self._thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.baseline = self.previous = self.snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="damai-memprof", daemon=True)
+        self._thread.start()
+        logger.info(f"内存分析已启动，快照间隔 {self.interval:.0f} 秒")
+
+    def stop(self):
+        """停止定期快照和内存跟踪"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def request_report(self):
+        """请求在后台线程中写出报告，可在信号处理函数中调用"""
+        self._report_requested.set()
+
+    def install_signal(self, signum: Optional[int] = None) -> bool:
+        """注册写出报告的信号处理函数，只能在主线程调用
+
+        Args:
+            signum: 信号编号，默认SIGUSR1
+
+        Returns:
+            bool: 是否注册成功（Windows没有SIGUSR1）
+        """
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda sig, frame: self.request_report())
+        return True
+
+    def _run(self):
+        next_snapshot = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            if self.trigger_file and os.path.exists(self.trigger_file):
+                try:
+                    os.remove(self.trigger_file)
+                except OSError:
+                    pass
+                self._report_requested.set()
+            if self._report_requested.is_set():
+                self._report_requested.clear()
+                try:
+                    self.write_report()
+                except Exception as e:
+                    logger.error(f"写出内存报告失败: {str(e)}")
+            if time.monotonic() >= next_snapshot:
+                next_snapshot += self.interval
+                self._periodic()
+            self._report_requested.wait(1.0)
+
+    def _periodic(self):
+        snapshot = self.snapshot()
+        growth = self.growth(snapshot, self.previous)
+        self.previous = snapshot
+        total = sum(stat.size for stat in snapshot.statistics("filename"))
+        top = ", ".join(f"{os.path.basename(site)} {size / 1024:+.1f} KiB" for site, size, _ in growth[:3] if size > 0)
+        logger.info(f"内存快照: 统计范围内 {total / 1024:.1f} KiB" + (f", 增长最多: {top}" if top else ""))
+
+    def write_report(self, path: Optional[str] = None) -> str:
+        """拍摄快照并写出相对基线和上次快照的内存增长报告
+
+        Args:
+            path: 报告文件路径，默认为初始化时指定的路径
+
+        Returns:
+            str: 报告文件路径
+        """
+        path = path or self.report_path
+        snapshot = self.snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"内存报告 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"跟踪内存: 当前 {current / 1024:.1f} KiB, 峰值 {peak / 1024:.1f} KiB",
+            f"统计范围: {', '.join(self.dirs)}",
+        ]
+        for title, base in (("相对基线", self.baseline), ("相对上次快照", self.previous)):
+            growth = self.growth(snapshot, base)
+            lines.append("")
+            lines.append(f"== {title}增长最多的 {self.top} 个位置")
+            for site, size, count in growth[:self.top]:
+                lines.append(f"{size / 1024:+10.1f} KiB  {count:+8d} 块  {site}")
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"内存报告已写入 {path}")
+        return path
+
+    def reset_baseline(self):
+        """以当前状态作为新的基线"""
+        self.baseline = self.previous = self.snapshot()
+
+
+def memory_profiler_from_config(config: Dict[str, Any]) -> Optional[MemoryProfiler]:
+    """根据配置创建并启动内存分析器
+
+    配置项为 profiling.memory，包含 enabled、interval、frames、top、report 和
+    trigger_file。未启用时返回None。
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        MemoryProfiler: 已启动的分析器，未启用时为None
+    """
+    memory_config = config.get("profiling", {}).get("memory")
+    if not memory_config or not memory_config.get("enabled", False):
+        return None
+    profiler = MemoryProfiler(
+        report_path=memory_config.get("report", os.path.join("logs", "memory_report.txt")),
+        interval=memory_config.get("interval", 300),
+        frames=memory_config.get("frames", 25),
+        top=memory_config.get("top", 20),
+        trigger_file=memory_config.get("trigger_file")
+    )
+    profiler.install_signal()
+    profiler.start()
+    return profiler
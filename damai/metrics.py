@@ -0,0 +1,464 @@
+# 大麦网运行指标模块
+
+import os
+import math
+import time
+import bisect
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger("damai.metrics")
+
+# 默认直方图分桶（秒），覆盖接口请求到浏览器页面加载
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 采集回调返回的样本: (指标名, 标签, 值)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _Slot:
+    """线程本地保存的分片，线程结束时随线程本地数据一起释放"""
+
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self, values: List[float]):
+        self.values = values
+
+
+class _Shards:
+    """按线程分片的计数数组
+
+    每个线程只写自己的分片，记录时无需加锁；读取时把所有分片相加。
+    线程结束后其分片在下次读取或新建分片时并入基础值，累计值不会丢失，
+    按次创建的工作线程也不会让分片数量持续增长。
+    """
+
+    __slots__ = ("size", "_local", "_shards", "_base", "_dead", "_lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards: Dict[int, List[float]] = {}
+        self._base = [0.0] * size
+        # 已结束线程的分片，由终结回调追加；回调可能在任意时刻运行，不在其中加锁
+        self._dead: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> List[float]:
+        try:
+            return self._local.slot.values
+        except AttributeError:
+            values = [0.0] * self.size
+            slot = _Slot(values)
+            weakref.finalize(slot, self._dead.append, values)
+            with self._lock:
+                self._fold_dead()
+                self._shards[id(values)] = values
+            self._local.slot = slot
+            return values
+
+    def _fold_dead(self):
+        # 调用方持有锁
+        while self._dead:
+            values = self._dead.pop()
+            del self._shards[id(values)]
+            for i, value in enumerate(values):
+                self._base[i] += value
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            self._fold_dead()
+            shards = list(self._shards.values())
+            totals = list(self._base)
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+class Counter:
+    """只增计数器"""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0):
+        """增加计数
+
+        Args:
+            amount: 增量，必须为非负数
+        """
+        self._shards.local()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class Gauge:
+    """可任意设置的瞬时值"""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """设置当前值"""
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        """增加当前值"""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        """减少当前值"""
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """固定分桶直方图"""
+
+    __slots__ = ("buckets", "_shards")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # 分片布局: 各分桶计数（最后一个为+Inf）、总和、样本数
+        self._shards = _Shards(len(self.buckets) + 3)
+
+    def observe(self, value: float):
+        """记录一个观测值
+
+        Args:
+            value: 观测值
+        """
+        values = self._shards.local()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    @contextmanager
+    def time(self):
+        """记录代码块耗时（秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """获取累计分桶计数、总和和样本数
+
+        Returns:
+            tuple: (累计分桶计数, 总和, 样本数)
+        """
+        totals = self._shards.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:len(self.buckets) + 1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class MetricFamily:
+    """同名指标族，按标签值区分子指标"""
+
+    def __init__(self, kind: str, name: str, documentation: str,
+                 labelnames: Iterable[str] = (), factory: Callable[[], Any] = Counter):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = factory()
+
+    def labels(self, *values, **kwargs):
+        """获取指定标签值的子指标，热路径上应缓存返回值
+
+        Returns:
+            Counter/Gauge/Histogram: 子指标
+        """
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def __getattr__(self, name: str):
+        # 无标签的指标族直接代理到唯一的子指标
+        if name.startswith("_") or self.labelnames:
+            raise AttributeError(name)
+        return getattr(self._children[()], name)
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, values)), child) for values, child in items]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        # 指标名 -> (类型, 说明, {键: 采集回调})
+        self._collectors: Dict[str, Tuple[str, str, Dict[str, Callable[[], Iterable[Sample]]]]] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, kind: str, name: str, documentation: str,
+                labelnames: Iterable[str], factory: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = MetricFamily(kind, name, documentation, labelnames, factory)
+                self._families[name] = family
+            elif family.kind != kind:
+                raise ValueError(f"指标 {name} 已注册为 {family.kind}")
+            return family
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        """获取或创建计数器"""
+        return self._family("counter", name, documentation, labelnames, Counter)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        """获取或创建瞬时值指标"""
+        return self._family("gauge", name, documentation, labelnames, Gauge)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        """获取或创建直方图"""
+        return self._family("histogram", name, documentation, labelnames, lambda: Histogram(buckets))
+
+    def add_collector(self, name: str, kind: str, documentation: str,
+                      collect: Callable[[], Iterable[Sample]], key: str = ""):
+        """添加采集回调，在导出时调用，适合已有统计数据（如缓存命中数）
+
+        Args:
+            name: 指标名
+            kind: 指标类型，counter 或 gauge
+            documentation: 说明
+            collect: 回调函数，返回 (指标名, 标签, 值) 样本
+            key: 回调的键，同一指标下相同键的回调会被替换
+        """
+        with self._lock:
+            entry = self._collectors.setdefault(name, (kind, documentation, {}))
+            entry[2][key] = collect
+
+    def render(self) -> str:
+        """按Prometheus文本格式导出所有指标
+
+        Returns:
+            str: 导出文本
+        """
+        with self._lock:
+            families = list(self._families.values())
+            collectors = [(name, kind, documentation, list(callbacks.values()))
+                          for name, (kind, documentation, callbacks) in self._collectors.items()]
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, child in family.children():
+                if family.kind == "histogram":
+                    cumulative, total, count = child.snapshot()
+                    bounds = list(child.buckets) + [math.inf]
+                    for bound, value in zip(bounds, cumulative):
+                        bucket_labels = dict(labels, le=_format_value(bound))
+                        lines.append(f"{family.name}_bucket{_format_labels(bucket_labels)} {_format_value(value)}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {_format_value(count)}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+        for name, kind, documentation, callbacks in collectors:
+            samples = []
+            for collect in callbacks:
+                try:
+                    samples.extend(collect())
+                except Exception as e:
+                    logger.debug(f"采集指标 {name} 失败: {str(e)}")
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+    """在默认注册表中获取或创建计数器"""
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+    """在默认注册表中获取或创建瞬时值指标"""
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+    """在默认注册表中获取或创建直方图"""
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+# 通用HTTP请求指标，由 requests 会话的响应钩子记录
+HTTP_REQUESTS = counter("damai_http_requests_total", "HTTP请求次数", ("endpoint", "method", "code"))
+HTTP_LATENCY = histogram("damai_http_request_seconds", "HTTP请求耗时（到收到响应头）", ("endpoint",))
+
+# 下单尝试次数，网页端和移动端共用
+ORDER_ATTEMPTS = counter("damai_order_attempts_total", "下单尝试次数", ("channel", "result"))
+
+
+def endpoint_name(url: str) -> str:
+    """把URL归类为低基数的接口名（路径最后一段去掉扩展名）
+
+    Args:
+        url: 请求URL
+
+    Returns:
+        str: 接口名
+    """
+    path = urlparse(url).path.rstrip("/")
+    return os.path.splitext(path.rsplit("/", 1)[-1])[0] or "root"
+
+
+def _record_response(response, *args, **kwargs):
+    endpoint = endpoint_name(response.url)
+    HTTP_REQUESTS.labels(endpoint, response.request.method, response.status_code).inc()
+    HTTP_LATENCY.labels(endpoint).observe(response.elapsed.total_seconds())
+
+
+def instrument_session(session):
+    """为 requests 会话添加记录请求指标的响应钩子
+
+    Args:
+        session: requests.Session
+    """
+    hooks = session.hooks.setdefault("response", [])
+    if _record_response not in hooks:
+        hooks.append(_record_response)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]):
+    """导出缓存命中统计，导出时读取，不增加缓存访问路径的开销
+
+    Args:
+        name: 缓存名称
+        stats: 返回包含 hits/misses 或 requests/not_modified 的统计函数
+    """
+    def collect():
+        data = stats()
+        if "hits" in data:
+            hits, misses = data["hits"], data["misses"]
+        else:
+            hits, misses = data["not_modified"], data["requests"] - data["not_modified"]
+        yield "damai_cache_requests_total", {"cache": name, "result": "hit"}, hits
+        yield "damai_cache_requests_total", {"cache": name, "result": "miss"}, misses
+
+    REGISTRY.add_collector("damai_cache_requests_total", "counter", "缓存访问次数", collect, key=name)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int = 9108, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """在后台线程中启动Prometheus文本格式的指标接口
+
+    Args:
+        port: 监听端口
+        host: 监听地址，默认只监听本机
+        registry: 指标注册表，默认为全局注册表
+
+    Returns:
+        ThreadingHTTPServer: 服务器实例，调用 shutdown() 停止
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="damai-metrics", daemon=True)
+    thread.start()
+    logger.info(f"指标接口已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def metrics_server_from_config(config: Dict[str, Any]) -> Optional[ThreadingHTTPServer]:
+    """根据配置启动指标接口
+
+    配置项为 metrics，包含 enabled、port 和 host。未启用时返回None。
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        ThreadingHTTPServer: 服务器实例，未启用或启动失败时为None
+    """
+    metrics_config = config.get("metrics", {})
+    if not metrics_config.get("enabled", False):
+        return None
+    try:
+        return start_metrics_server(metrics_config.get("port", 9108), metrics_config.get("host", "127.0.0.1"))
+    except OSError as e:
+        logger.error(f"指标接口启动失败: {str(e)}")
+        return None
@@ -1,21 +1,24 @@
 # 大麦网移动端API请求模块
 
 import time
-import json
 import random
 import logging
 from typing import Dict, Any, Optional
-from selenium import webdriver # type: ignore
-from selenium.webdriver.chrome.options import Options # type: ignore    
-from selenium.webdriver.chrome.service import Service # type: ignore
-from selenium.webdriver.common.by import By # type: ignore
-from selenium.webdriver.support.ui import WebDriverWait # type: ignore
-from selenium.webdriver.support import expected_conditions as EC # type: ignore
-from appium import webdriver as appium_webdriver # type: ignore
-from appium.webdriver.common.mobileby import MobileBy # type: ignore
-from appium.webdriver.common.touch_action import TouchAction # type: ignore
 import requests
 
+from . import budget, codec, metrics
+from .lazy import lazy_import
+from .appium_session import AppiumSession
+from .stream import DetailScan, scan_detail
+from .conditional import ConditionalCache
+from .sku_index import SkuIndex, SkuPreference, normalize_mobile_sku
+
+# Appium 和 selenium 只在启用Appium时才需要，推迟到首次使用时再导入
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
+MobileBy = lazy_import("appium.webdriver.common.mobileby", "MobileBy")
+TouchAction = lazy_import("appium.webdriver.common.touch_action", "TouchAction")
+
 class DamaiMobileAPI:
     """大麦网移动端API请求类"""
     
@@ -29,14 +32,31 @@ class DamaiMobileAPI:
         self.session = requests.Session()
         self.logger = logging.getLogger("damai.mobile_api")
         self.driver = None
+        self.appium_session: Optional[AppiumSession] = None
+        self.sku_preference = SkuPreference(config)
+        self.sku_indexes: Dict[str, SkuIndex] = {}
+        self.detail_cache = ConditionalCache()
+        # 详情接口返回的JSON即完整数据，可用 ETag / Last-Modified 重新验证
+        self.conditional_detail = config.get("strategy", {}).get("conditional_detail", True)
         self._setup_appium()
         self.setup_session()
+        
+        # 进程内共享的请求预算，已由入口或其他API类配置时沿用
+        budget.configure_budget(config, replace=False)
+        
+        # 导出请求和缓存指标
+        metrics.instrument_session(self.session)
+        metrics.register_cache("mobile_detail_conditional", self.detail_cache.stats)
     
     def _setup_appium(self):
         """设置Appium配置"""
         try:
             # Appium服务器配置
             appium_config = self.config.get("appium", {})
+            if not appium_config.get("enabled", True):
+                # 纯HTTP模式，不加载Appium
+                self.logger.info("未启用Appium，仅使用HTTP接口")
+                return
             desired_caps = {
                 "platformName": "Android",  # 或 "iOS"
                 "platformVersion": appium_config.get("platform_version", ""),  # 安卓版本号
@@ -50,11 +70,9 @@ class DamaiMobileAPI:
                 "resetKeyboard": True  # 重置输入法
             }
             
-            # 连接Appium服务器
-            self.driver = appium_webdriver.Remote(
-                f"http://localhost:{appium_config.get('port', 4723)}/wd/hub",
-                desired_caps
-            )
+            # 连接Appium服务器，优先复用已有会话
+            self.appium_session = AppiumSession("mobile", appium_config, desired_caps)
+            self.driver = self.appium_session.connect()
             
             # 设置隐式等待时间
             self.driver.implicitly_wait(10)
@@ -91,13 +109,15 @@ class DamaiMobileAPI:
             }
             
             # 发送登录请求
+            budget.acquire("login")
             response = self.session.post(
                 "https://m.damai.cn/damai/login/v1/login.html",
-                json=data
+                data=codec.dumps_bytes(data),
+                headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = codec.response_json(response)
                 if result.get("success"):
                     self.logger.info("登录成功")
                     return True
@@ -123,10 +143,22 @@ class DamaiMobileAPI:
         """
         try:
             url = f"https://m.damai.cn/damai/detail/item.html?itemId={show_id}"
-            response = self.session.get(url)
+            budget.acquire("detail")
+            response = self.session.get(url, headers=self._conditional_headers(url))
+            
+            # 内容未变化，直接复用上次解析结果
+            if response.status_code == 304:
+                cached = self.detail_cache.not_modified(url)
+                if cached is not None:
+                    return cached
+                budget.acquire("detail")
+                response = self.session.get(url)
             
             if response.status_code == 200:
-                return response.json()
+                detail = codec.response_json(response)
+                self.detail_cache.store(url, response, detail)
+                self._update_sku_index(show_id, detail)
+                return detail
             else:
                 self.logger.error(f"获取演出详情失败: HTTP {response.status_code}")
                 return {}
@@ -135,6 +167,81 @@ class DamaiMobileAPI:
             self.logger.error(f"获取演出详情时发生错误: {str(e)}")
             return {}
     
+    def scan_show_detail(self, show_id: str) -> Optional[DetailScan]:
+        """流式获取演出详情，只解析到 canBuy 和按偏好最优的可用票档为止
+        
+        Args:
+            show_id: 演出ID
+            
+        Returns:
+            DetailScan: 扫描结果，请求失败返回None
+        """
+        url = f"https://m.damai.cn/damai/detail/item.html?itemId={show_id}"
+        # 扫描结果取决于响应内容和选择票档时的偏好，两者都未变化时才能复用
+        preference = self.sku_preference
+        cache_key = f"scan:{preference.key}:{url}"
+        try:
+            budget.acquire("detail")
+            response = self.session.get(url, stream=True, headers=self._conditional_headers(cache_key))
+            try:
+                if response.status_code == 304:
+                    cached = self.detail_cache.not_modified(cache_key)
+                    if cached is not None:
+                        return cached
+                    response.close()
+                    budget.acquire("detail")
+                    response = self.session.get(url, stream=True)
+                if response.status_code != 200:
+                    self.logger.error(f"获取演出详情失败: HTTP {response.status_code}")
+                    return None
+                # 与票档索引使用相同的优先级和场次偏好选择票档
+                scan = scan_detail(response.iter_content(chunk_size=8192), preference.accepts,
+                                   preference.rank, preference.best_rank)
+                self.detail_cache.store(cache_key, response, scan)
+                self.logger.debug(f"流式解析演出详情: 读取 {scan.bytes_read} 字节, 完整解析: {scan.complete}")
+                return scan
+            finally:
+                # 提前结束时关闭连接，丢弃未读取的数据
+                response.close()
+                
+        except Exception as e:
+            self.logger.error(f"获取演出详情时发生错误: {str(e)}")
+            return None
+    
+    def _conditional_headers(self, key: str) -> Dict[str, str]:
+        """生成条件请求头，未启用 strategy.conditional_detail 时为空"""
+        if not self.conditional_detail:
+            return {}
+        return self.detail_cache.headers(key)
+    
+    def _update_sku_index(self, show_id: str, detail: Dict[str, Any]):
+        """构建或原地刷新演出的票档索引
+        
+        Args:
+            show_id: 演出ID
+            detail: 演出详情信息
+        """
+        entries = [normalize_mobile_sku(sku) for sku in detail.get("skuList", []) or []]
+        index = self.sku_indexes.get(show_id)
+        if index is None:
+            index = SkuIndex(self.sku_preference)
+            for entry in entries:
+                index.add(entry)
+            self.sku_indexes[show_id] = index
+        else:
+            index.refresh(entries)
+    
+    def sku_index(self, show_id: str) -> Optional[SkuIndex]:
+        """获取演出的票档索引
+        
+        Args:
+            show_id: 演出ID
+            
+        Returns:
+            SkuIndex: 票档索引，尚未获取过详情时返回None
+        """
+        return self.sku_indexes.get(show_id)
+    
     def buy_ticket(self, show_id: str) -> Dict[str, Any]:
         """购买门票
         
@@ -145,24 +252,26 @@ class DamaiMobileAPI:
             Dict: 购票结果
         """
         try:
-            # 获取演出详情
-            detail = self.get_show_detail(show_id)
-            if not detail:
-                return {"success": False, "message": "获取演出详情失败"}
+            if self.config.get("strategy", {}).get("stream_detail", True):
+                # 流式解析，拿到决策所需字段后立即停止下载
+                scan = self.scan_show_detail(show_id)
+                if scan is None:
+                    return {"success": False, "message": "获取演出详情失败"}
+                can_buy = scan.can_buy
+                available_sku = scan.sku
+            else:
+                # 获取演出详情
+                detail = self.get_show_detail(show_id)
+                if not detail:
+                    return {"success": False, "message": "获取演出详情失败"}
+                can_buy = detail.get("canBuy")
+                best = self.sku_indexes[show_id].best()
+                available_sku = best.raw if best else None
             
             # 检查是否可以购买
-            if not detail.get("canBuy"):
+            if not can_buy:
                 return {"success": False, "message": "当前不可购买"}
             
-            # 选择票档
-            sku_list = detail.get("skuList", [])
-            available_sku = None
-            
-            for sku in sku_list:
-                if sku.get("inventory") > 0:
-                    available_sku = sku
-                    break
-            
             if not available_sku:
                 return {"success": False, "message": "无可用票档"}
             
@@ -176,22 +285,28 @@ class DamaiMobileAPI:
             }
             
             # 提交订单
+            budget.acquire("order")
             response = self.session.post(
                 "https://m.damai.cn/damai/create/v1/order.html",
-                json=order_data
+                data=codec.dumps_bytes(order_data),
+                headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = codec.response_json(response)
                 if result.get("success"):
+                    metrics.ORDER_ATTEMPTS.labels("mobile", "success").inc()
                     return {"success": True, "message": "下单成功"}
                 else:
+                    metrics.ORDER_ATTEMPTS.labels("mobile", "failure").inc()
                     return {"success": False, "message": result.get("message")}
             else:
+                metrics.ORDER_ATTEMPTS.labels("mobile", "failure").inc()
                 return {"success": False, "message": f"提交订单失败: HTTP {response.status_code}"}
             
         except Exception as e:
             self.logger.error(f"购票过程发生错误: {str(e)}")
+            metrics.ORDER_ATTEMPTS.labels("mobile", "error").inc()
             return {"success": False, "message": f"购票出错: {str(e)}"}
     
     def submit_order(self, show_url: str) -> Dict[str, Any]:
@@ -203,9 +318,13 @@ class DamaiMobileAPI:
         Returns:
             Dict: 订单提交结果
         """
+        if self.driver is None:
+            return {"success": False, "message": "未启用Appium，无法通过页面提交订单"}
+        
         try:
             # 转换为移动端URL
             mobile_url = show_url.replace("detail.damai.cn", "m.damai.cn/damai/detail/item.html")
+            budget.acquire("order")
             self.driver.get(mobile_url)
             self.logger.info("正在加载演出详情页")
             
@@ -369,8 +488,14 @@ class DamaiMobileAPI:
     
     def close(self):
         """关闭驱动"""
-        if self.driver:
-            self.driver.quit()
+        stats = self.detail_cache.stats()
+        self.logger.info(
+            f"演出详情条件请求: 共 {stats['requests']} 次, 304命中 {stats['not_modified']} 次 "
+            f"({stats['hit_rate']:.1%})"
+        )
+        if self.appium_session:
+            self.appium_session.close()
+            self.appium_session = None
             self.driver = None
             self.logger.info("已关闭移动端驱动")
         try:
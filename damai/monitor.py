@@ -6,25 +6,60 @@ import threading
 from typing import Dict, Any, List, Callable
 from datetime import datetime
 
+from . import events, metrics
 from .api import DamaiAPI
+from .circuit import CircuitOpenError
+from .config import apply_safe_keys
+from .schema import ConfigError, thaw, validate_config
+from .settings import Settings, as_settings
+from .ratecontrol import controller_from_config
+
+STATUS_CHECKS = metrics.counter("damai_status_checks_total", "票务状态检查次数", ("result",))
+STATUS_CHECK_SECONDS = metrics.histogram("damai_status_check_seconds", "票务状态检查耗时（含页面加载）")
+SEARCH_SECONDS = metrics.histogram("damai_search_seconds", "目标演出搜索耗时")
+TRANSITIONS = metrics.counter("damai_status_transitions_total", "票务状态变化次数")
+MONITOR_ERRORS = metrics.counter("damai_monitor_errors_total", "监控循环异常次数")
+TARGET_SHOWS = metrics.gauge("damai_target_shows", "当前监控的目标演出数量")
+MONITOR_LOOPS = metrics.counter("damai_monitor_loops_total", "监控循环次数")
 
 class TicketMonitor:
     """票务监控类，负责监控目标演出的票务状态"""
     
-    def __init__(self, config: Dict[str, Any], api: DamaiAPI):
+    def __init__(self, config: Any, api: DamaiAPI):
         """初始化票务监控器
         
         Args:
-            config: 配置信息
+            config: Settings 或配置信息，未校验时在这里校验
             api: DamaiAPI实例
+            
+        Raises:
+            ConfigError: 配置校验失败
         """
-        self.config = config
+        self._load_settings(as_settings(config))
         self.api = api
         self.logger = logging.getLogger("damai.monitor")
         self.running = False
         self.monitor_thread = None
         self.target_shows = []
         self.callbacks = []
+        self.transition_hooks = []
+        self._last_status: Dict[str, str] = {}
+        
+        # 自适应轮询速率，normal/rush 间隔作为速率上限
+        self.rate = controller_from_config(self.config, self.normal_interval)
+    
+    def _load_settings(self, settings: Settings):
+        """取出监控循环用到的设置，循环中不再查找配置"""
+        self.settings = settings
+        self.config = settings.config
+        self.normal_interval = settings.strategy.normal_interval
+        self.rush_interval = settings.strategy.rush_interval
+        self.max_attempts = settings.strategy.max_attempts
+        self.keyword = settings.target.keyword
+        self.start_date = settings.target.start_date
+        self.end_date = settings.target.end_date
+        self.min_price = settings.target.min_price
+        self.max_price = settings.target.max_price
     
     def add_callback(self, callback: Callable[[Dict[str, Any]], None]):
         """添加票务状态变化回调函数
@@ -46,27 +81,84 @@ class TicketMonitor:
             except Exception as e:
                 self.logger.error(f"执行回调函数失败: {str(e)}")
     
+    def add_transition_hook(self, hook: Callable[[Dict[str, Any], str, str], None]):
+        """添加票务状态变化钩子
+        
+        Args:
+            hook: 钩子函数，参数为演出信息、原状态文本和新状态文本
+        """
+        self.transition_hooks.append(hook)
+    
+    def _on_status_transition(self, show: Dict[str, Any], old: str, new: str):
+        """票务状态变化时使缓存失效并调用钩子
+        
+        Args:
+            show: 演出信息
+            old: 原状态文本
+            new: 新状态文本
+        """
+        self.logger.info(f"票务状态变化: {show['title']} {old} -> {new}")
+        TRANSITIONS.inc()
+        events.emit("transition", url=show["link"], title=show["title"], old=old, new=new)
+        self.api.invalidate_show(show["link"])
+        for hook in self.transition_hooks:
+            try:
+                hook(show, old, new)
+            except Exception as e:
+                self.logger.error(f"执行状态变化钩子失败: {str(e)}")
+    
+    def reload_config(self, new_config: Dict[str, Any]) -> List[str]:
+        """热更新可以安全修改的配置项，供配置文件监视器回调
+        
+        Args:
+            new_config: 新加载的配置
+            
+        Returns:
+            List: 已更新的配置项
+        """
+        # 新配置先校验并填充缺省值，与运行中的配置按同样的形式比较
+        try:
+            new_config = thaw(validate_config(new_config))
+        except ConfigError as e:
+            self.logger.error(f"新配置校验失败，保持原配置: {str(e)}")
+            return []
+        config = thaw(self.config)
+        changed = apply_safe_keys(config, new_config)
+        if not changed:
+            return changed
+        self._load_settings(as_settings(config))
+        # 票档偏好（价格区间）由API和已有的票档索引共用，一并更新
+        self.api.apply_settings(self.settings)
+        self.logger.info(f"配置已热更新: {', '.join(changed)}")
+        if "strategy.monitor_interval" in changed:
+            self.rate.set_min_interval(self.normal_interval)
+        if any(key.startswith("target.") for key in changed):
+            # 筛选条件变化，下次循环重新搜索目标演出
+            self.target_shows = []
+        return changed
+    
     def search_target_shows(self) -> List[Dict[str, Any]]:
         """搜索目标演出
         
         Returns:
             List: 符合条件的演出列表
         """
-        keyword = self.config["target"]["keyword"]
+        keyword = self.keyword
+        start = time.perf_counter()
         search_results = self.api.search_shows(keyword)
+        search_duration = time.perf_counter() - start
+        SEARCH_SECONDS.observe(search_duration)
         
         # 筛选符合条件的演出
         filtered_shows = []
-        date_range = self.config["target"]["date_range"]
-        price_range = self.config["target"]["price_range"]
+        start_date, end_date = self.start_date, self.end_date
+        min_allowed, max_allowed = self.min_price, self.max_price
         
         for show in search_results["results"]:
             # 解析日期
             try:
                 show_date_str = show["time"].split()[0]
                 show_date = datetime.strptime(show_date_str, "%Y.%m.%d")
-                start_date = datetime.strptime(date_range["start"], "%Y-%m-%d")
-                end_date = datetime.strptime(date_range["end"], "%Y-%m-%d")
                 
                 # 检查日期是否在范围内
                 if start_date <= show_date <= end_date:
@@ -75,12 +167,15 @@ class TicketMonitor:
                     min_price = float(price_text[0])
                     
                     # 检查价格是否在范围内
-                    if price_range["min"] <= min_price <= price_range["max"]:
+                    if min_allowed <= min_price <= max_allowed:
                         filtered_shows.append(show)
             except Exception as e:
                 self.logger.warning(f"解析演出信息失败: {str(e)}")
         
         self.logger.info(f"找到 {len(filtered_shows)} 个符合条件的演出")
+        TARGET_SHOWS.set(len(filtered_shows))
+        events.emit("search", search_duration, keyword=keyword,
+                    results=len(search_results["results"]), matched=len(filtered_shows))
         return filtered_shows
     
     def start_monitoring(self):
@@ -90,7 +185,7 @@ class TicketMonitor:
             return
         
         self.running = True
-        self.monitor_thread = threading.Thread(target=self._monitoring_task)
+        self.monitor_thread = threading.Thread(target=self._monitoring_task, name="damai-monitor")
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
         self.logger.info("票务监控已启动")
@@ -106,26 +201,57 @@ class TicketMonitor:
     def _monitoring_task(self):
         """监控任务主循环"""
         attempt_count = 0
-        max_attempts = self.config["strategy"]["max_attempts"]
+        max_attempts = self.max_attempts
+        events.emit("monitor", action="start", max_attempts=max_attempts)
+        checks_available = STATUS_CHECKS.labels("available")
+        checks_unavailable = STATUS_CHECKS.labels("unavailable")
         
         while self.running and attempt_count < max_attempts:
+            self.rate.mark()
             try:
                 # 如果目标演出列表为空，则搜索目标演出
                 if not self.target_shows:
                     self.target_shows = self.search_target_shows()
                     if not self.target_shows:
                         self.logger.warning("未找到符合条件的演出，将在下次循环重新搜索")
-                        time.sleep(self.config["strategy"]["monitor_interval"]["normal"])
+                        self.rate.wait()
                         continue
                 
                 # 检查每个目标演出的票务状态
                 for show in self.target_shows:
-                    status = self.api.check_ticket_status(show["link"])
+                    start = time.perf_counter()
+                    try:
+                        status = self.api.check_ticket_status(show["link"])
+                    except CircuitOpenError as e:
+                        # 熔断只跳过这场演出，其余演出照常检查
+                        self.logger.debug(str(e))
+                        continue
+                    duration = time.perf_counter() - start
+                    self.rate.record(duration)
+                    STATUS_CHECK_SECONDS.observe(duration)
+                    (checks_available if status["can_buy"] else checks_unavailable).inc()
+                    events.emit("status_check", duration, url=show["link"],
+                                can_buy=status["can_buy"], status_text=status["status_text"])
+                    
+                    # 记录状态文本，状态变化时使缓存失效
+                    status_text = status["status_text"]
+                    show["status_text"] = status_text
+                    last_text = self._last_status.get(show["link"])
+                    self._last_status[show["link"]] = status_text
+                    if last_text is not None and last_text != status_text:
+                        self._on_status_transition(show, last_text, status_text)
                     
                     # 如果有票，通知回调函数
                     if status["can_buy"]:
                         self.logger.info(f"发现可购买票: {show['title']}")
                         status["show_info"] = show
+                        
+                        # 详情页已加载，预先写入缓存供下单流程复用
+                        self.api.prime_show_detail(show["link"])
+                        
+                        # 与下单流程共用票档索引
+                        index = self.api.sku_index(show["link"])
+                        status["best_sku"] = index.best() if index else None
                         self._notify_callbacks(status)
                     
                     # 添加随机延迟
@@ -133,25 +259,45 @@ class TicketMonitor:
                 
                 # 增加尝试次数
                 attempt_count += 1
-                self.logger.debug(f"监控循环 {attempt_count}/{max_attempts}")
+                MONITOR_LOOPS.inc()
+                self.logger.debug(
+                    f"监控循环 {attempt_count}/{max_attempts}, 轮询间隔 {self.rate.interval():.2f}s, "
+                    f"实际速率 {self.rate.effective_rate():.3f} 次/秒"
+                )
                 
-                # 根据策略设置不同的监控间隔
-                if any(show["status_text"] == "即将开抢" for show in self.target_shows):
+                # 根据策略设置不同的速率上限
+                if any(show.get("status_text") == "即将开抢" for show in self.target_shows):
                     # 爆发模式 - 即将开抢时使用更短的间隔
-                    interval = self.config["strategy"]["monitor_interval"]["rush"]
+                    self.rate.set_min_interval(self.rush_interval)
                 else:
                     # 常规模式
-                    interval = self.config["strategy"]["monitor_interval"]["normal"]
+                    self.rate.set_min_interval(self.normal_interval)
                 
-                time.sleep(interval)
+                self.rate.wait()
+                
+            except CircuitOpenError as e:
+                # 搜索熔断期间调用已被快速跳过，失败时已经退避过，这里只等待下一轮
+                self.logger.debug(str(e))
+                self.rate.wait()
                 
             except Exception as e:
                 self.logger.error(f"监控任务异常: {str(e)}")
-                time.sleep(self.config["strategy"]["monitor_interval"]["normal"])
+                MONITOR_ERRORS.inc()
+                events.emit("error", source="monitor", error_type=type(e).__name__, message=str(e))
+                # 出错或超时时退避
+                self.rate.record(ok=False)
+                self.rate.wait()
         
         if attempt_count >= max_attempts:
             self.logger.info(f"已达到最大尝试次数 {max_attempts}，监控停止")
         
+        stats = self.rate.stats()
+        self.logger.info(
+            f"轮询速率: 当前间隔 {stats['interval']:.2f}s, 实际速率 {stats['effective_rate']:.3f} 次/秒, "
+            f"退避 {stats['backoffs']} 次"
+        )
+        
+        events.emit("monitor", action="stop", attempts=attempt_count)
         self.running = False
     
     def is_running(self) -> bool:
@@ -2,23 +2,36 @@
 
 import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 
+from . import events, metrics
 from .api import DamaiAPI
+from .settings import Settings, as_settings
+
+ORDER_STEP_SECONDS = metrics.histogram("damai_order_step_seconds", "下单各步骤耗时", ("step",))
 
 class OrderProcessor:
     """订单处理类，负责处理订单提交和支付流程"""
     
-    def __init__(self, config: Dict[str, Any], api: DamaiAPI):
+    def __init__(self, config: Any, api: DamaiAPI):
         """初始化订单处理器
         
         Args:
-            config: 配置信息
+            config: Settings 或配置信息，未校验时在这里校验
             api: DamaiAPI实例
         """
-        self.config = config
         self.api = api
         self.logger = logging.getLogger("damai.order")
+        self.apply_settings(as_settings(config))
+    
+    def apply_settings(self, settings: Settings):
+        """应用设置，配置热更新时调用
+        
+        Args:
+            settings: 已校验的设置
+        """
+        self.settings = settings
+        self.config = settings.config
     
     def process_order(self, show_info: Dict[str, Any]) -> Dict[str, Any]:
         """处理订单
@@ -31,76 +44,55 @@ class OrderProcessor:
         """
         self.logger.info(f"开始处理订单: {show_info['title']}")
         
+        url = show_info["link"]
+        
         # 获取演出详情
-        show_detail = self.api.get_show_detail(show_info["link"])
+        with ORDER_STEP_SECONDS.labels("detail").time(), \
+                events.timed("order_step", step="detail", url=url) as event:
+            show_detail = self.api.get_show_detail(url)
+            event["success"] = "error" not in show_detail
         if "error" in show_detail:
             self.logger.error(f"获取演出详情失败: {show_detail['error']}")
+            events.emit("error", source="order", step="detail", message=show_detail["error"])
+            metrics.ORDER_ATTEMPTS.labels("web", "detail_failed").inc()
             return {"success": False, "message": f"获取演出详情失败: {show_detail['error']}"}
         
         # 选择最佳票档
-        best_price = self._select_best_price(show_detail["prices"])
+        best_price = self._select_best_price(url)
+        events.emit("order_step", step="select_price", url=url,
+                    success=bool(best_price), price=best_price and best_price["text"])
         if not best_price:
             self.logger.warning("未找到合适的票档")
+            metrics.ORDER_ATTEMPTS.labels("web", "no_price").inc()
             return {"success": False, "message": "未找到合适的票档"}
         
         self.logger.info(f"选择票档: {best_price['text']} - {best_price['value']}")
         
         # 提交订单
-        order_result = self.api.submit_order(show_info["link"])
+        with ORDER_STEP_SECONDS.labels("submit").time(), \
+                events.timed("order_step", step="submit", url=url) as event:
+            order_result = self.api.submit_order(url)
+            event["success"] = order_result["success"]
+            event["message"] = order_result["message"]
+        metrics.ORDER_ATTEMPTS.labels("web", "success" if order_result["success"] else "failure").inc()
         
         return order_result
     
-    def _select_best_price(self, prices: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _select_best_price(self, show_url: str) -> Optional[Dict[str, Any]]:
         """选择最佳票档
         
+        使用API在获取详情时构建的票档索引，按票档优先级和场次偏好选择
+        有库存且价格在范围内的票档。
+        
         Args:
-            prices: 票档列表
+            show_url: 演出详情页URL
             
         Returns:
             Dict: 最佳票档信息
         """
-        if not prices:
-            return None
-        
-        # 获取票档优先级配置
-        priority_config = self.config["ticket_priority"]
-        price_range = self.config["target"]["price_range"]
-        
-        # 按优先级排序票档
-        prioritized_prices = []
-        
-        # 首先检查是否有匹配优先级配置的票档
-        for price in prices:
-            price_text = price["text"]
-            price_value = float(price["value"].replace("¥", ""))
-            
-            # 检查价格是否在范围内
-            if price_value < price_range["min"] or price_value > price_range["max"]:
-                continue
-            
-            # 检查是否匹配优先级配置
-            priority = 999  # 默认优先级最低
-            for p_config in priority_config:
-                if p_config["name"] in price_text:
-                    priority = p_config["priority"]
-                    break
-            
-            prioritized_prices.append({
-                "text": price_text,
-                "value": price["value"],
-                "priority": priority
-            })
-        
-        # 按优先级排序
-        prioritized_prices.sort(key=lambda x: x["priority"])
-        
-        # 如果没有匹配优先级的票档，则返回价格范围内的第一个票档
-        if not prioritized_prices:
-            for price in prices:
-                price_value = float(price["value"].replace("¥", ""))
-                if price_range["min"] <= price_value <= price_range["max"]:
-                    return price
+        index = self.api.sku_index(show_url)
+        if index is None:
             return None
         
-        # 返回优先级最高的票档
-        return prioritized_prices[0]
\ No newline at end of file
+        best = index.best()
+        return best.to_dict() if best else None
@@ -0,0 +1,429 @@
+# 大麦网启动性能分析模块
+
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PROFILE_FLAG = "--profile-startup"
+
+logger = logging.getLogger("damai.profiling")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame, root: str) -> str:
+    """把调用栈折叠为 "根;外层帧;...;内层帧" 形式的字符串"""
+    stack: List[str] = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    stack.append(root)
+    stack.reverse()
+    return ";".join(stack)
+
+
+def _write_collapsed(counts: Dict[str, int], path: str):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(counts.items()):
+            f.write(f"{stack} {count}\n")
+
+
+class StackSampler:
+    """采样线程调用栈，生成可直接用于火焰图的折叠栈（collapsed stack）数据"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        """初始化采样器
+
+        Args:
+            thread_id: 要采样的线程ID，默认为创建采样器的线程
+            interval: 采样间隔（秒）
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.label: Optional[str] = None  # 为None时不记录样本
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动采样线程"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="damai-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止采样线程"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            label = self.label
+            if label is None:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.counts[_collapse(frame, label)] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str):
+        """写出折叠栈文件，每行为 "栈帧;栈帧;... 样本数"
+
+        Args:
+            path: 输出文件路径
+        """
+        _write_collapsed(self.counts, path)
+
+
+class NullStartupProfiler:
+    """未启用启动分析时使用的空实现"""
+
+    enabled = False
+
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+    def record(self, name: str, elapsed: float):
+        pass
+
+    def finish(self) -> List[Tuple[str, float]]:
+        return []
+
+
+class StartupProfiler:
+    """启动分析器，分阶段记录耗时，并可输出cProfile统计和折叠栈文件"""
+
+    enabled = True
+
+    def __init__(self, name: str = "startup", output_dir: Optional[str] = None, interval: float = 0.005):
+        """初始化启动分析器
+
+        Args:
+            name: 名称，用作输出文件名前缀
+            output_dir: 输出目录，None表示只打印各阶段耗时
+            interval: 调用栈采样间隔（秒）
+        """
+        self.name = name
+        self.output_dir = output_dir
+        self.phases: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+        self._stack: List[list] = []  # [阶段名称, 内层阶段耗时]
+        self._finished = False
+        self._profile = None
+        self._sampler = None
+        if output_dir:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._sampler = StackSampler(interval=interval)
+            self._sampler.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个启动阶段的耗时
+
+        阶段可以嵌套，外层阶段只计入不属于内层阶段的时间，各阶段之和即为总耗时。
+
+        Args:
+            name: 阶段名称，如 import、config、logging、driver、login
+        """
+        parent = self._stack[-1][0] if self._stack else None
+        entry = [name, 0.0]
+        self._stack.append(entry)
+        if self._sampler is not None:
+            self._sampler.label = name
+        if self._profile is not None and parent is None:
+            self._profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            elif self._profile is not None:
+                self._profile.disable()
+            if self._sampler is not None:
+                self._sampler.label = parent
+            self.phases.append((name, elapsed - entry[1]))
+
+    def record(self, name: str, elapsed: float):
+        """记录在其他线程中测得的阶段耗时，与主线程阶段可能重叠
+
+        Args:
+            name: 阶段名称
+            elapsed: 耗时秒数
+        """
+        self.phases.append((name, elapsed))
+
+    def finish(self) -> List[Tuple[str, float]]:
+        """结束分析，打印各阶段耗时并写出分析文件
+
+        Returns:
+            List: (阶段名称, 耗时秒数)
+        """
+        if self._finished:
+            return self.phases
+        self._finished = True
+        wall = time.perf_counter() - self.started
+        measured = sum(elapsed for _, elapsed in self.phases)
+
+        lines = [f"启动分析 [{self.name}]"]
+        for name, elapsed in self.phases:
+            share = elapsed / measured if measured else 0.0
+            lines.append(f"  {name:<10} {elapsed * 1000:10.1f} ms  {share:6.1%}")
+        lines.append(f"  {'合计':<10} {measured * 1000:10.1f} ms")
+        lines.append(f"  {'阶段外':<10} {(wall - measured) * 1000:10.1f} ms")
+
+        if self.output_dir:
+            if not os.path.exists(self.output_dir):
+                os.makedirs(self.output_dir)
+            self._sampler.stop()
+            stats_path = os.path.join(self.output_dir, f"{self.name}.pstats")
+            collapsed_path = os.path.join(self.output_dir, f"{self.name}.collapsed")
+            self._profile.dump_stats(stats_path)
+            self._sampler.write_collapsed(collapsed_path)
+            lines.append(f"  cProfile统计: {stats_path}")
+            lines.append(f"  折叠栈({self._sampler.samples} 个样本): {collapsed_path}")
+
+        sys.stderr.write("\n".join(lines) + "\n")
+        return self.phases
+
+
+def startup_profiler(name: str, argv: Optional[List[str]] = None):
+    """根据命令行参数创建启动分析器
+
+    支持 --profile-startup（只打印各阶段耗时）和 --profile-startup=目录
+    （额外输出 .pstats 和 .collapsed 文件）。该参数会从argv中移除，
+    避免argparse或Kivy把它当作未知参数。
+
+    Args:
+        name: 入口名称，用作输出文件名前缀
+        argv: 命令行参数列表，默认为sys.argv
+
+    Returns:
+        StartupProfiler: 启动分析器，未指定参数时返回空实现
+    """
+    if argv is None:
+        argv = sys.argv
+    for i, arg in enumerate(argv[1:], 1):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + "="):
+            del argv[i]
+            output_dir = arg.partition("=")[2] or None
+            return StartupProfiler(name, output_dir)
+    return NullStartupProfiler()
+
+
+class LiveProfiler:
+    """运行期采样分析器
+
+    后台线程按较低频率采样指定线程（默认为主线程/UI线程、监控线程和回调所在线程）
+    的调用栈，汇总为折叠栈计数。可通过信号（默认SIGUSR2）或控制文件在运行时开关，
+    关闭时写出折叠栈文件并记录采样开销。
+    """
+
+    DEFAULT_THREADS = ("MainThread", "damai-monitor")
+
+    def __init__(self, output: str = os.path.join("logs", "live_profile.collapsed"),
+                 interval: float = 0.1,
+                 threads: Iterable[str] = DEFAULT_THREADS,
+                 control_file: Optional[str] = None,
+                 poll_interval: float = 1.0):
+        """初始化运行期采样分析器
+
+        Args:
+            output: 折叠栈输出文件路径
+            interval: 采样间隔（秒），默认10Hz
+            threads: 要采样的线程名称，以 "*" 结尾表示前缀匹配
+            control_file: 控制文件路径，文件存在时采样，删除后停止并写出结果
+            poll_interval: 未采样时检查控制文件的间隔（秒）
+        """
+        self.output = output
+        self.interval = interval
+        self.threads = tuple(threads)
+        self.control_file = control_file
+        self.poll_interval = poll_interval
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples = 0
+        self.sampling = False
+        self._requested = False
+        self._busy = 0.0  # 采样本身消耗的时间
+        self._active = 0.0  # 处于采样状态的总时间
+        self._active_since = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _match(self, name: str) -> bool:
+        for pattern in self.threads:
+            if pattern.endswith("*"):
+                if name.startswith(pattern[:-1]):
+                    return True
+            elif name == pattern:
+                return True
+        return False
+
+    def start(self):
+        """启动后台线程（初始不采样，等待开启）"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="damai-live-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程，如正在采样则写出结果"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.sampling:
+            self._set_sampling(False)
+
+    def enable(self):
+        """开始采样"""
+        self._requested = True
+
+    def disable(self):
+        """停止采样并写出结果"""
+        self._requested = False
+
+    def toggle(self):
+        """切换采样状态"""
+        self._requested = not self._requested
+
+    def install_signal(self, signum: Optional[int] = None) -> bool:
+        """注册切换采样的信号处理函数，只能在主线程调用
+
+        Args:
+            signum: 信号编号，默认SIGUSR2
+
+        Returns:
+            bool: 是否注册成功（Windows没有SIGUSR2）
+        """
+        if signum is None:
+            signum = getattr(signal, "SIGUSR2", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda sig, frame: self.toggle())
+        return True
+
+    def _set_sampling(self, on: bool):
+        now = time.perf_counter()
+        if on:
+            self._active_since = now
+            self.sampling = True
+            logger.info(f"开始运行期采样，间隔 {self.interval * 1000:.0f} ms")
+        else:
+            self.sampling = False
+            self._active += now - self._active_since
+            path = self.dump()
+            stats = self.stats()
+            logger.info(
+                f"停止运行期采样: {stats['samples']} 个样本, "
+                f"采样开销 {stats['overhead']:.3%}, 已写入 {path}"
+            )
+
+    def _run(self):
+        control_exists = False
+        while not self._stop.is_set():
+            if self.control_file:
+                # 只在控制文件出现或消失时切换，不覆盖信号的切换结果
+                exists = os.path.exists(self.control_file)
+                if exists != control_exists:
+                    control_exists = exists
+                    self._requested = exists
+            if self._requested != self.sampling:
+                self._set_sampling(self._requested)
+            if not self.sampling:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            start = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            own = threading.get_ident()
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, frame in frames.items():
+                    name = names.get(ident)
+                    if ident == own or name is None or not self._match(name):
+                        continue
+                    self.counts[_collapse(frame, name)] += 1
+                    self.samples += 1
+            self._busy += time.perf_counter() - start
+            self._stop.wait(self.interval)
+
+    def dump(self) -> str:
+        """写出当前累计的折叠栈
+
+        Returns:
+            str: 输出文件路径
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        _write_collapsed(counts, self.output)
+        return self.output
+
+    def stats(self) -> Dict[str, Any]:
+        """获取采样统计
+
+        Returns:
+            Dict: 样本数、是否正在采样和采样开销（占采样期间墙钟时间的比例）
+        """
+        active = self._active
+        if self.sampling:
+            active += time.perf_counter() - self._active_since
+        return {
+            "samples": self.samples,
+            "sampling": self.sampling,
+            "overhead": self._busy / active if active else 0.0,
+        }
+
+
+def live_profiler_from_config(config: Dict[str, Any]) -> Optional[LiveProfiler]:
+    """根据配置创建并启动运行期采样分析器
+
+    配置项为 profiling.live，包含 enabled（启动时即开始采样）、interval、output、
+    threads 和 control_file。未配置时返回None。
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        LiveProfiler: 已启动的分析器，未配置时为None
+    """
+    live_config = config.get("profiling", {}).get("live")
+    if not live_config:
+        return None
+    profiler = LiveProfiler(
+        output=live_config.get("output", os.path.join("logs", "live_profile.collapsed")),
+        interval=live_config.get("interval", 0.1),
+        threads=live_config.get("threads", LiveProfiler.DEFAULT_THREADS),
+        control_file=live_config.get("control_file")
+    )
+    profiler.install_signal()
+    if live_config.get("enabled", False):
+        profiler.enable()
+    profiler.start()
+    return profiler
@@ -0,0 +1,185 @@
+# 大麦网自适应轮询速率控制模块
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+from . import metrics
+
+POLL_RATE = metrics.gauge("damai_poll_rate", "当前允许的轮询速率（次/秒）", ("controller",))
+POLL_EFFECTIVE_RATE = metrics.gauge("damai_poll_effective_rate", "最近一段时间实际的轮询速率（次/秒）", ("controller",))
+POLL_BACKOFFS = metrics.counter("damai_poll_backoffs_total", "轮询退避次数", ("controller", "reason"))
+
+
+class AIMDController:
+    """加性增、乘性减（AIMD）的轮询速率控制器
+
+    每次正常响应把速率增加上限的固定比例，直到不超过上限；出错、超时或响应过慢时
+    把速率乘以退避系数，但不低于下限。速率以 次/秒 表示，等待间隔为其倒数。
+    """
+
+    def __init__(self, min_interval: float, max_interval: float = 30.0,
+                 additive: float = 0.1, backoff: float = 0.5,
+                 slow_threshold: Optional[float] = 5.0,
+                 adaptive: bool = True, window: float = 60.0, name: str = "monitor"):
+        """初始化速率控制器
+
+        Args:
+            min_interval: 最小间隔（秒），即速率上限的倒数
+            max_interval: 最大间隔（秒），即退避后速率下限的倒数
+            additive: 每次正常响应增加的速率，占速率上限的比例
+            backoff: 退避时速率乘以的系数
+            slow_threshold: 响应耗时超过该值（秒）视为过慢，None表示不检查
+            adaptive: 是否启用自适应，关闭时始终按最小间隔轮询
+            window: 统计实际速率的时间窗口（秒）
+            name: 控制器名称，用于日志和指标
+        """
+        self.max_interval = max_interval
+        self.additive = additive
+        self.backoff = backoff
+        self.slow_threshold = slow_threshold
+        self.adaptive = adaptive
+        self.window = window
+        self.name = name
+        self.logger = logging.getLogger("damai.ratecontrol")
+        self._lock = threading.Lock()
+        self._ceiling = 1.0 / max(min_interval, 1e-3)
+        self._floor = 1.0 / max_interval
+        self._rate = self._ceiling
+        self._last_start: Optional[float] = None
+        self._starts: deque = deque()
+        self.backoffs = 0
+        self._rate_gauge = POLL_RATE.labels(name)
+        self._effective_gauge = POLL_EFFECTIVE_RATE.labels(name)
+        self._rate_gauge.set(self._rate)
+
+    @property
+    def rate(self) -> float:
+        """当前允许的速率（次/秒）"""
+        return self._rate
+
+    def interval(self) -> float:
+        """当前的轮询间隔（秒）"""
+        return 1.0 / self._rate
+
+    def set_min_interval(self, min_interval: float):
+        """调整速率上限，例如即将开抢时切换到更短的间隔
+
+        Args:
+            min_interval: 最小间隔（秒）
+        """
+        with self._lock:
+            self._ceiling = max(1.0 / max(min_interval, 1e-3), self._floor)
+            if not self.adaptive or self._rate > self._ceiling:
+                self._rate = self._ceiling
+            self._rate_gauge.set(self._rate)
+
+    def record(self, latency: Optional[float] = None, ok: bool = True):
+        """记录一次请求结果并调整速率
+
+        Args:
+            latency: 响应耗时（秒），None表示未知
+            ok: 请求是否正常完成，出错或超时时为False
+        """
+        if not self.adaptive:
+            return
+        if not ok:
+            self._back_off("error")
+        elif self.slow_threshold is not None and latency is not None and latency > self.slow_threshold:
+            self._back_off("slow")
+        else:
+            with self._lock:
+                self._rate = min(self._ceiling, self._rate + self.additive * self._ceiling)
+                self._rate_gauge.set(self._rate)
+
+    def _back_off(self, reason: str):
+        with self._lock:
+            old = self._rate
+            self._rate = max(self._floor, self._rate * self.backoff)
+            self._rate_gauge.set(self._rate)
+            self.backoffs += 1
+        POLL_BACKOFFS.labels(self.name, reason).inc()
+        if self._rate < old:
+            self.logger.info(f"[{self.name}] 轮询退避({reason}): 间隔 {1 / old:.2f}s -> {1 / self._rate:.2f}s")
+
+    def wait(self, stop: Optional[threading.Event] = None) -> float:
+        """等待到下一次允许轮询的时间
+
+        间隔从上一次 mark() 开始计算，请求本身的耗时计入间隔内。
+
+        Args:
+            stop: 停止事件，设置后立即返回
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        now = time.monotonic()
+        delay = 0.0
+        if self._last_start is not None:
+            delay = max(0.0, self._last_start + self.interval() - now)
+        if delay > 0:
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+        return delay
+
+    def mark(self):
+        """记录一次轮询开始，用于计算实际速率"""
+        now = time.monotonic()
+        with self._lock:
+            self._last_start = now
+            self._starts.append(now)
+            while self._starts and self._starts[0] < now - self.window:
+                self._starts.popleft()
+        self._effective_gauge.set(self.effective_rate())
+
+    def effective_rate(self) -> float:
+        """最近时间窗口内实际的轮询速率（次/秒）"""
+        with self._lock:
+            if len(self._starts) < 2:
+                return 0.0
+            span = self._starts[-1] - self._starts[0]
+            return (len(self._starts) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取速率统计
+
+        Returns:
+            Dict: 当前速率、间隔、实际速率、速率上限和退避次数
+        """
+        return {
+            "name": self.name,
+            "rate": self._rate,
+            "interval": self.interval(),
+            "effective_rate": self.effective_rate(),
+            "ceiling": self._ceiling,
+            "backoffs": self.backoffs,
+        }
+
+
+def controller_from_config(config: Dict[str, Any], min_interval: float,
+                           name: str = "monitor", max_interval: float = 30.0) -> AIMDController:
+    """根据 strategy.rate_control 配置创建速率控制器
+
+    Args:
+        config: 配置信息
+        min_interval: 最小间隔（秒），即速率上限
+        name: 控制器名称
+        max_interval: 未配置 rate_control.max_interval 时使用的最大间隔（秒）
+
+    Returns:
+        AIMDController: 速率控制器
+    """
+    rate_config = config.get("strategy", {}).get("rate_control", {})
+    return AIMDController(
+        min_interval,
+        max_interval=max(rate_config.get("max_interval", max_interval), min_interval),
+        additive=rate_config.get("additive", 0.1),
+        backoff=rate_config.get("backoff", 0.5),
+        slow_threshold=rate_config.get("slow_threshold", 5.0),
+        adaptive=rate_config.get("enabled", True),
+        name=name
+    )
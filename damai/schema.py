@@ -0,0 +1,339 @@
+# 大麦网配置校验模块
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+# 数值类型，bool 虽然是 int 的子类但不视为数值
+NUMBER = (int, float)
+
+# 文本类型，YAML/JSON 中未加引号的手机号、证件号等会解析为整数，校验时转换为字符串
+TEXT = (str, int)
+
+_TYPE_NAMES = {str: "字符串", int: "整数", float: "数值", bool: "布尔值", dict: "映射", list: "列表"}
+
+
+class ConfigError(ValueError):
+    """配置校验失败，errors 为带路径的错误列表"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("配置校验失败:\n" + "\n".join(f"  {error}" for error in errors))
+        self.errors = errors
+
+
+class FrozenDict(dict):
+    """只读字典，校验后的配置使用，读取速度与普通字典相同"""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("校验后的配置是只读的，请先用 thaw() 复制为普通字典")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """把字典和列表递归转换为只读的 FrozenDict 和元组"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """把只读配置递归复制为普通字典和列表，便于修改"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class Field:
+    """配置项声明"""
+
+    __slots__ = ("type", "required", "default", "min", "max", "choices",
+                 "fields", "items", "min_items", "check")
+
+    def __init__(self, type: Any = None, required: bool = False, default: Any = _MISSING,
+                 min: Optional[float] = None, max: Optional[float] = None,
+                 choices: Optional[Tuple[Any, ...]] = None,
+                 fields: Optional[Dict[str, "Field"]] = None,
+                 items: Optional["Field"] = None, min_items: int = 0,
+                 check: Optional[Callable[[Any], Optional[str]]] = None):
+        """声明一个配置项
+
+        Args:
+            type: 类型，如 str、TEXT、int、NUMBER、bool、dict、list，None表示不检查
+            required: 是否必填
+            default: 缺省值，嵌套映射未给出时按子项缺省值生成
+            min: 数值下限
+            max: 数值上限
+            choices: 可选值
+            fields: 映射的子项
+            items: 列表元素的声明
+            min_items: 列表最少元素个数
+            check: 额外检查，返回错误信息或None
+        """
+        if fields is not None and type is None:
+            type = dict
+        if items is not None and type is None:
+            type = list
+        self.type = type
+        self.required = required
+        self.default = default
+        self.min = min
+        self.max = max
+        self.choices = choices
+        self.fields = fields
+        self.items = items
+        self.min_items = min_items
+        self.check = check
+
+
+def _type_name(type_: Any) -> str:
+    if type_ is NUMBER:
+        return "数值"
+    if type_ is TEXT:
+        return "字符串"
+    if isinstance(type_, tuple):
+        return "或".join(_type_name(t) for t in type_)
+    return _TYPE_NAMES.get(type_, getattr(type_, "__name__", str(type_)))
+
+
+def _compile(field: Field) -> Callable[[Any, str, List[str]], Any]:
+    """把配置项声明编译为校验函数，校验函数返回填充缺省值并冻结后的值"""
+    type_ = field.type
+    is_number = type_ is NUMBER or type_ in (int, float)
+    children = None
+    if field.fields is not None:
+        children = [(key, child, _compile(child)) for key, child in field.fields.items()]
+    item_check = _compile(field.items) if field.items is not None else None
+
+    def validate(value: Any, path: str, errors: List[str]) -> Any:
+        error_count = len(errors)
+        if type_ is not None:
+            if isinstance(value, bool) and type_ is not bool:
+                errors.append(f"{path}: 应为{_type_name(type_)}，实际为布尔值")
+                return value
+            if type_ is float and isinstance(value, int):
+                value = float(value)
+            elif not isinstance(value, type_):
+                errors.append(f"{path}: 应为{_type_name(type_)}，实际为{_type_name(value.__class__)}")
+                return value
+            elif type_ is TEXT and not isinstance(value, str):
+                value = str(value)
+        if is_number:
+            if field.min is not None and value < field.min:
+                errors.append(f"{path}: 应不小于 {field.min}，实际为 {value}")
+            if field.max is not None and value > field.max:
+                errors.append(f"{path}: 应不大于 {field.max}，实际为 {value}")
+        if field.choices is not None and value not in field.choices:
+            errors.append(f"{path}: 应为 {', '.join(map(str, field.choices))} 之一，实际为 {value}")
+
+        if children is not None:
+            result = dict(value)
+            for key, child, child_check in children:
+                child_path = f"{path}.{key}" if path else key
+                if key in value and value[key] is not None:
+                    result[key] = child_check(value[key], child_path, errors)
+                elif child.required:
+                    errors.append(f"{child_path}: 缺少必填项")
+                else:
+                    default = _default(child)
+                    if default is not _MISSING:
+                        result[key] = default
+            value = result
+        elif item_check is not None:
+            if len(value) < field.min_items:
+                errors.append(f"{path}: 至少需要 {field.min_items} 项，实际为 {len(value)} 项")
+            value = [item_check(item, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+
+        # 子项有错误时跳过额外检查，避免在错误类型上比较
+        if field.check is not None and len(errors) == error_count:
+            message = field.check(value)
+            if message:
+                errors.append(f"{path}: {message}")
+        return freeze(value)
+
+    return validate
+
+
+def _default(field: Field) -> Any:
+    if field.default is not _MISSING:
+        return freeze(field.default)
+    if field.fields is not None:
+        # 嵌套映射未给出时，子项都有缺省值才生成
+        result = {}
+        for key, child in field.fields.items():
+            if child.required:
+                return _MISSING
+            default = _default(child)
+            if default is not _MISSING:
+                result[key] = default
+        return FrozenDict(result)
+    return _MISSING
+
+
+class Validator:
+    """由配置声明编译得到的校验器，编译一次后可重复使用"""
+
+    def __init__(self, schema: Field):
+        """编译配置声明
+
+        Args:
+            schema: 顶层配置声明，通常是带 fields 的映射
+        """
+        self.schema = schema
+        self._validate = _compile(schema)
+
+    def errors(self, config: Any) -> List[str]:
+        """校验配置，返回全部错误
+
+        Args:
+            config: 配置信息
+
+        Returns:
+            List: 带路径的错误信息，为空表示校验通过
+        """
+        errors: List[str] = []
+        self._validate(config, "", errors)
+        return errors
+
+    def __call__(self, config: Any) -> FrozenDict:
+        """校验配置并填充缺省值
+
+        Args:
+            config: 配置信息
+
+        Returns:
+            FrozenDict: 只读的已校验配置
+
+        Raises:
+            ConfigError: 校验失败，包含全部错误
+        """
+        if isinstance(config, FrozenDict):
+            return config
+        errors: List[str] = []
+        result = self._validate(config, "", errors)
+        if errors:
+            raise ConfigError(errors)
+        return result
+
+
+def _datetime_format(fmt: str) -> Callable[[str], Optional[str]]:
+    def check(value: str) -> Optional[str]:
+        try:
+            datetime.strptime(value, fmt)
+        except ValueError:
+            return f"格式应为 {datetime(2024, 4, 20, 12).strftime(fmt)}，实际为 {value}"
+        return None
+    return check
+
+
+def _ordered(low: str, high: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    def check(value: Dict[str, Any]) -> Optional[str]:
+        if low in value and high in value and value[low] > value[high]:
+            return f"{low} ({value[low]}) 不能大于 {high} ({value[high]})"
+        return None
+    return check
+
+
+_BUYER = Field(fields={
+    "name": Field(str, required=True),
+    "id_card": Field(TEXT),
+})
+
+# 网页端抢票脚本（damai_ticket/main.py）的配置
+WEB_SCHEMA = Field(fields={
+    "account": Field(required=True, fields={
+        "username": Field(TEXT, required=True),
+        "password": Field(TEXT, required=True),
+    }),
+    "target": Field(required=True, fields={
+        "keyword": Field(str, required=True),
+        "url": Field(str),
+        "date_range": Field(required=True, fields={
+            "start": Field(str, required=True, check=_datetime_format("%Y-%m-%d")),
+            "end": Field(str, required=True, check=_datetime_format("%Y-%m-%d")),
+        }, check=_ordered("start", "end")),
+        "price_range": Field(fields={
+            "min": Field(NUMBER, default=0, min=0),
+            "max": Field(NUMBER, default=float("inf"), min=0),
+        }, check=_ordered("min", "max")),
+        "sessions": Field(items=Field(str), default=()),
+    }),
+    "ticket_priority": Field(items=Field(fields={
+        "name": Field(str, required=True),
+        "priority": Field(int, required=True),
+    }), default=()),
+    "buyer": Field(required=True, items=_BUYER, min_items=1),
+    "strategy": Field(fields={
+        "monitor_interval": Field(fields={
+            "normal": Field(NUMBER, default=5.0, min=0.1),
+            "rush": Field(NUMBER, default=0.5, min=0.05),
+        }, check=_ordered("rush", "normal")),
+        "max_attempts": Field(int, default=1000, min=1),
+        "auto_submit": Field(bool, default=False),
+        "conditional_detail": Field(bool, default=True),
+        "stream_detail": Field(bool, default=True),
+    }),
+    "browser": Field(fields={
+        "headless": Field(bool, default=False),
+        "user_agent": Field(str, default=(
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )),
+        "window_size": Field(fields={
+            "width": Field(int, default=1366, min=320),
+            "height": Field(int, default=768, min=240),
+        }),
+    }),
+    "risk_control": Field(fields={
+        "use_proxy": Field(bool, default=False),
+        "proxy_required": Field(bool, default=False),
+        "proxy": Field(fields={
+            "type": Field(str, default="http", choices=("http", "https", "socks5")),
+            "host": Field(str, required=True),
+            "port": Field(int, required=True, min=1, max=65535),
+            "username": Field(TEXT),
+            "password": Field(TEXT),
+            "timeout": Field(NUMBER, default=10, min=0),
+        }),
+        "request_delay": Field(fields={
+            "min": Field(NUMBER, default=0.5, min=0),
+            "max": Field(NUMBER, default=1.5, min=0),
+        }, check=_ordered("min", "max")),
+    }),
+})
+
+# APP（damai_app / damai_ticket）保存的 config.json
+APP_SCHEMA = Field(fields={
+    "account": Field(required=True, fields={
+        "username": Field(TEXT, required=True),
+        "password": Field(TEXT, required=True),
+    }),
+    "target": Field(required=True, fields={
+        "show_id": Field(TEXT, required=True),
+        "start_time": Field(str, required=True, check=_datetime_format("%Y-%m-%d %H:%M:%S")),
+    }),
+    "buyer": Field(required=True, items=_BUYER, min_items=1),
+    "backend": Field(str, choices=("simulation", "api", "mobile")),
+})
+
+validate_config = Validator(WEB_SCHEMA)
+validate_app_config = Validator(APP_SCHEMA)
@@ -0,0 +1,118 @@
+# 大麦网运行设置模块
+
+from datetime import datetime
+from typing import Any, Dict
+
+from .schema import validate_config
+from .sku_index import SkuPreference
+
+
+class _Frozen:
+    """只读的设置对象，属性在创建时一次性赋值"""
+
+    __slots__ = ()
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} 是只读的，不能修改 {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} 是只读的，不能删除 {name}")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class TargetSettings(_Frozen):
+    """目标演出筛选条件，日期已解析，价格已转换为浮点数"""
+
+    __slots__ = ("keyword", "url", "start_date", "end_date", "min_price", "max_price", "sessions")
+
+
+class StrategySettings(_Frozen):
+    """监控和下单策略"""
+
+    __slots__ = ("normal_interval", "rush_interval", "max_attempts", "auto_submit",
+                 "conditional_detail", "stream_detail")
+
+
+class RiskSettings(_Frozen):
+    """风险控制设置"""
+
+    __slots__ = ("use_proxy", "proxy_required", "delay_range")
+
+
+class Settings(_Frozen):
+    """由已校验配置生成的只读设置
+
+    派生值（日期、价格区间、票档优先级匹配器）在这里计算一次，监控和
+    下单的热点路径在初始化时取出需要的值，循环中不再查找嵌套字典。
+    原始配置保存在 config 中，供按需读取的可选模块使用。
+    """
+
+    __slots__ = ("config", "target", "strategy", "risk", "preference")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Settings":
+        """从配置生成设置
+
+        Args:
+            config: 配置信息，未校验时先校验
+
+        Returns:
+            Settings: 只读设置
+
+        Raises:
+            ConfigError: 配置校验失败
+        """
+        config = validate_config(config)
+        target = config["target"]
+        strategy = config["strategy"]
+        risk = config["risk_control"]
+        return cls(
+            config=config,
+            target=TargetSettings(
+                keyword=target["keyword"],
+                url=target.get("url"),
+                start_date=datetime.strptime(target["date_range"]["start"], "%Y-%m-%d"),
+                end_date=datetime.strptime(target["date_range"]["end"], "%Y-%m-%d"),
+                min_price=float(target["price_range"]["min"]),
+                max_price=float(target["price_range"]["max"]),
+                sessions=target["sessions"],
+            ),
+            strategy=StrategySettings(
+                normal_interval=strategy["monitor_interval"]["normal"],
+                rush_interval=strategy["monitor_interval"]["rush"],
+                max_attempts=strategy["max_attempts"],
+                auto_submit=strategy["auto_submit"],
+                conditional_detail=strategy["conditional_detail"],
+                stream_detail=strategy["stream_detail"],
+            ),
+            risk=RiskSettings(
+                use_proxy=risk["use_proxy"],
+                proxy_required=risk["proxy_required"],
+                delay_range=(float(risk["request_delay"]["min"]), float(risk["request_delay"]["max"])),
+            ),
+            preference=SkuPreference(config),
+        )
+
+
+def as_settings(config: Any) -> Settings:
+    """把配置转换为设置，已经是设置时原样返回
+
+    Args:
+        config: Settings、已校验的配置或原始配置
+
+    Returns:
+        Settings: 只读设置
+
+    Raises:
+        ConfigError: 配置校验失败
+    """
+    if isinstance(config, Settings):
+        return config
+    return Settings.from_config(config)
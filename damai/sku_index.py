@@ -0,0 +1,349 @@
+# 大麦网票档索引模块
+
+import re
+import bisect
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+_PRICE_RE = re.compile(r"\d+(?:\.\d+)?")
+_SOLD_OUT_MARKS = ("缺货", "售罄", "已售完", "无票")
+# 缺货标记及其括号，生成票档ID时去掉，补货后ID不变
+_SOLD_OUT_RE = re.compile(r"\s*[(（\[【]?\s*(?:缺货登记|缺货|售罄|已售完|无票)\s*[)）\]】]?\s*")
+
+DEFAULT_PRIORITY = 999
+
+
+def parse_price_value(value: Any) -> Optional[float]:
+    """解析价格，支持数字和"¥280"、"280元"等文本
+
+    Args:
+        value: 价格
+
+    Returns:
+        float: 价格数值，无法解析返回None
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return None
+    match = _PRICE_RE.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+class PriorityMatcher:
+    """票档优先级匹配器
+
+    按配置顺序返回第一个出现在票档名称中的关键词的优先级。所有关键词
+    预先编译为一个正则，不含任何关键词的名称一次搜索即可排除；同一名称
+    的结果会被缓存，刷新详情时不再重复匹配。
+    """
+
+    __slots__ = ("priorities", "_pattern", "_cache")
+
+    def __init__(self, priorities: Iterable[Tuple[str, int]]):
+        """初始化匹配器
+
+        Args:
+            priorities: (票档关键词, 优先级) 列表，按配置顺序
+        """
+        self.priorities: Tuple[Tuple[str, int], ...] = tuple((name, priority) for name, priority in priorities if name)
+        self._pattern = re.compile("|".join(re.escape(name) for name, _ in self.priorities)) if self.priorities else None
+        self._cache: Dict[str, int] = {}
+
+    def __call__(self, text: str) -> int:
+        priority = self._cache.get(text)
+        if priority is not None:
+            return priority
+        priority = DEFAULT_PRIORITY
+        if self._pattern is not None and self._pattern.search(text):
+            for name, value in self.priorities:
+                if name in text:
+                    priority = value
+                    break
+        if len(self._cache) >= 1024:
+            self._cache.clear()
+        self._cache[text] = priority
+        return priority
+
+
+class SkuPreference:
+    """票档偏好，包括价格区间、票档优先级和场次偏好"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """初始化票档偏好
+
+        Args:
+            config: 配置信息，读取 target.price_range、target.sessions 和 ticket_priority
+        """
+        target = config.get("target", {}) or {}
+        price_range = target.get("price_range") or {}
+        self.min_price = float(price_range.get("min", 0))
+        self.max_price = float(price_range.get("max", float("inf")))
+        # 按票档名称匹配优先级，数值越小越优先
+        self.priority_of = PriorityMatcher(
+            (p["name"], p["priority"]) for p in config.get("ticket_priority", []) or []
+        )
+        self.sessions: List[str] = list(target.get("sessions", []) or [])
+        # 可能的最优排序键，流式扫描遇到时即可停止
+        self.best_rank: Tuple[int, int] = (
+            min([priority for _, priority in self.priority_of.priorities] + [DEFAULT_PRIORITY]), 0
+        )
+        # 偏好的标识，按偏好选出的结果（如流式扫描缓存）以此区分
+        self.key = repr((self.min_price, self.max_price, self.priority_of.priorities, tuple(self.sessions)))
+
+    def price_ok(self, price: Optional[float]) -> bool:
+        """价格是否在区间内，未知价格视为符合"""
+        return price is None or self.min_price <= price <= self.max_price
+
+    def session_rank(self, session: str) -> int:
+        """场次偏好顺序，未配置的场次排在最后"""
+        for rank, keyword in enumerate(self.sessions):
+            if keyword and keyword in session:
+                return rank
+        return len(self.sessions)
+
+    def rank(self, sku: Dict[str, Any]) -> Tuple[int, int]:
+        """原始票档的排序键（票档优先级、场次偏好），与 SkuIndex 的顺序一致
+
+        Args:
+            sku: 移动端接口返回的票档信息
+
+        Returns:
+            Tuple: 排序键，越小越优先
+        """
+        entry = normalize_mobile_sku(sku)
+        return self.priority_of(entry.text), self.session_rank(entry.session)
+
+    def accepts(self, sku: Dict[str, Any]) -> bool:
+        """判断原始票档是否有库存且价格符合偏好
+
+        Args:
+            sku: 移动端接口返回的票档信息
+
+        Returns:
+            bool: 是否可选
+        """
+        if (sku.get("inventory") or 0) <= 0:
+            return False
+        return self.price_ok(parse_price_value(sku.get("price")))
+
+
+class SkuEntry:
+    """索引中的单个票档"""
+
+    __slots__ = ("sku_id", "session", "text", "price", "priority", "inventory", "key", "raw")
+
+    def __init__(self, sku_id: str, session: str, text: str, price: Optional[float],
+                 inventory: int, raw: Dict[str, Any]):
+        self.sku_id = sku_id
+        self.session = session
+        self.text = text
+        self.price = price
+        self.inventory = inventory
+        self.raw = raw
+        self.priority = DEFAULT_PRIORITY
+        self.key: Tuple = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，保留原始字段"""
+        result = dict(self.raw)
+        result.update({
+            "sku_id": self.sku_id,
+            "session": self.session,
+            "text": self.text,
+            "price": self.price,
+            "priority": self.priority,
+            "inventory": self.inventory,
+        })
+        return result
+
+
+def normalize_mobile_sku(sku: Dict[str, Any]) -> SkuEntry:
+    """将移动端 skuList 中的票档转换为索引条目"""
+    return SkuEntry(
+        sku_id=str(sku.get("skuId")),
+        session=str(sku.get("sessionName") or sku.get("sessionId") or ""),
+        text=str(sku.get("priceName") or sku.get("price") or ""),
+        price=parse_price_value(sku.get("price")),
+        inventory=int(sku.get("inventory") or 0),
+        raw=sku,
+    )
+
+
+def normalize_web_price(price: Dict[str, Any], session: str = "") -> SkuEntry:
+    """将网页详情中的票档（text/value）转换为索引条目
+
+    网页票档没有库存字段，根据文本中的缺货标记推断。票档ID不含缺货标记，
+    同一票档售罄和补货前后对应同一个索引条目。
+    """
+    text = price.get("text", "")
+    sold_out = any(mark in text for mark in _SOLD_OUT_MARKS)
+    key = _SOLD_OUT_RE.sub(" ", text).strip() if sold_out else text.strip()
+    return SkuEntry(
+        sku_id=f"{session}|{key}",
+        session=session,
+        text=text,
+        price=parse_price_value(price.get("value")),
+        inventory=0 if sold_out else 1,
+        raw=price,
+    )
+
+
+class SkuIndex:
+    """票档索引
+
+    每次获取详情时构建一次，按偏好顺序（优先级、场次偏好、页面顺序）保存
+    有库存且价格符合的票档。查询最佳票档为O(1)，库存变化时通过二分查找原地更新。
+    监控、下单和配置热更新线程共用同一个索引，读写都在锁内进行。
+    """
+
+    def __init__(self, preference: SkuPreference):
+        """初始化票档索引
+
+        Args:
+            preference: 票档偏好
+        """
+        self.preference = preference
+        self._entries: Dict[str, SkuEntry] = {}
+        self._available: List[Tuple] = []
+        self._by_session: Dict[str, List[Tuple]] = {}
+        self._next_order = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def available_count(self) -> int:
+        """有库存且符合偏好的票档数量"""
+        return len(self._available)
+
+    def get(self, sku_id: str) -> Optional[SkuEntry]:
+        """按票档ID获取条目"""
+        return self._entries.get(sku_id)
+
+    def _eligible(self, entry: SkuEntry) -> bool:
+        return entry.inventory > 0 and self.preference.price_ok(entry.price)
+
+    def _insert(self, entry: SkuEntry):
+        bisect.insort(self._available, entry.key)
+        bisect.insort(self._by_session.setdefault(entry.session, []), entry.key)
+
+    def _remove(self, entry: SkuEntry):
+        for keys in (self._available, self._by_session.get(entry.session, [])):
+            i = bisect.bisect_left(keys, entry.key)
+            if i < len(keys) and keys[i] == entry.key:
+                del keys[i]
+
+    def add(self, entry: SkuEntry):
+        """添加或替换票档"""
+        with self._lock:
+            old = self._entries.get(entry.sku_id)
+            if old is not None:
+                self.update_inventory(old.sku_id, entry.inventory)
+                return
+            entry.priority = self.preference.priority_of(entry.text)
+            entry.key = (entry.priority, self.preference.session_rank(entry.session),
+                         self._next_order, entry.sku_id)
+            self._next_order += 1
+            self._entries[entry.sku_id] = entry
+            if self._eligible(entry):
+                self._insert(entry)
+
+    def update_inventory(self, sku_id: str, inventory: int) -> bool:
+        """原地更新库存
+
+        Args:
+            sku_id: 票档ID
+            inventory: 新库存
+
+        Returns:
+            bool: 票档是否存在
+        """
+        with self._lock:
+            entry = self._entries.get(sku_id)
+            if entry is None:
+                return False
+            was_eligible = self._eligible(entry)
+            entry.inventory = inventory
+            is_eligible = self._eligible(entry)
+            if was_eligible and not is_eligible:
+                self._remove(entry)
+            elif is_eligible and not was_eligible:
+                self._insert(entry)
+            return True
+
+    def set_preference(self, preference: SkuPreference):
+        """更换票档偏好并按页面顺序重建索引，配置热更新时调用
+
+        Args:
+            preference: 新的票档偏好
+        """
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.key[2])
+            self.preference = preference
+            self._entries = {}
+            self._available = []
+            self._by_session = {}
+            self._next_order = 0
+            for entry in entries:
+                self.add(entry)
+
+    def refresh(self, entries: Iterable[SkuEntry]):
+        """用新获取的详情刷新索引，已有票档只更新库存，消失的票档视为无库存
+
+        Args:
+            entries: 新的票档条目
+        """
+        with self._lock:
+            seen = set()
+            for entry in entries:
+                seen.add(entry.sku_id)
+                existing = self._entries.get(entry.sku_id)
+                if existing is not None:
+                    # 文本中的缺货标记可能已变化，排序键不受影响
+                    existing.raw = entry.raw
+                    existing.text = entry.text
+                    self.update_inventory(entry.sku_id, entry.inventory)
+                else:
+                    self.add(entry)
+            for sku_id in self._entries.keys() - seen:
+                self.update_inventory(sku_id, 0)
+
+    def best(self, session: Optional[str] = None) -> Optional[SkuEntry]:
+        """获取最佳可用票档
+
+        Args:
+            session: 指定场次，None表示不限场次
+
+        Returns:
+            SkuEntry: 最佳票档，没有可用票档返回None
+        """
+        with self._lock:
+            keys = self._available if session is None else self._by_session.get(session)
+            if not keys:
+                return None
+            return self._entries[keys[0][-1]]
+
+    def available(self, session: Optional[str] = None) -> List[SkuEntry]:
+        """按偏好顺序返回所有可用票档"""
+        with self._lock:
+            keys = self._available if session is None else self._by_session.get(session, [])
+            return [self._entries[key[-1]] for key in keys]
+
+    @classmethod
+    def from_mobile_detail(cls, detail: Dict[str, Any], preference: SkuPreference) -> "SkuIndex":
+        """从移动端详情数据构建索引"""
+        index = cls(preference)
+        for sku in detail.get("skuList", []) or []:
+            index.add(normalize_mobile_sku(sku))
+        return index
+
+    @classmethod
+    def from_web_prices(cls, prices: List[Dict[str, Any]], preference: SkuPreference,
+                        session: str = "") -> "SkuIndex":
+        """从网页详情中的票档列表构建索引"""
+        index = cls(preference)
+        for price in prices or []:
+            index.add(normalize_web_price(price, session))
+        return index
@@ -0,0 +1,172 @@
+# 大麦网流式JSON解析模块
+
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_END = ",]}" + _WHITESPACE
+
+
+class DetailScan:
+    """演出详情流式扫描结果"""
+
+    __slots__ = ("can_buy", "sku", "complete", "bytes_read")
+
+    def __init__(self):
+        self.can_buy: Optional[bool] = None
+        self.sku: Optional[Dict[str, Any]] = None
+        self.complete = False
+        self.bytes_read = 0
+
+
+class _Reader:
+    """按需从字节块迭代器中读取并解码JSON片段"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self, min_grow: int = 1) -> bool:
+        """读取更多数据，至少增加min_grow个字符（到达末尾除外）"""
+        parts = [self.buf[self.pos:]]
+        grown = 0
+        while grown < min_grow and not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                parts.append(self._decoder.decode(b"", final=True))
+                break
+            self.bytes_read += len(chunk)
+            text = self._decoder.decode(chunk)
+            grown += len(text)
+            parts.append(text)
+        self.buf = "".join(parts)
+        self.pos = 0
+        return grown > 0
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，到达末尾返回空串"""
+        while True:
+            buf, pos = self.buf, self.pos
+            end = len(buf)
+            while pos < end and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < end:
+                return buf[pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON格式错误: 期望 {char!r}，位置 {self.bytes_read}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """解码下一个完整的JSON值
+
+        数据不完整时按几何级数读取更多数据后重试，保证总体为线性开销。
+        """
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buf, self.pos)
+                # 数字可能恰好被截断在块边界上（如 "12." 或 "3e"），只有后面
+                # 紧跟分隔符或已到达末尾时才是完整的数字
+                if self.eof:
+                    self.pos = end
+                    return obj
+                if end < len(self.buf):
+                    if not isinstance(obj, (int, float)) or isinstance(obj, bool) \
+                            or self.buf[end] in _NUMBER_END:
+                        self.pos = end
+                        return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(max(len(self.buf) - self.pos, 1))
+
+
+def scan_detail(chunks: Iterable[bytes], accept: Callable[[Dict[str, Any]], bool],
+                rank: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                best_rank: Any = None) -> DetailScan:
+    """流式扫描演出详情，找到决策所需字段后立即停止
+
+    只关注顶层的 canBuy 和 skuList 字段：canBuy 为假时立即返回。未给出
+    rank 时，canBuy 为真且找到第一个满足 accept 的票档后立即返回；给出
+    rank 时保留排序键最小的可用票档（相同时取靠前的），遇到排序键等于
+    best_rank 的票档或票档列表读完后返回，不再读取剩余数据。
+
+    Args:
+        chunks: 响应字节块迭代器，如 response.iter_content()
+        accept: 票档筛选函数
+        rank: 票档排序键函数，越小越优先
+        best_rank: 可能的最优排序键
+
+    Returns:
+        DetailScan: 扫描结果
+    """
+    reader = _Reader(chunks)
+    result = DetailScan()
+    sku_rank = None
+    skus_scanned = False
+
+    def done() -> bool:
+        if result.can_buy is not True:
+            return result.can_buy is False
+        if skus_scanned:
+            return True
+        return result.sku is not None and (rank is None or sku_rank == best_rank)
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        result.complete = True
+    while not result.complete:
+        key = reader.value()
+        reader.expect(":")
+        if key == "canBuy":
+            result.can_buy = bool(reader.value())
+        elif key == "skuList" and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+                skus_scanned = True
+            else:
+                while True:
+                    sku = reader.value()
+                    if isinstance(sku, dict) and (result.sku is None or rank is not None) and accept(sku):
+                        if rank is None:
+                            result.sku = sku
+                        else:
+                            key = rank(sku)
+                            if sku_rank is None or key < sku_rank:
+                                result.sku, sku_rank = sku, key
+                        if done():
+                            break
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                        continue
+                    reader.expect("]")
+                    skus_scanned = True
+                    break
+        else:
+            reader.value()
+
+        if done():
+            break
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        result.complete = True
+
+    result.bytes_read = reader.bytes_read
+    return result
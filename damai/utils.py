@@ -1,53 +1,30 @@
 # 大麦网抢票工具函数模块
 
 import os
-import yaml
 import logging
 import random
 import string
 from typing import Dict, Any
-from datetime import datetime
+
+from .log import setup_logging
+from .config import load_config as load_config_file
 
 def setup_logger(log_level=logging.INFO):
     """设置日志记录器
     
+    日志经队列异步写入 logs/damai.log，按大小轮转。
+    
     Args:
         log_level: 日志级别
     
     Returns:
         logging.Logger: 日志记录器
     """
-    # 创建logs目录
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # 生成日志文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"damai_{timestamp}.log")
-    
-    # 配置根日志记录器
-    logger = logging.getLogger()
-    logger.setLevel(log_level)
-    
-    # 创建文件处理器
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(log_level)
-    
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    
-    # 创建格式化器
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s")
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # 添加处理器到日志记录器
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+    return setup_logging(
+        log_level,
+        log_file=os.path.join("logs", "damai.log"),
+        fmt="[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s"
+    )
 
 def load_config(config_path="config.yaml") -> Dict[str, Any]:
     """加载配置文件
@@ -59,9 +36,7 @@ def load_config(config_path="config.yaml") -> Dict[str, Any]:
         Dict: 配置信息
     """
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-        return config
+        return load_config_file(config_path)
     except Exception as e:
         raise Exception(f"加载配置文件失败: {str(e)}")
 
@@ -1,18 +1,26 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import json
 import time
 from datetime import datetime
 import logging
+from damai.profiling import startup_profiler
+
+# 启动分析（--profile-startup）
+PROFILER = startup_profiler("damai_mobile")
+
+with PROFILER.phase("import"):
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    from damai.config import load_config as load_config_file
 
 class DamaiMobileBot:
     def __init__(self):
-        self.config = self.load_config()
+        with PROFILER.phase("config"):
+            self.config = self.load_config()
         self.driver = None
-        self.logger = self.setup_logger()
+        with PROFILER.phase("logging"):
+            self.logger = self.setup_logger()
         
     def setup_logger(self):
         logger = logging.getLogger('damai_mobile')
@@ -25,8 +33,7 @@ class DamaiMobileBot:
 
     def load_config(self):
         try:
-            with open('config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config_file('config.json')
         except FileNotFoundError:
             print("请先创建config.json文件")
             return None
@@ -99,8 +106,12 @@ class DamaiMobileBot:
 
     def run(self):
         try:
-            self.init_driver()
-            if not self.login():
+            with PROFILER.phase("driver"):
+                self.init_driver()
+            with PROFILER.phase("login"):
+                logged_in = self.login()
+            PROFILER.finish()
+            if not logged_in:
                 return
 
             show_id = self.config['target']['show_id']
@@ -132,6 +143,7 @@ class DamaiMobileBot:
         except Exception as e:
             self.logger.error(f"程序发生错误: {str(e)}")
         finally:
+            PROFILER.finish()
             if self.driver:
                 self.driver.quit()
 
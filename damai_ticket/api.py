@@ -1,5 +1,4 @@
 import requests # type: ignore
-import json
 import time
 import logging
 import os
@@ -7,6 +6,8 @@ import random
 from typing import Dict, Any
 from datetime import datetime
 
+from damai import codec
+
 class DamaiAPI:
     """大麦网API接口类"""
     
@@ -85,7 +86,7 @@ class DamaiAPI:
             response = self.session.get(url)
             
             if response.status_code == 200:
-                return response.json()
+                return codec.response_json(response)
             else:
                 self.logger.error(f"获取演出详情失败: HTTP {response.status_code}")
                 return {}
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+抢票后端：界面只依赖 login() 和 buy_ticket(show_id)，具体实现在选中时才导入
+"""
+
+import importlib
+from typing import Any, Dict
+
+# 后端名称 -> (模块, 类名, 默认配置)
+BACKENDS = {
+    "simulation": ("damai_ticket.backends", "SimulationBackend", {}),
+    "api": ("damai_ticket.api", "DamaiAPI", {}),
+    # APP内运行时没有Appium服务，默认使用纯HTTP模式
+    "mobile": ("damai.mobile_api", "DamaiMobileAPI", {"appium": {"enabled": False}}),
+}
+
+
+class SimulationBackend:
+    """模拟后端，不发送任何请求，用于演示界面和调试抢票流程"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.attempts = 0
+
+    def login(self) -> bool:
+        return True
+
+    def buy_ticket(self, show_id: str) -> Dict[str, Any]:
+        """模拟一次抢票尝试
+
+        Args:
+            show_id: 演出ID
+
+        Returns:
+            Dict: 抢票结果，始终为失败
+        """
+        self.attempts += 1
+        if self.attempts % 10 == 0:
+            return {"success": False, "message": "模拟抢票: 正在确认库存..."}
+        if self.attempts % 10 == 5:
+            return {"success": False, "message": "模拟抢票: 提交订单中..."}
+        return {"success": False, "message": "模拟抢票，未提交真实订单"}
+
+
+def load_backend(name: str, config: Dict[str, Any]):
+    """导入并创建指定的抢票后端
+
+    Args:
+        name: 后端名称，simulation、api 或 mobile
+        config: 配置信息，缺少的项使用后端的默认配置
+
+    Returns:
+        后端实例
+
+    Raises:
+        ValueError: 未知的后端名称
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"未知的抢票后端: {name}，可选: {', '.join(BACKENDS)}")
+    module_name, class_name, defaults = BACKENDS[name]
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class({**defaults, **config})
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+配置持久化：后台线程序列化，原子写入，内容未变化时跳过，连续保存合并为一次
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from damai import codec
+
+logger = logging.getLogger("damai.config_store")
+
+
+def write_atomic(path: str, data: bytes):
+    """原子写入文件：先写同目录下的临时文件并刷盘，再用 os.replace 替换
+
+    进程在写入过程中被杀掉时，原文件保持完整。
+
+    Args:
+        path: 文件路径
+        data: 文件内容
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigStore:
+    """后台配置存储
+
+    save() 只记录待保存的配置并立即返回；后台线程在最后一次 save() 之后等待
+    delay 秒再序列化和写入，内容与文件中已有内容相同时跳过写入。
+    """
+
+    def __init__(self, path: str, delay: float = 0.5, indent: Optional[int] = 2,
+                 on_saved: Optional[Callable[[str], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        """初始化配置存储
+
+        Args:
+            path: 配置文件路径
+            delay: 合并连续保存的等待时间（秒）
+            indent: JSON缩进
+            on_saved: 写入完成回调，参数为文件路径，在后台线程中调用
+            on_error: 写入失败回调，在后台线程中调用
+        """
+        self.path = path
+        self.delay = delay
+        self.indent = indent
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self.writes = 0
+        self.skipped = 0
+        self._digest: Optional[str] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._due = 0.0
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="damai-config-store", daemon=True)
+        self._thread.start()
+
+    def save(self, config: Dict[str, Any]):
+        """请求保存配置，可在界面线程调用，不做任何IO
+
+        Args:
+            config: 配置信息，调用后不应再修改
+        """
+        with self._cond:
+            self._pending = config
+            self._due = time.monotonic() + self.delay
+            self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """立即写入待保存的配置并等待完成
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            bool: 是否在超时前写完
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._due = 0.0
+            self._cond.notify_all()
+            while self._pending is not None or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """写入待保存的配置并停止后台线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._pending is None or time.monotonic() < self._due):
+                    self._cond.wait(None if self._pending is None else self._due - time.monotonic())
+                if self._pending is None:
+                    return
+                config, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(config)
+            except Exception as e:
+                logger.error(f"保存配置失败: {str(e)}")
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, config: Dict[str, Any]):
+        data = codec.dumps_bytes(config, self.indent)
+        digest = hashlib.sha1(data).hexdigest()
+        if self._digest is None and os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self._digest = hashlib.sha1(f.read()).hexdigest()
+        if digest == self._digest:
+            self.skipped += 1
+            logger.debug(f"配置未变化，跳过写入 {self.path}")
+            return
+        write_atomic(self.path, data)
+        self._digest = digest
+        self.writes += 1
+        logger.info(f"配置已保存到 {self.path}")
+        if self.on_saved:
+            self.on_saved(self.path)
@@ -1,27 +1,78 @@
-from kivy.app import App # type: ignore
-from kivy.uix.boxlayout import BoxLayout # type: ignore 
-from kivy.uix.button import Button # type: ignore
-from kivy.uix.textinput import TextInput # type: ignore
-from kivy.uix.label import Label # type: ignore
-from kivy.clock import Clock # type: ignore
-from kivy.core.window import Window # type: ignore
-from kivy.uix.scrollview import ScrollView # type: ignore
-from kivy.metrics import dp # type: ignore
-from kivy.uix.popup import Popup # type: ignore
-from kivy.utils import platform # type: ignore
-from kivy.logger import Logger # type: ignore
-import json
+"""
+大麦抢票助手 - 界面核心
+
+damai_app.py、damai_ticket/app.py 和 damai_ticket/main_gui.py 共用本模块，
+只通过 backend 选择不同的抢票后端（见 damai_ticket/backends.py）。
+"""
+
 import os
+import copy
 import threading
 import time
 from datetime import datetime
-import traceback
+from functools import partial
+
+from damai.profiling import startup_profiler
+
+# 启动分析（--profile-startup），需在导入Kivy之前创建并移除该参数
+PROFILER = startup_profiler("damai_app")
+
+with PROFILER.phase("import"):
+    from kivy.app import App # type: ignore
+    from kivy.uix.boxlayout import BoxLayout # type: ignore 
+    from kivy.uix.button import Button # type: ignore
+    from kivy.uix.textinput import TextInput # type: ignore
+    from kivy.uix.label import Label # type: ignore
+    from kivy.clock import Clock # type: ignore
+    from kivy.core.window import Window # type: ignore
+    from kivy.uix.scrollview import ScrollView # type: ignore
+    from kivy.metrics import dp # type: ignore
+    from kivy.utils import platform # type: ignore
+    from kivy.logger import Logger # type: ignore
+
+    from damai import codec
+    from damai_ticket.status import StatusChannel
+    from damai_ticket.config_store import ConfigStore
+    from damai_ticket.worker import DONE, IDLE, STATE_NAMES, TicketWorker
 
 # 版本信息
 __version__ = "1.1.0"
 
 class DamaiApp(App):
+    # 抢票后端，子类可覆盖，保存的配置中的 backend 项优先
+    backend = "simulation"
+    
     def build(self):
+        # 首帧只构建主表单，帮助弹窗和历史面板在首帧之后或首次使用时再构建
+        self._build_started = time.perf_counter()
+        self._startup_pending = {"history", "config"}
+        self._help_popup = None
+        self._saved_config = {}
+        self.config_store = ConfigStore(
+            self.get_config_path(),
+            on_error=lambda e: self.update_status(f"保存配置失败: {str(e)}")
+        )
+        self.history_panel = None
+        return self._timed_phase("ui", self._build_layout)
+    
+    def _timed_phase(self, name, func, *args):
+        """在主线程中执行一个启动阶段并记录耗时"""
+        start = time.perf_counter()
+        with PROFILER.phase(name):
+            result = func(*args)
+        Logger.info(f"DamaiApp: 启动阶段 {name} 耗时 {(time.perf_counter() - start) * 1000:.1f} ms")
+        return result
+    
+    def _startup_done(self, name):
+        """标记一个延迟的启动阶段已完成，全部完成后结束启动分析"""
+        if name not in self._startup_pending:
+            return
+        self._startup_pending.discard(name)
+        if not self._startup_pending:
+            Logger.info(f"DamaiApp: 启动完成，总耗时 {(time.perf_counter() - self._build_started) * 1000:.1f} ms")
+            PROFILER.finish()
+    
+    def _build_layout(self):
         # 设置窗口大小和标题
         self.title = '大麦抢票助手'
         self.icon = 'assets/icon.png'
@@ -170,16 +221,16 @@ class DamaiApp(App):
         form_layout.add_widget(self.buyer_name)
         
         # 状态显示
-        status_label = Label(
-            text='状态信息',
+        self.state_label = Label(
+            text=f'状态信息: {STATE_NAMES[IDLE]}',
             size_hint_y=None,
             height=dp(20),
             font_size=dp(14),
             halign='left',
             color=(0.3, 0.3, 0.3, 1)
         )
-        status_label.bind(size=status_label.setter('text_size'))
-        form_layout.add_widget(status_label)
+        self.state_label.bind(size=self.state_label.setter('text_size'))
+        form_layout.add_widget(self.state_label)
         
         self.status_label = Label(
             text='请填写信息并点击开始抢票',
@@ -192,10 +243,15 @@ class DamaiApp(App):
         )
         self.status_label.bind(size=self.status_label.setter('text_size'))
         form_layout.add_widget(self.status_label)
+        self.status_channel = StatusChannel(self._show_status, history=20000)
         
         scroll.add_widget(form_layout)
         layout.add_widget(scroll)
         
+        # 事件历史，首帧之后再构建
+        self.history_container = BoxLayout(size_hint_y=None, height=dp(150))
+        layout.add_widget(self.history_container)
+        
         # 按钮区域
         button_layout = BoxLayout(orientation='horizontal', spacing=dp(10), size_hint_y=None, height=dp(60))
         
@@ -233,18 +289,30 @@ class DamaiApp(App):
         layout.add_widget(button_layout)
         
         # 初始化变量
-        self.is_running = False
-        self.ticket_thread = None
-        
-        # 尝试加载已保存的配置
-        self.try_load_saved_config()
+        self.worker = None
         
         return layout
     
+    def _build_history_panel(self):
+        """构建事件历史面板，RecycleView相关模块也在此时才导入"""
+        from damai_ticket.history import HistoryPanel
+        self.history_panel = HistoryPanel(self.status_channel)
+        self.history_container.add_widget(self.history_panel)
+    
+    def _on_first_frame(self, dt):
+        """第一帧绘制完成后构建次要控件"""
+        Logger.info(f"DamaiApp: 首帧耗时 {(time.perf_counter() - self._build_started) * 1000:.1f} ms")
+        self._timed_phase("history", self._build_history_panel)
+        self._startup_done("history")
+    
     def on_start(self):
         """应用启动时调用"""
         Logger.info(f"DamaiApp: 应用启动，版本 {__version__}")
         
+        # 配置在后台线程读取，不阻塞第一帧
+        self.try_load_saved_config()
+        Clock.schedule_once(self._on_first_frame, 0)
+        
         # 检查Android权限(如果在Android平台)
         if platform == 'android':
             try:
@@ -257,6 +325,12 @@ class DamaiApp(App):
             except ImportError:
                 self.update_status("提示: 无法申请Android权限，某些功能可能受限")
     
+    def on_stop(self):
+        """应用退出时取消正在进行的抢票"""
+        if self.worker is not None:
+            self.worker.stop()
+        self.config_store.close()
+    
     def get_application_config(self):
         """获取应用配置文件路径"""
         if platform == 'android':
@@ -274,7 +348,15 @@ class DamaiApp(App):
         return 'config.json'
     
     def show_help(self, instance):
-        """显示获取演出ID的帮助信息"""
+        """显示获取演出ID的帮助信息，弹窗在首次打开时构建并复用"""
+        if self._help_popup is None:
+            self._help_popup = self._build_help_popup()
+        self._help_popup.open()
+    
+    def _build_help_popup(self):
+        """构建帮助弹窗"""
+        from kivy.uix.popup import Popup # type: ignore
+        
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
         
         help_text = Label(
@@ -308,67 +390,79 @@ class DamaiApp(App):
         close_button.bind(on_press=popup.dismiss)
         content.add_widget(close_button)
         
-        popup.open()
+        return popup
     
     def try_load_saved_config(self):
-        """尝试加载保存的配置"""
+        """尝试加载保存的配置，在后台线程读取文件，读取完成后回到界面线程填充"""
+        threading.Thread(target=self._read_saved_config, name="damai-config", daemon=True).start()
+    
+    def _read_saved_config(self):
+        """读取配置文件（后台线程）"""
+        start = time.perf_counter()
+        config, error = None, None
         config_path = self.get_config_path()
         if os.path.exists(config_path):
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                
-                # 填充界面
-                self.username.text = config.get('account', {}).get('username', '')
-                self.password.text = config.get('account', {}).get('password', '')
-                self.show_id.text = config.get('target', {}).get('show_id', '')
-                self.start_time.text = config.get('target', {}).get('start_time', '')
-                
-                # 尝试获取观演人信息
-                buyers = config.get('buyer', [])
-                if buyers and len(buyers) > 0:
-                    self.buyer_name.text = buyers[0].get('name', '')
-                    
-                self.update_status('已加载保存的配置')
+                config = codec.load_file(config_path)
             except Exception as e:
-                self.update_status(f'加载配置失败: {str(e)}')
+                error = e
+        elapsed = time.perf_counter() - start
+        PROFILER.record("config", elapsed)
+        Logger.info(f"DamaiApp: 启动阶段 config 耗时 {elapsed * 1000:.1f} ms (后台线程)")
+        Clock.schedule_once(lambda dt: self._apply_saved_config(config, error), 0)
+    
+    def _apply_saved_config(self, config, error):
+        """把读取到的配置填充到界面（界面线程）"""
+        if error is not None:
+            self.update_status(f'加载配置失败: {str(error)}')
+        elif config is not None:
+            self._saved_config = config
+            
+            # 填充界面
+            self.username.text = config.get('account', {}).get('username', '')
+            self.password.text = config.get('account', {}).get('password', '')
+            self.show_id.text = config.get('target', {}).get('show_id', '')
+            self.start_time.text = config.get('target', {}).get('start_time', '')
+            
+            # 尝试获取观演人信息
+            buyers = config.get('buyer', [])
+            if buyers and len(buyers) > 0:
+                self.buyer_name.text = buyers[0].get('name', '')
+                
+            self.update_status('已加载保存的配置')
+        self._startup_done("config")
     
     def update_status(self, text):
-        """更新状态显示"""
-        def update(dt):
-            self.status_label.text = text
-            Logger.info(f"DamaiApp: 状态更新 - {text}")
-        Clock.schedule_once(update, 0)
+        """更新状态显示，可在工作线程中调用，同一帧内的多次更新只显示最新一条"""
+        Logger.info(f"DamaiApp: 状态更新 - {text}")
+        self.status_channel.push(text)
     
-    def save_config(self):
-        """保存配置到文件"""
-        config = {
-            'account': {
-                'username': self.username.text,
-                'password': self.password.text
-            },
-            'target': {
-                'show_id': self.show_id.text,
-                'start_time': self.start_time.text
-            },
-            'buyer': [
-                {'name': self.buyer_name.text}
-            ]
+    def _show_status(self, text):
+        self.status_label.text = text
+    
+    def collect_config(self):
+        """从界面收集配置，保留配置文件中界面未涉及的项（如 backend、appium）
+        
+        Returns:
+            Dict: 配置信息
+        """
+        config = dict(self._saved_config)
+        config['account'] = {
+            **self._saved_config.get('account', {}),
+            'username': self.username.text,
+            'password': self.password.text
         }
-        
-        config_path = self.get_config_path()
-        try:
-            # 确保目录存在
-            config_dir = os.path.dirname(config_path)
-            if config_dir and not os.path.exists(config_dir):
-                os.makedirs(config_dir)
-                
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-            Logger.info(f"DamaiApp: 配置已保存到 {config_path}")
-        except Exception as e:
-            Logger.error(f"DamaiApp: 保存配置失败 - {str(e)}")
-            self.update_status(f"保存配置失败: {str(e)}")
+        config['target'] = {
+            **self._saved_config.get('target', {}),
+            'show_id': self.show_id.text,
+            'start_time': self.start_time.text
+        }
+        config['buyer'] = [{'name': self.buyer_name.text}]
+        return config
+    
+    def save_config(self):
+        """保存配置到文件，序列化和写入在后台线程进行，不阻塞界面"""
+        self.config_store.save(self.collect_config())
     
     def load_config(self, instance):
         """加载配置按钮处理"""
@@ -381,8 +475,18 @@ class DamaiApp(App):
             self.update_status('请填写所有必要信息!')
             return
         
+        try:
+            start_time = datetime.strptime(self.start_time.text, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            self.update_status('开售时间格式应为: 2024-04-20 12:00:00')
+            return
+        
+        # 在界面线程中读取输入框，工作线程使用这份配置的副本，不与后台保存共用
+        config = self.collect_config()
+        backend = config.get('backend', self.backend)
+        
         # 保存配置
-        self.save_config()
+        self.config_store.save(config)
         
         # 禁用开始按钮，启用停止按钮
         self.start_button.disabled = True
@@ -393,89 +497,44 @@ class DamaiApp(App):
         self.update_status('正在启动抢票程序...')
         
         # 启动抢票线程
-        self.is_running = True
-        self.ticket_thread = threading.Thread(target=self.ticket_bot_thread)
-        self.ticket_thread.daemon = True
-        self.ticket_thread.start()
+        self.worker = TicketWorker(
+            partial(self._create_backend, backend, copy.deepcopy(config)),
+            self.show_id.text,
+            start_time,
+            on_status=self.update_status,
+            on_state=self._on_worker_state
+        )
+        self.worker.start()
     
     def stop_ticket_bot(self, instance):
-        """停止抢票"""
-        self.is_running = False
-        self.update_status('正在停止抢票程序...')
-        
-        # 启用开始按钮，禁用停止按钮
-        self.start_button.disabled = False
-        self.load_button.disabled = False
-        self.stop_button.disabled = True
+        """停止抢票，等待和请求立即取消，按钮在工作线程结束后恢复"""
+        if self.worker is not None:
+            self.update_status('正在停止抢票程序...')
+            self.stop_button.disabled = True
+            self.worker.stop()
     
-    def ticket_bot_thread(self):
-        """抢票线程"""
-        try:
-            # 等待到开售时间
-            target_time = datetime.strptime(self.start_time.text, "%Y-%m-%d %H:%M:%S")
-            current_time = datetime.now()
-            
-            if current_time >= target_time:
-                self.update_status('开售时间已过! 将尝试直接抢票')
-            else:
-                wait_seconds = (target_time - current_time).total_seconds()
-                self.update_status(f'等待开售, 距开始还有 {wait_seconds:.1f} 秒')
-                
-                # 每秒更新倒计时
-                while wait_seconds > 0 and self.is_running:
-                    time.sleep(1)
-                    wait_seconds -= 1
-                    if wait_seconds % 5 == 0 or wait_seconds < 10:  # 每5秒或最后10秒内每秒更新一次
-                        self.update_status(f'等待开售, 距开始还有 {wait_seconds:.0f} 秒')
-                
-                # 开售前5秒准备
-                if wait_seconds <= 5 and self.is_running:
-                    self.update_status('准备抢票...')
-                    time.sleep(wait_seconds)
-            
-            # 开始抢票循环
-            attempt_count = 0
-            while self.is_running:
-                attempt_count += 1
-                try:
-                    # 这里实现实际的抢票逻辑
-                    self.update_status(f'第 {attempt_count} 次尝试抢票...')
-                    
-                    # 模拟抢票过程
-                    time.sleep(0.5)
-                    
-                    # 示例：每10次尝试提示一条不同的信息
-                    if attempt_count % 10 == 0:
-                        self.update_status(f'第 {attempt_count} 次尝试: 正在确认库存...')
-                    elif attempt_count % 10 == 5:
-                        self.update_status(f'第 {attempt_count} 次尝试: 提交订单中...')
-                    
-                    # 这里可以集成API调用，实现真实抢票
-                    # 如果要在APK中集成真实抢票，需要添加代码调用damai/mobile_api.py
-                    
-                except Exception as e:
-                    err_msg = f'抢票出错: {str(e)}'
-                    Logger.error(f"DamaiApp: {err_msg}")
-                    Logger.error(f"DamaiApp: {traceback.format_exc()}")
-                    self.update_status(err_msg)
-                    time.sleep(1)
-            
-        except Exception as e:
-            err_msg = f'程序出错: {str(e)}'
-            Logger.error(f"DamaiApp: {err_msg}")
-            Logger.error(f"DamaiApp: {traceback.format_exc()}")
-            self.update_status(err_msg)
-        finally:
-            # 重置按钮状态
-            def reset_buttons(dt):
-                self.start_button.disabled = False
-                self.load_button.disabled = False
-                self.stop_button.disabled = True
-            Clock.schedule_once(reset_buttons, 0)
-            
-            if self.is_running:
-                self.is_running = False
-                self.update_status('抢票已停止')
+    def _create_backend(self, backend, config):
+        """创建抢票后端（工作线程），后端在选中时才导入
+        
+        Args:
+            backend: 后端名称
+            config: 在界面线程中收集的配置
+        """
+        from damai_ticket.backends import load_backend
+        Logger.info(f"DamaiApp: 使用抢票后端 {backend}")
+        return load_backend(backend, config)
+    
+    def _on_worker_state(self, state):
+        """工作线程状态切换（工作线程），在界面线程中显示"""
+        Clock.schedule_once(lambda dt: self._show_worker_state(state), 0)
+    
+    def _show_worker_state(self, state):
+        self.state_label.text = f'状态信息: {STATE_NAMES[state]}'
+        if state == DONE:
+            self.start_button.disabled = False
+            self.load_button.disabled = False
+            self.stop_button.disabled = True
+            self.worker = None
 
 def main():
     """作为模块导入时的入口点"""
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+事件历史面板：基于 RecycleView 只渲染可见行，数据来自状态通道的环形缓冲区
+"""
+
+import time
+
+from kivy.metrics import dp # type: ignore
+from kivy.uix.label import Label # type: ignore
+from kivy.uix.recycleview import RecycleView # type: ignore
+from kivy.uix.recycleboxlayout import RecycleBoxLayout # type: ignore
+
+from damai_ticket.status import StatusChannel
+
+
+class HistoryRow(Label):
+    """历史面板的单行，固定行高，超长文本截断"""
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            halign='left',
+            valign='middle',
+            shorten=True,
+            shorten_from='right',
+            font_size=dp(12),
+            color=(0.3, 0.3, 0.3, 1),
+            **kwargs
+        )
+        self.bind(size=self.setter('text_size'))
+
+
+class HistoryPanel(RecycleView):
+    """可滚动的事件历史面板
+
+    只创建可见区域所需的行控件并循环复用；行高固定，布局无需逐行测量。
+    每次状态通道刷新时增量追加新条目，超出容量一成后一次性从头部删除，
+    内存占用有上限。
+    停留在底部时自动滚动到最新一条，向上翻看时保持位置不变。
+    """
+
+    def __init__(self, channel: StatusChannel, max_rows: int = 20000,
+                 row_height: float = dp(22), **kwargs):
+        """初始化历史面板
+
+        Args:
+            channel: 状态通道
+            max_rows: 保留的行数，超出一成后删除到该行数
+            row_height: 行高
+        """
+        super().__init__(**kwargs)
+        self.channel = channel
+        self.max_rows = max_rows
+        self._trim_batch = max(1, max_rows // 10)
+        self.viewclass = HistoryRow
+        self.bar_width = dp(4)
+        self.scroll_type = ['bars', 'content']
+
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, row_height),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+        self._seq = 0
+        channel.add_listener(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        """从状态通道读取新条目并追加到列表，在界面线程中调用"""
+        self._seq, entries = self.channel.history.since(self._seq)
+        if not entries:
+            return
+        follow = self.scroll_y <= 0.01 or not self.data
+        rows = [
+            {'text': f"{time.strftime('%H:%M:%S', time.localtime(ts))}  {text}"}
+            for ts, text in entries
+        ]
+        self.data.extend(rows)
+        # 超出容量后按批删除头部，避免每次刷新都移动全部行并重排整个列表
+        if len(self.data) > self.max_rows + self._trim_batch:
+            del self.data[:len(self.data) - self.max_rows]
+        if follow:
+            self.scroll_y = 0
@@ -11,31 +11,29 @@ import time
 import logging
 import argparse
 from typing import Dict, Any
-from kivy.app import App
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.uix.label import Label
-from kivy.clock import Clock
-from kivy.core.window import Window
-from kivy.uix.scrollview import ScrollView
-from kivy.metrics import dp
-from kivy.utils import platform
-from kivy.logger import Logger
-import json
-import threading
-from datetime import datetime
 
 # 添加当前目录到系统路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from damai.profiling import NullStartupProfiler, startup_profiler
+
+# 启动分析（--profile-startup），只在作为脚本运行时解析参数
+PROFILER = startup_profiler("damai_ticket_main") if __name__ == "__main__" else NullStartupProfiler()
+
 # 导入自定义模块
-from damai.api import DamaiAPI
-from damai.monitor import TicketMonitor
-from damai.order import OrderProcessor
-from damai.utils import setup_logger, load_config
-from risk.proxy import ProxyManager
-from risk.fingerprint import FingerprintSimulator
+with PROFILER.phase("import"):
+    from damai.api import DamaiAPI
+    from damai.monitor import TicketMonitor
+    from damai.order import OrderProcessor
+    from damai.utils import setup_logger, load_config
+    from damai.events import configure_events
+    from damai.profiling import live_profiler_from_config
+    from damai.memprof import memory_profiler_from_config
+    from damai.metrics import metrics_server_from_config
+    from damai.config import config_watcher_from_config
+    from damai.schema import ConfigError
+    from damai.settings import Settings
+    from damai import budget
 
 
 def parse_arguments():
@@ -79,53 +77,96 @@ def main():
     
     # 设置日志
     log_level = logging.DEBUG if args.debug else logging.INFO
-    logger = setup_logger(log_level)
+    with PROFILER.phase("logging"):
+        logger = setup_logger(log_level)
     logger.info("大麦网抢票脚本启动")
     
+    live_profiler = memory_profiler = metrics_server = None
     try:
         # 加载配置
-        config = load_config(args.config)
+        with PROFILER.phase("config"):
+            config = load_config(args.config)
         logger.info(f"已加载配置文件: {args.config}")
         
         # 如果指定了URL，覆盖配置中的URL
         if args.url:
-            config["target"]["url"] = args.url
+            config.setdefault("target", {})["url"] = args.url
             logger.info(f"使用命令行指定的URL: {args.url}")
         
         # 如果指定了自动模式，覆盖配置中的自动提交设置
         if args.auto:
-            config["strategy"]["auto_submit"] = True
+            config.setdefault("strategy", {})["auto_submit"] = True
             logger.info("已启用全自动模式")
         
-        # 初始化风险控制模块
-        proxy_manager = ProxyManager(config)
-        proxy_manager.init_proxy()
-        
-        fingerprint_simulator = FingerprintSimulator(config)
+        # 校验配置并生成只读设置，派生值只计算一次，各模块共用
+        try:
+            settings = Settings.from_config(config)
+        except ConfigError as e:
+            for error in e.errors:
+                logger.error(f"配置错误: {error}")
+            PROFILER.finish()
+            return 1
+        config = settings.config
+        
+        # 启用结构化事件日志（如果配置）
+        events_config = config.get("logging", {}).get("events")
+        if events_config:
+            configure_events(
+                events_config.get("path", os.path.join("logs", "events.jsonl")),
+                events_config.get("format", "jsonl")
+            )
+        
+        # 运行期采样分析（如果配置），可通过SIGUSR2或控制文件开关
+        live_profiler = live_profiler_from_config(config)
+        
+        # 内存分析（如果配置），可通过SIGUSR1或触发文件写出报告
+        memory_profiler = memory_profiler_from_config(config)
+        
+        # 本机指标接口（如果配置），供Prometheus抓取
+        metrics_server = metrics_server_from_config(config)
         
-        # 初始化API模块
-        api = DamaiAPI(config)
+        # 初始化风险控制模块
+        with PROFILER.phase("risk"):
+            from risk.proxy import ProxyManager
+            from risk.fingerprint import FingerprintSimulator
+            proxy_manager = ProxyManager(config)
+            proxy_manager.init_proxy()
+            
+            fingerprint_simulator = FingerprintSimulator(config)
         
-        # 初始化浏览器
-        browser = api.init_browser()
+        with PROFILER.phase("driver"):
+            # 初始化API模块
+            api = DamaiAPI(settings)
+            
+            # 初始化浏览器
+            browser = api.init_browser()
         logger.info("浏览器初始化完成")
         
         # 登录账号
-        login_success = api.login()
+        with PROFILER.phase("login"):
+            login_success = api.login()
+        PROFILER.finish()
         if not login_success:
             logger.error("登录失败，请检查账号信息或手动登录")
             # 等待用户手动登录
             input("请在浏览器中手动登录，完成后按回车继续...")
         
         # 初始化票务监控器
-        monitor = TicketMonitor(config, api)
+        monitor = TicketMonitor(settings, api)
         
         # 初始化订单处理器
-        order_processor = OrderProcessor(config, api)
+        order_processor = OrderProcessor(settings, api)
         
         # 添加票务可用回调
         monitor.add_callback(lambda status: on_ticket_available(status, order_processor))
         
+        # 配置热更新（如果配置），轮询间隔和筛选条件修改后无需重启
+        def on_config_change(new_config: Dict[str, Any]):
+            if monitor.reload_config(new_config):
+                order_processor.apply_settings(monitor.settings)
+        
+        config_watcher = config_watcher_from_config(config, args.config, on_config_change)
+        
         # 开始监控
         logger.info("开始监控票务状态")
         monitor.start_monitoring()
@@ -139,260 +180,39 @@ def main():
             monitor.stop_monitoring()
         
         # 关闭浏览器
+        if config_watcher:
+            config_watcher.stop()
         api.close_browser()
+        budget.log_stats()
+        if memory_profiler:
+            memory_profiler.write_report()
         logger.info("抢票脚本已停止")
         
     except Exception as e:
+        PROFILER.finish()
         logger.exception(f"程序异常: {str(e)}")
         return 1
     
+    finally:
+        # 出错退出时也要停止已启动的后台线程和指标接口
+        configure_events(None)
+        if live_profiler:
+            live_profiler.stop()
+        if memory_profiler:
+            memory_profiler.stop()
+        if metrics_server:
+            metrics_server.shutdown()
+    
     return 0
 
 
-class DamaiTicketApp(App):
-    def build(self):
-        # 设置窗口标题
-        self.title = '大麦抢票助手'
-        
-        # 根据平台调整界面
-        if platform == 'android':
-            Window.softinput_mode = 'below_target'
-        
-        # 主布局
-        layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
-        
-        # 标题
-        title = Label(
-            text='大麦抢票助手',
-            size_hint_y=None,
-            height=dp(50),
-            font_size=dp(24)
-        )
-        layout.add_widget(title)
-        
-        # 滚动视图
-        scroll = ScrollView()
-        form_layout = BoxLayout(orientation='vertical', spacing=dp(15), size_hint_y=None)
-        form_layout.bind(minimum_height=form_layout.setter('height'))
-        
-        # 账号输入
-        form_layout.add_widget(Label(
-            text='账号信息',
-            size_hint_y=None,
-            height=dp(30),
-            font_size=dp(16)
-        ))
-        
-        self.username = TextInput(
-            hint_text='大麦网账号/手机号',
-            multiline=False,
-            size_hint_y=None,
-            height=dp(40)
-        )
-        form_layout.add_widget(self.username)
-        
-        self.password = TextInput(
-            hint_text='密码',
-            password=True,
-            multiline=False,
-            size_hint_y=None,
-            height=dp(40)
-        )
-        form_layout.add_widget(self.password)
-        
-        # 演出信息
-        form_layout.add_widget(Label(
-            text='演出信息',
-            size_hint_y=None,
-            height=dp(30),
-            font_size=dp(16)
-        ))
-        
-        self.show_id = TextInput(
-            hint_text='演出ID',
-            multiline=False,
-            size_hint_y=None,
-            height=dp(40)
-        )
-        form_layout.add_widget(self.show_id)
-        
-        self.start_time = TextInput(
-            hint_text='开售时间 (格式: 2024-03-25 20:00:00)',
-            multiline=False,
-            size_hint_y=None,
-            height=dp(40)
-        )
-        form_layout.add_widget(self.start_time)
-        
-        # 观演人信息
-        form_layout.add_widget(Label(
-            text='观演人信息',
-            size_hint_y=None,
-            height=dp(30),
-            font_size=dp(16)
-        ))
-        
-        self.buyer_name = TextInput(
-            hint_text='观演人姓名（必须是已实名认证的）',
-            multiline=False,
-            size_hint_y=None,
-            height=dp(40)
-        )
-        form_layout.add_widget(self.buyer_name)
-        
-        # 状态显示
-        self.status_label = Label(
-            text='准备就绪',
-            size_hint_y=None,
-            height=dp(60),
-            font_size=dp(14)
-        )
-        form_layout.add_widget(self.status_label)
-        
-        scroll.add_widget(form_layout)
-        layout.add_widget(scroll)
-        
-        # 按钮区域
-        button_layout = BoxLayout(
-            orientation='horizontal',
-            spacing=dp(10),
-            size_hint_y=None,
-            height=dp(50)
-        )
-        
-        # 开始按钮
-        self.start_button = Button(
-            text='开始抢票',
-            background_color=(0.2, 0.8, 0.2, 1),
-            size_hint_x=0.5
-        )
-        self.start_button.bind(on_press=self.start_ticket_task)
-        button_layout.add_widget(self.start_button)
-        
-        # 停止按钮
-        self.stop_button = Button(
-            text='停止',
-            background_color=(0.8, 0.2, 0.2, 1),
-            size_hint_x=0.5,
-            disabled=True
-        )
-        self.stop_button.bind(on_press=self.stop_ticket_task)
-        button_layout.add_widget(self.stop_button)
-        
-        layout.add_widget(button_layout)
-        
-        # 初始化变量
-        self.is_running = False
-        self.ticket_thread = None
-        
-        return layout
-    
-    def update_status(self, text):
-        def update(dt):
-            self.status_label.text = text
-        Clock.schedule_once(update, 0)
-    
-    def save_config(self):
-        config = {
-            'account': {
-                'username': self.username.text,
-                'password': self.password.text
-            },
-            'target': {
-                'show_id': self.show_id.text,
-                'start_time': self.start_time.text
-            },
-            'buyer': [
-                {'name': self.buyer_name.text}
-            ]
-        }
-        
-        try:
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.update_status(f'保存配置失败: {str(e)}')
-    
-    def start_ticket_task(self, instance):
-        if not all([self.username.text, self.password.text, 
-                   self.show_id.text, self.start_time.text,
-                   self.buyer_name.text]):
-            self.update_status('请填写所有必要信息！')
-            return
-        
-        # 保存配置
-        self.save_config()
-        
-        # 更新按钮状态
-        self.start_button.disabled = True
-        self.stop_button.disabled = False
-        
-        # 启动抢票线程
-        self.is_running = True
-        self.ticket_thread = threading.Thread(target=self.ticket_task)
-        self.ticket_thread.daemon = True
-        self.ticket_thread.start()
-        
-        self.update_status('抢票程序已启动...')
-    
-    def stop_ticket_task(self, instance):
-        self.is_running = False
-        self.update_status('正在停止抢票程序...')
-        
-        # 更新按钮状态
-        self.start_button.disabled = False
-        self.stop_button.disabled = True
-    
-    def ticket_task(self):
-        try:
-            from damai.mobile_api import DamaiMobileAPI
-            api = DamaiMobileAPI(self.load_config())
-            
-            # 登录
-            if not api.login():
-                self.update_status('登录失败，请检查账号信息')
-                return
-            
-            self.update_status('登录成功，等待开始抢票...')
-            
-            # 等待到开售时间
-            start_time = datetime.strptime(self.start_time.text, "%Y-%m-%d %H:%M:%S")
-            while datetime.now() < start_time and self.is_running:
-                remaining = (start_time - datetime.now()).total_seconds()
-                self.update_status(f'距离开售还有 {remaining:.1f} 秒')
-                time.sleep(1)
-            
-            if not self.is_running:
-                return
-            
-            # 开始抢票
-            attempt_count = 0
-            while self.is_running:
-                attempt_count += 1
-                self.update_status(f'第 {attempt_count} 次尝试抢票...')
-                
-                try:
-                    result = api.buy_ticket(self.show_id.text)
-                    if result.get('success'):
-                        self.update_status('抢票成功！请在30分钟内完成支付')
-                        break
-                    else:
-                        self.update_status(f'本次尝试失败: {result.get("message")}')
-                except Exception as e:
-                    self.update_status(f'抢票出错: {str(e)}')
-                
-                time.sleep(0.5)
-            
-        except Exception as e:
-            self.update_status(f'程序出错: {str(e)}')
-        finally:
-            self.start_button.disabled = False
-            self.stop_button.disabled = True
-            self.is_running = False
+def __getattr__(name):
+    # 图形界面依赖Kivy，只在访问时导入，命令行模式不加载Kivy
+    if name == "DamaiTicketApp":
+        from damai_ticket.main_gui import DamaiTicketApp
+        return DamaiTicketApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     sys.exit(main())
-
-if __name__ == '__main__':
-    DamaiTicketApp().run()
\ No newline at end of file
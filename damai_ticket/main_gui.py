@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+大麦网抢票图形界面
+"""
+
+from damai_ticket.damai_app import DamaiApp
+
+
+class DamaiTicketApp(DamaiApp):
+    """使用 damai.mobile_api 抢票的APP，界面与 DamaiApp 相同"""
+    
+    backend = "mobile"
+
+
+if __name__ == '__main__':
+    DamaiTicketApp().run()
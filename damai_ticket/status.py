@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+界面状态通道：合并工作线程的状态更新，限制界面刷新频率
+"""
+
+import time
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class RingBuffer:
+    """固定容量的环形缓冲区
+
+    预先分配存储空间，写满后覆盖最旧的条目，内存占用恒定。每个条目带有递增的序号，
+    读取方记住上次读到的序号即可增量获取新条目。
+    """
+
+    def __init__(self, capacity: int):
+        """初始化环形缓冲区
+
+        Args:
+            capacity: 容量
+        """
+        self.capacity = max(1, capacity)
+        self._items: List[Any] = [None] * self.capacity
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, item: Any) -> int:
+        """追加条目，可在任意线程调用
+
+        Args:
+            item: 条目
+
+        Returns:
+            int: 条目的序号（从1开始）
+        """
+        with self._lock:
+            self._items[self._seq % self.capacity] = item
+            self._seq += 1
+            return self._seq
+
+    @property
+    def seq(self) -> int:
+        """最新条目的序号，没有条目时为0"""
+        return self._seq
+
+    def __len__(self) -> int:
+        return min(self._seq, self.capacity)
+
+    def since(self, seq: int) -> Tuple[int, List[Any]]:
+        """获取序号大于 seq 的条目，已被覆盖的条目不再返回
+
+        Args:
+            seq: 上次读到的序号
+
+        Returns:
+            Tuple: (最新序号, 按时间顺序的条目列表)
+        """
+        with self._lock:
+            end = self._seq
+            start = max(seq, end - self.capacity)
+            items = [self._items[i % self.capacity] for i in range(start, end)]
+        return end, items
+
+    def items(self) -> List[Any]:
+        """按时间顺序获取全部条目"""
+        return self.since(0)[1]
+
+
+class StatusChannel:
+    """工作线程到界面线程的状态通道
+
+    工作线程调用 push() 只记录最新状态并触发一个预先创建的 Kivy 触发器，
+    不为每条消息创建闭包；同一帧内的多次更新只刷新一次，两次刷新之间至少间隔
+    min_interval 秒，期间的更新合并为最后一条。最近的状态保存在环形缓冲区中，
+    刷新时通知监听者（如历史面板）增量读取。
+    """
+
+    def __init__(self, apply: Callable[[str], None], max_rate: float = 10.0,
+                 history: int = 200, create_trigger: Optional[Callable] = None):
+        """初始化状态通道
+
+        Args:
+            apply: 在界面线程中显示状态的函数
+            max_rate: 每秒最多刷新次数
+            history: 保留的历史状态条数
+            create_trigger: 创建触发器的函数，默认使用 Clock.create_trigger
+        """
+        if create_trigger is None:
+            from kivy.clock import Clock # type: ignore
+            create_trigger = Clock.create_trigger
+        self._apply = apply
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.history = RingBuffer(history)
+        self._listeners: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._latest: Optional[str] = None
+        self._shown: Optional[str] = None
+        self._last_flush = 0.0
+        self.pushed = 0
+        self.applied = 0
+        # 触发器在同一帧内多次调用只执行一次
+        self._trigger = create_trigger(self._flush, 0)
+        self._delayed = create_trigger(self._flush, self.min_interval)
+
+    def push(self, text: str):
+        """提交一条状态，可在任意线程调用
+
+        Args:
+            text: 状态文本
+        """
+        with self._lock:
+            self.pushed += 1
+            if text == self._latest:
+                return
+            self._latest = text
+        self.history.append((time.time(), text))
+        self._trigger()
+
+    def _flush(self, dt=None):
+        now = time.monotonic()
+        if now - self._last_flush < self.min_interval:
+            # 刷新过于频繁，推迟到间隔结束后再显示最新状态
+            self._delayed()
+            return
+        self._last_flush = now
+        for listener in self._listeners:
+            listener()
+        with self._lock:
+            text = self._latest
+        if text is None or text == self._shown:
+            return
+        self._shown = text
+        self.applied += 1
+        self._apply(text)
+
+    def add_listener(self, listener: Callable[[], None]):
+        """添加刷新监听者，在界面线程中随状态刷新一起调用
+
+        Args:
+            listener: 无参数的回调函数
+        """
+        self._listeners.append(listener)
+
+    def recent(self, count: Optional[int] = None) -> List[Tuple[float, str]]:
+        """获取最近的状态历史
+
+        Args:
+            count: 条数，None表示全部
+
+        Returns:
+            List: (时间戳, 状态文本)，按时间顺序
+        """
+        items = self.history.items()
+        return items[-count:] if count else items
@@ -1,30 +1,23 @@
 import os
-import json
 import logging
 from typing import Dict, Any
 from datetime import datetime
 
+from damai import codec, log
+from damai.config import load_config as load_config_file
+from damai.schema import validate_app_config
+from damai_ticket.config_store import write_atomic
+
 def setup_logging(log_dir: str = "logs") -> None:
     """设置日志配置
     
     Args:
         log_dir: 日志目录
     """
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-        
-    log_file = os.path.join(
-        log_dir,
-        f"damai_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    )
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
+    log.setup_logging(
+        logging.INFO,
+        log_file=os.path.join(log_dir, "damai.log"),
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
 def load_config(config_file: str = "config.json") -> Dict[str, Any]:
@@ -38,8 +31,7 @@ def load_config(config_file: str = "config.json") -> Dict[str, Any]:
     """
     try:
         if os.path.exists(config_file):
-            with open(config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config_file(config_file)
         return {}
     except Exception as e:
         logging.error(f"加载配置文件失败: {str(e)}")
@@ -56,8 +48,7 @@ def save_config(config: Dict[str, Any], config_file: str = "config.json") -> boo
         bool: 是否保存成功
     """
     try:
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
+        write_atomic(config_file, codec.dumps_bytes(config, 4))
         return True
     except Exception as e:
         logging.error(f"保存配置文件失败: {str(e)}")
@@ -86,7 +77,7 @@ def get_show_url(show_id: str) -> str:
     return f"https://m.damai.cn/damai/detail/item.html?itemId={show_id}"
 
 def validate_config(config: Dict[str, Any]) -> bool:
-    """验证配置信息
+    """验证配置信息，逐项记录带路径的错误
     
     Args:
         config: 配置信息
@@ -94,24 +85,12 @@ def validate_config(config: Dict[str, Any]) -> bool:
     Returns:
         bool: 配置是否有效
     """
-    required_fields = {
-        'account': ['username', 'password'],
-        'buyer': ['name']
-    }
-    
     try:
-        for section, fields in required_fields.items():
-            if section not in config:
-                logging.error(f"缺少配置节: {section}")
-                return False
-                
-            for field in fields:
-                if field not in config[section]:
-                    logging.error(f"缺少配置项: {section}.{field}")
-                    return False
-                    
-        return True
-        
+        errors = validate_app_config.errors(config)
     except Exception as e:
         logging.error(f"验证配置信息失败: {str(e)}")
-        return False 
\ No newline at end of file
+        return False
+    
+    for error in errors:
+        logging.error(f"配置错误: {error}")
+    return not errors 
\ No newline at end of file
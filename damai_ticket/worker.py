@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+可取消的抢票工作线程：取消令牌贯穿等待、后端调用和HTTP请求，停止在毫秒级生效
+"""
+
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("damai.worker")
+
+# 工作线程状态
+IDLE = "idle"
+WAITING = "waiting"
+ARMED = "armed"
+ATTEMPTING = "attempting"
+DONE = "done"
+
+STATE_NAMES = {
+    IDLE: "空闲",
+    WAITING: "等待开售",
+    ARMED: "即将开抢",
+    ATTEMPTING: "抢票中",
+    DONE: "已结束",
+}
+
+# 允许的状态切换，任何状态都可以直接结束
+TRANSITIONS = {
+    IDLE: (WAITING, DONE),
+    WAITING: (ARMED, ATTEMPTING, DONE),
+    ARMED: (ATTEMPTING, DONE),
+    ATTEMPTING: (DONE,),
+    DONE: (),
+}
+
+
+class Cancelled(Exception):
+    """操作因取消令牌被取消"""
+
+
+class CancelToken:
+    """取消令牌
+
+    cancel() 会立即唤醒所有通过本令牌等待的线程，并调用注册的取消回调
+    （如关闭HTTP会话）。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters = set()
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """取消，可在任意线程调用，重复调用无副作用"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            waiters = list(self._waiters)
+            callbacks = list(self._callbacks)
+        for waiter in waiters:
+            waiter.set()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"取消回调执行失败: {str(e)}")
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """注册取消回调，已取消时立即调用
+
+        Args:
+            callback: 无参数的回调函数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        """已取消时抛出 Cancelled"""
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """等待指定时间，取消时立即返回
+
+        Args:
+            timeout: 等待秒数
+
+        Returns:
+            bool: 是否已取消
+        """
+        return self._event.wait(max(0.0, timeout))
+
+    def sleep(self, timeout: float):
+        """等待指定时间，取消时抛出 Cancelled
+
+        Args:
+            timeout: 等待秒数
+        """
+        if self.wait(timeout):
+            raise Cancelled()
+
+    def call(self, executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        """在执行器线程中运行阻塞调用，取消时立即返回
+
+        被取消的调用在后台继续运行到结束，结果被丢弃。
+
+        Args:
+            executor: 执行器
+            func: 要调用的函数
+
+        Returns:
+            函数的返回值
+
+        Raises:
+            Cancelled: 调用完成前被取消
+        """
+        self.raise_if_cancelled()
+        done = threading.Event()
+        with self._lock:
+            self._waiters.add(done)
+        try:
+            future = executor.submit(func, *args, **kwargs)
+            future.add_done_callback(lambda f: done.set())
+            done.wait()
+            if not future.done():
+                raise Cancelled()
+            return future.result()
+        finally:
+            with self._lock:
+                self._waiters.discard(done)
+
+    def bind_session(self, session, timeout: float = 10.0):
+        """把取消令牌绑定到 requests 会话
+
+        每个请求发送前检查是否已取消，未指定超时的请求使用默认超时，
+        取消时关闭会话以断开空闲连接。
+
+        Args:
+            session: requests.Session
+            timeout: 默认请求超时（秒）
+        """
+        request = session.request
+
+        def cancellable_request(method, url, **kwargs):
+            self.raise_if_cancelled()
+            kwargs.setdefault("timeout", timeout)
+            return request(method, url, **kwargs)
+
+        session.request = cancellable_request
+        self.on_cancel(session.close)
+
+
+class TicketWorker:
+    """抢票工作线程
+
+    状态依次为 idle -> waiting（登录并等待开售）-> armed（开售前 arm_lead 秒）
+    -> attempting（循环抢票）-> done。所有等待和后端调用都受取消令牌控制，
+    stop() 后工作线程立即进入 done。
+    """
+
+    def __init__(self, backend_factory: Callable[[], Any], show_id: str, start_time: datetime,
+                 on_status: Optional[Callable[[str], None]] = None,
+                 on_state: Optional[Callable[[str], None]] = None,
+                 retry_interval: float = 0.5, arm_lead: float = 5.0, http_timeout: float = 10.0):
+        """初始化抢票工作线程
+
+        Args:
+            backend_factory: 创建抢票后端的函数，在工作线程中调用
+            show_id: 演出ID
+            start_time: 开售时间
+            on_status: 状态文本回调，在工作线程中调用
+            on_state: 状态切换回调，在工作线程中调用
+            retry_interval: 两次抢票尝试之间的间隔（秒）
+            arm_lead: 开售前多少秒进入 armed 状态
+            http_timeout: 后端HTTP请求的默认超时（秒）
+        """
+        self.backend_factory = backend_factory
+        self.show_id = show_id
+        self.start_time = start_time
+        self.on_status = on_status or (lambda text: None)
+        self.on_state = on_state or (lambda state: None)
+        self.retry_interval = retry_interval
+        self.arm_lead = arm_lead
+        self.http_timeout = http_timeout
+        self.token = CancelToken()
+        self.state = IDLE
+        self.outcome: Optional[str] = None
+        self.attempts = 0
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="damai-backend")
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        if state not in TRANSITIONS[self.state]:
+            raise RuntimeError(f"非法的状态切换: {self.state} -> {state}")
+        logger.info(f"抢票状态: {self.state} -> {state}")
+        self.state = state
+        self.on_state(state)
+
+    def start(self):
+        """启动工作线程"""
+        self._thread = threading.Thread(target=self._run, name="damai-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止抢票，正在进行的等待和后端调用立即返回"""
+        self.token.cancel()
+
+    def join(self, timeout: Optional[float] = None):
+        """等待工作线程结束"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取工作线程状态
+
+        Returns:
+            Dict: 状态、结果和尝试次数
+        """
+        return {"state": self.state, "outcome": self.outcome, "attempts": self.attempts}
+
+    def _run(self):
+        api = None
+        try:
+            self._set_state(WAITING)
+            self.on_status('正在登录...')
+            api = self.token.call(self._executor, self.backend_factory)
+            session = getattr(api, "session", None)
+            if session is not None:
+                self.token.bind_session(session, self.http_timeout)
+
+            if not self.token.call(self._executor, api.login):
+                self.on_status('登录失败，请检查账号信息')
+                self.outcome = "login_failed"
+                return
+
+            self._wait_for_sale()
+            self._set_state(ATTEMPTING)
+            self._attempt_loop(api)
+
+        except Cancelled:
+            self.outcome = "cancelled"
+            self.on_status('抢票已停止')
+        except Exception as e:
+            self.outcome = "error"
+            logger.error(f"抢票线程出错: {str(e)}")
+            logger.debug(traceback.format_exc())
+            self.on_status(f'程序出错: {str(e)}')
+        finally:
+            self._executor.shutdown(wait=False)
+            if api is not None and hasattr(api, "close"):
+                threading.Thread(target=self._close_backend, args=(api,),
+                                 name="damai-backend-close", daemon=True).start()
+            self._set_state(DONE)
+
+    def _close_backend(self, api):
+        try:
+            api.close()
+        except Exception as e:
+            logger.warning(f"关闭抢票后端失败: {str(e)}")
+
+    def _wait_for_sale(self):
+        remaining = (self.start_time - datetime.now()).total_seconds()
+        if remaining <= 0:
+            self.on_status('开售时间已过! 将尝试直接抢票')
+            return
+        while remaining > self.arm_lead:
+            self.on_status(f'登录成功，等待开售, 距开始还有 {remaining:.0f} 秒')
+            self.token.sleep(min(1.0, remaining - self.arm_lead))
+            remaining = (self.start_time - datetime.now()).total_seconds()
+
+        self._set_state(ARMED)
+        self.on_status('准备抢票...')
+        self.token.sleep((self.start_time - datetime.now()).total_seconds())
+
+    def _attempt_loop(self, api):
+        while True:
+            self.attempts += 1
+            self.on_status(f'第 {self.attempts} 次尝试抢票...')
+            try:
+                result = self.token.call(self._executor, api.buy_ticket, self.show_id)
+            except Cancelled:
+                raise
+            except Exception as e:
+                logger.error(f"抢票出错: {str(e)}")
+                self.on_status(f'抢票出错: {str(e)}')
+                self.token.sleep(1.0)
+                continue
+
+            if result.get('success'):
+                self.outcome = "success"
+                self.on_status('抢票成功！请在30分钟内完成支付')
+                return
+            self.on_status(f'第 {self.attempts} 次尝试: {result.get("message")}')
+            self.token.sleep(self.retry_interval)
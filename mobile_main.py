@@ -4,31 +4,37 @@
 import os
 import sys
 import time
-import yaml # type: ignore
 import logging
 from datetime import datetime
 from typing import Dict, Any
-from damai.mobile_api import DamaiMobileAPI
+from damai.profiling import startup_profiler, live_profiler_from_config
+from damai.memprof import memory_profiler_from_config
+from damai.metrics import metrics_server_from_config
+from damai import budget
+
+# 启动分析（--profile-startup），需在导入其他依赖之前创建
+PROFILER = startup_profiler("mobile_main")
+
+with PROFILER.phase("import"):
+    from damai.config import load_config as load_config_file
+    from damai import log
+    from damai.ratecontrol import controller_from_config
+    from damai.mobile_api import DamaiMobileAPI
 
 def setup_logging(config: Dict[str, Any]) -> None:
     """设置日志配置"""
     log_config = config.get("logging", {})
     log_level = getattr(logging, log_config.get("level", "INFO"))
-    log_file = log_config.get("file", "mobile_damai.log")
-    
-    # 创建日志目录
-    log_dir = os.path.dirname(log_file)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
     
-    # 配置日志
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
+    # 异步写入按大小轮转的日志文件
+    log.setup_logging(
+        log_level,
+        log_file=log_config.get("file", "mobile_damai.log"),
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        max_bytes=log_config.get("max_bytes", 10 * 1024 * 1024),
+        backup_count=log_config.get("backup_count", 5),
+        queue_size=log_config.get("queue_size", 10000),
+        stream=sys.stdout
     )
 
 def load_config(config_file: str = "config_mobile.yaml") -> Dict[str, Any]:
@@ -38,8 +44,7 @@ def load_config(config_file: str = "config_mobile.yaml") -> Dict[str, Any]:
             print(f"配置文件 {config_file} 不存在，请创建配置文件")
             sys.exit(1)
             
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_config_file(config_file)
             
         # 验证必要的配置项
         if not config.get("account", {}).get("username") or not config.get("account", {}).get("password"):
@@ -100,10 +105,21 @@ def main():
     print("大麦移动端抢票程序启动...")
     
     # 加载配置
-    config = load_config()
+    with PROFILER.phase("config"):
+        config = load_config()
     
     # 设置日志
-    setup_logging(config)
+    with PROFILER.phase("logging"):
+        setup_logging(config)
+    
+    # 运行期采样分析（如果配置），可通过SIGUSR2或控制文件开关
+    live_profiler = live_profiler_from_config(config)
+    
+    # 内存分析（如果配置），可通过SIGUSR1或触发文件写出报告
+    memory_profiler = memory_profiler_from_config(config)
+    
+    # 本机指标接口（如果配置），供Prometheus抓取
+    metrics_server = metrics_server_from_config(config)
     logger = logging.getLogger("damai.mobile")
     
     try:
@@ -114,15 +130,19 @@ def main():
             return
         
         # 初始化API
-        api = DamaiMobileAPI(config)
+        with PROFILER.phase("driver"):
+            api = DamaiMobileAPI(config)
         logger.info("初始化移动端API成功")
         
         # 登录
-        if not api.login():
+        with PROFILER.phase("login"):
+            logged_in = api.login()
+        if not logged_in:
             logger.error("登录失败，程序退出")
             return
         
         logger.info("登录成功，开始抢票")
+        PROFILER.finish()
         
         # 获取目标信息
         target_url = config.get("target", {}).get("url", "")
@@ -144,16 +164,23 @@ def main():
         min_delay = retry_delay.get("min", 0.5)
         max_delay = retry_delay.get("max", 2.0)
         
+        # 自适应重试速率：正常响应时逐步提速到 min 间隔，出错或响应过慢时退避，最长退避到 max 间隔
+        rate = controller_from_config(config, min_delay, name="mobile", max_interval=max_delay)
+        
         # 开始抢票循环
         attempt_count = 0
         
         while max_attempts == 0 or attempt_count < max_attempts:
             attempt_count += 1
             logger.info(f"第 {attempt_count} 次尝试抢票")
+            rate.mark()
             
             try:
                 # 提交订单
+                start = time.perf_counter()
                 result = api.submit_order(target_url)
+                # 未开售、无票等业务失败属于正常响应，不退避；响应过慢由 slow_threshold 处理
+                rate.record(time.perf_counter() - start)
                 
                 if result.get("success"):
                     logger.info(f"抢票成功: {result.get('message', '请尽快支付')}")
@@ -161,18 +188,15 @@ def main():
                 else:
                     logger.warning(f"本次尝试失败: {result.get('message', '未知原因')}")
                     
-                # 动态调整等待时间
-                if attempt_count % 10 == 0:
-                    # 每10次尝试后稍微休息一下，避免请求频率过高
-                    logger.info("暂停一下，避免请求频率过高...")
-                    time.sleep(max_delay)
-                else:
-                    time.sleep(min_delay)
-                    
             except Exception as e:
                 logger.error(f"抢票过程发生错误: {str(e)}")
-                # 出错后等待更长时间
-                time.sleep(max_delay)
+                # 出错后退避
+                rate.record(ok=False)
+            
+            if attempt_count % 10 == 0:
+                stats = rate.stats()
+                logger.info(f"当前重试间隔 {stats['interval']:.2f}s, 实际速率 {stats['effective_rate']:.2f} 次/秒")
+            rate.wait()
         
         if max_attempts > 0 and attempt_count >= max_attempts:
             logger.warning(f"达到最大尝试次数 {max_attempts}，抢票结束")
@@ -181,6 +205,16 @@ def main():
         logger.error(f"程序运行时发生错误: {str(e)}")
     
     finally:
+        PROFILER.finish()
+        budget.log_stats()
+        if live_profiler:
+            live_profiler.stop()
+        if memory_profiler:
+            memory_profiler.write_report()
+            memory_profiler.stop()
+        if metrics_server:
+            metrics_server.shutdown()
+        
         # 清理资源
         try:
             if 'api' in locals():
@@ -0,0 +1,45 @@
+# 结构化事件日志测试
+
+import os
+import time
+
+from damai.events import EventLog, read_events
+
+
+def test_format_change_rotates_existing_file(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, "jsonl")
+    log.emit("search", keyword="周杰伦")
+    log.close()
+
+    log = EventLog(path, "binary")
+    log.emit("error", message="超时")
+    log.close()
+
+    rotated = [name for name in os.listdir(tmp_path) if name != "events.jsonl"]
+    assert len(rotated) == 1 and rotated[0].endswith(".jsonl")
+    assert [e["kind"] for e in read_events(str(tmp_path / rotated[0]))] == ["search"]
+    assert [e["kind"] for e in read_events(path)] == ["error"]
+
+
+def test_same_format_appends(tmp_path):
+    path = str(tmp_path / "events.bin")
+    for keyword in ("a", "b"):
+        log = EventLog(path, "binary")
+        log.emit("search", keyword=keyword)
+        log.close()
+    assert [e["keyword"] for e in read_events(path)] == ["a", "b"]
+    assert os.listdir(tmp_path) == ["events.bin"]
+
+
+def test_pending_events_are_flushed_periodically(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, "jsonl", flush_interval=0.05)
+    try:
+        log.emit("status_check", 0.1, show="演唱会")
+        deadline = time.monotonic() + 2
+        while not os.path.getsize(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [e["show"] for e in read_events(path)] == ["演唱会"]
+    finally:
+        log.close()
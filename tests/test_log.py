@@ -0,0 +1,38 @@
+# 异步日志测试
+
+import io
+import queue
+import logging
+import threading
+
+from damai import log
+
+
+def test_concurrent_drops_are_all_counted():
+    handler = log.DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("damai", logging.INFO, __file__, 0, "满", None, None)
+    handler.enqueue(record)
+
+    def drop():
+        for _ in range(5000):
+            handler.enqueue(record)
+
+    threads = [threading.Thread(target=drop) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handler.dropped == 40000
+
+
+def test_listener_reports_drops_while_running():
+    stream = io.StringIO()
+    log.setup_logging(log_file=None, stream=stream, drop_report_interval=0)
+    try:
+        log._queue_handler.dropped = 3
+        logging.getLogger("damai.test").info("继续运行")
+    finally:
+        log.shutdown_logging()
+    output = stream.getvalue()
+    assert "继续运行" in output
+    assert "新丢弃 3 条日志（累计 3 条）" in output
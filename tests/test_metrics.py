@@ -0,0 +1,17 @@
+# 运行指标测试
+
+import threading
+
+from damai.metrics import Counter
+
+
+def test_counts_from_finished_threads_are_kept_and_shards_released():
+    counter = Counter()
+    for _ in range(50):
+        thread = threading.Thread(target=counter.inc, args=(2,))
+        thread.start()
+        thread.join()
+    counter.inc()
+    assert counter.value == 101
+    # 只剩当前线程的分片
+    assert len(counter._shards._shards) == 1
@@ -0,0 +1,25 @@
+# 配置校验测试
+
+import pytest
+
+from damai.schema import ConfigError, validate_config
+
+CONFIG = {
+    "account": {"username": 13800138000, "password": 123456},
+    "target": {"keyword": "演唱会", "date_range": {"start": "2024-05-01", "end": "2024-06-01"}},
+    "buyer": [{"name": "张三", "id_card": 110101199001011234}],
+}
+
+
+def test_numeric_account_and_id_card_become_strings():
+    config = validate_config(CONFIG)
+    assert config["account"]["username"] == "13800138000"
+    assert config["account"]["password"] == "123456"
+    assert config["buyer"][0]["id_card"] == "110101199001011234"
+
+
+def test_bool_is_not_text():
+    config = dict(CONFIG, account={"username": True, "password": "x"})
+    with pytest.raises(ConfigError) as e:
+        validate_config(config)
+    assert e.value.errors == ["account.username: 应为字符串，实际为布尔值"]
@@ -0,0 +1,43 @@
+# 票档索引测试
+
+import sys
+import threading
+
+from damai.sku_index import SkuIndex, SkuPreference, normalize_web_price
+
+
+def test_web_price_restock_updates_entry_in_place():
+    index = SkuIndex(SkuPreference({}))
+    index.refresh([normalize_web_price({"text": "看台 380元 (缺货登记)", "value": "380"})])
+    assert len(index) == 1
+    assert index.best() is None
+
+    index.refresh([normalize_web_price({"text": "看台 380元", "value": "380"})])
+    assert len(index) == 1
+    assert index.best().text == "看台 380元"
+
+
+def test_best_is_consistent_while_preference_changes():
+    prices = [{"text": f"看台 {p}元", "value": str(p)} for p in range(100, 1100, 100)]
+    index = SkuIndex.from_web_prices(prices, SkuPreference({}))
+    preferences = [SkuPreference({"target": {"price_range": {"min": low}}}) for low in (100, 500)]
+    stop = threading.Event()
+
+    def reload():
+        i = 0
+        while not stop.is_set():
+            index.set_preference(preferences[i % 2])
+            i += 1
+
+    # 缩短线程切换间隔，让读写更容易交错
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread = threading.Thread(target=reload)
+    thread.start()
+    try:
+        for _ in range(20000):
+            assert index.best().price in (100.0, 500.0)
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(interval)
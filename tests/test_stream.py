@@ -0,0 +1,59 @@
+# 流式JSON解析回归测试
+
+import json
+
+import pytest
+
+from damai.stream import scan_detail
+
+BODY = json.dumps({
+    "x": 12.5,
+    "y": 3e10,
+    "z": -0.25e-3,
+    "tail": [1.5, 2e3],
+    "canBuy": True,
+    "skuList": [
+        {"skuId": 1, "price": 99.5, "inventory": 0},
+        {"skuId": 2, "price": 380.0, "inventory": 12},
+    ],
+}).encode("utf-8")
+
+
+def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.parametrize("size", [1, 3, 9, 19, len(BODY)])
+def test_numbers_split_at_chunk_boundary(size):
+    scan = scan_detail(_chunks(BODY, size), lambda sku: sku["inventory"] > 0)
+    assert scan.can_buy is True
+    assert scan.sku == {"skuId": 2, "price": 380.0, "inventory": 12}
+
+
+def test_whole_sku_list_one_byte_at_a_time():
+    scan = scan_detail(_chunks(BODY, 1), lambda sku: False)
+    assert scan.can_buy is True
+    assert scan.sku is None
+    assert scan.bytes_read == len(BODY)
+
+
+def test_ranked_scan_prefers_configured_priority():
+    from damai.sku_index import SkuPreference
+
+    preference = SkuPreference({
+        "target": {"price_range": {"min": 0, "max": 2000}, "sessions": ["周六"]},
+        "ticket_priority": [{"name": "内场", "priority": 1}, {"name": "看台", "priority": 2}],
+    })
+    body = json.dumps({
+        "canBuy": True,
+        "skuList": [
+            {"skuId": 1, "priceName": "看台", "sessionName": "周六", "price": 380, "inventory": 5},
+            {"skuId": 2, "priceName": "内场", "sessionName": "周五", "price": 1280, "inventory": 5},
+            {"skuId": 3, "priceName": "内场", "sessionName": "周六", "price": 1280, "inventory": 5},
+            {"skuId": 4, "priceName": "内场", "sessionName": "周六", "price": 1280, "inventory": 5},
+        ],
+    }).encode("utf-8")
+    scan = scan_detail(_chunks(body, 7), preference.accepts, preference.rank, preference.best_rank)
+    assert scan.sku["skuId"] == 3
+    assert not scan.complete
@@ -1,10 +1,10 @@
-import json
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from damai.config import load_config as load_config_file
 
 class TicketBot:
     def __init__(self):
@@ -13,8 +13,7 @@ class TicketBot:
 
     def load_config(self):
         try:
-            with open('config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config_file('config.json')
         except FileNotFoundError:
             print("配置文件不存在，请先创建config.json文件")
             return None
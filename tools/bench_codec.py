@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JSON编解码微基准测试
+使用模拟的多场次演出详情数据，对比各JSON后端的解码耗时
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from damai import codec
+
+
+def build_detail_payload(sessions: int = 20, prices: int = 8) -> bytes:
+    """构造接近真实演出详情接口的响应数据
+
+    Args:
+        sessions: 场次数量
+        prices: 每个场次的票档数量
+
+    Returns:
+        bytes: UTF-8编码的JSON字节串
+    """
+    rnd = random.Random(42)
+    sku_list = []
+    for s in range(sessions):
+        for p in range(prices):
+            sku_list.append({
+                "skuId": f"{700000000000 + s * 100 + p}",
+                "itemId": "721889827293",
+                "sessionId": f"{s + 1}",
+                "sessionName": f"2024-05-{10 + s % 20:02d} 周五 19:30",
+                "priceId": f"{p + 1}",
+                "priceName": f"看台{p + 1}区 {380 + p * 200}元",
+                "price": 380 + p * 200,
+                "inventory": rnd.choice([0, 0, 0, 1, 5, 20]),
+                "limitQuantity": 6,
+                "salableQuantity": rnd.randint(0, 6),
+                "tags": ["实名制", "不支持退票", "电子票"],
+            })
+    payload = {
+        "itemId": "721889827293",
+        "title": "某某某2024巡回演唱会—北京站",
+        "venue": "国家体育场（鸟巢）",
+        "canBuy": True,
+        "status": "立即购买",
+        "notice": "本项目为实名制购票，每个证件限购一张。" * 20,
+        "skuList": sku_list,
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def run(number: int, sessions: int, prices: int):
+    """运行基准测试并打印结果"""
+    data = build_detail_payload(sessions, prices)
+    print(f"负载大小: {len(data) / 1024:.1f} KiB, 场次 {sessions}, 票档 {sessions * prices}")
+
+    # requests.Response.json() 的路径: 先解码成文本再用标准库解析
+    baseline = timeit.timeit(lambda: json.loads(data.decode("utf-8")), number=number)
+    print(f"{'stdlib text (response.json)':<30} {baseline / number * 1e6:10.1f} us")
+
+    for name in codec.available_backends():
+        backend = codec.use_backend(name)
+        elapsed = timeit.timeit(lambda: backend.loads(data), number=number)
+        print(f"{name + ' bytes':<30} {elapsed / number * 1e6:10.1f} us  x{baseline / elapsed:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON编解码微基准测试")
+    parser.add_argument("-n", "--number", type=int, default=200, help="每个后端的重复次数")
+    parser.add_argument("--sessions", type=int, default=20, help="场次数量")
+    parser.add_argument("--prices", type=int, default=8, help="每场次票档数量")
+    args = parser.parse_args()
+    run(args.number, args.sessions, args.prices)
+
+
+if __name__ == "__main__":
+    main()
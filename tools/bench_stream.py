@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+流式解析基准测试
+对比完整解析与流式扫描在大型多场次详情数据上的决策耗时和峰值内存
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from damai import codec
+from damai.stream import scan_detail
+from bench_codec import build_detail_payload
+
+
+def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _full(data: bytes, chunk_size: int, accept):
+    body = b"".join(_chunks(data, chunk_size))
+    detail = codec.loads(body)
+    return next((sku for sku in detail.get("skuList", []) if accept(sku)), None)
+
+
+def _stream(data: bytes, chunk_size: int, accept):
+    return scan_detail(_chunks(data, chunk_size), accept).sku
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式解析基准测试")
+    parser.add_argument("--sessions", type=int, default=200, help="场次数量")
+    parser.add_argument("--prices", type=int, default=10, help="每场次票档数量")
+    parser.add_argument("--min-price", type=float, default=1500, help="最低可接受价格")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="响应块大小")
+    args = parser.parse_args()
+
+    data = build_detail_payload(args.sessions, args.prices)
+    accept = lambda sku: sku["inventory"] > 0 and sku["price"] >= args.min_price
+    print(f"负载大小: {len(data) / 1024:.1f} KiB, 票档 {args.sessions * args.prices}")
+
+    for name, func in (("完整解析", _full), ("流式扫描", _stream)):
+        sku, elapsed, peak = _measure(func, data, args.chunk_size, accept)
+        print(f"{name}: 耗时 {elapsed * 1000:8.2f} ms  峰值内存 {peak / 1024:8.1f} KiB  票档 {sku and sku['skuId']}")
+
+
+if __name__ == "__main__":
+    main()
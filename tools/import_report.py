@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+导入耗时报告
+在独立进程中以 -X importtime 导入各入口模块，输出总耗时和最慢的模块，
+用于发现启动时间回退（例如重新在模块顶层导入了selenium、Appium或Kivy）
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "damai",
+    "damai.api",
+    "damai.mobile_api",
+    "damai.app_api",
+    "damai.monitor",
+    "damai.order",
+    "damai_ticket.main",
+    "damai_ticket.backends",
+]
+
+# 这些依赖应当延迟导入，出现在导入链中说明有回退
+HEAVY_PACKAGES = ("selenium", "webdriver_manager", "appium", "kivy")
+
+
+def measure(module: str):
+    """导入模块并解析 -X importtime 输出
+
+    Args:
+        module: 模块名，为空时只启动解释器
+
+    Returns:
+        tuple: (是否成功, 错误信息, [(自身耗时us, 累计耗时us, 模块名), ...])
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    errors = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        rows.append((int(parts[0]), int(parts[1]), parts[2].rstrip()))
+    error = errors[-1] if proc.returncode != 0 and errors else ""
+    return proc.returncode == 0, error, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口模块导入耗时报告")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="要测量的模块")
+    parser.add_argument("-n", "--top", type=int, default=10, help="每个模块列出的最慢导入数量")
+    args = parser.parse_args()
+
+    # 解释器启动时就会导入的模块不计入报告
+    startup = {row[2].strip() for row in measure("")[2]}
+
+    for module in args.modules:
+        ok, error, rows = measure(module)
+        rows = [row for row in rows if row[2].strip() not in startup]
+        target = next((row for row in rows if row[2].strip() == module), None)
+        total = target[1] / 1000 if target else 0.0
+        print(f"== {module}: {total:.1f} ms{'' if ok else ' (导入失败: ' + error + ')'}")
+
+        heavy = sorted({row[2].strip().split(".")[0] for row in rows
+                        if row[2].strip().split(".")[0] in HEAVY_PACKAGES})
+        if heavy:
+            print(f"   警告: 导入时加载了 {', '.join(heavy)}")
+
+        for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[0], reverse=True)[:args.top]:
+            print(f"   {self_us / 1000:8.2f} ms  {cumulative_us / 1000:8.2f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+事件日志读取工具
+加载JSON Lines或二进制事件日志，按事件类型汇总次数和耗时
+"""
+
+import os
+import sys
+import math
+import argparse
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from damai.events import load_columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="事件日志汇总")
+    parser.add_argument("path", help="事件日志文件路径")
+    args = parser.parse_args()
+
+    columns = load_columns(args.path)
+    kinds = columns.get("kind", [])
+    durations = columns["duration"]
+    if not kinds:
+        print("没有事件")
+        return
+
+    counts = defaultdict(int)
+    timings = defaultdict(list)
+    for kind, duration in zip(kinds, durations):
+        counts[kind] += 1
+        if not math.isnan(duration):
+            timings[kind].append(duration)
+
+    span = columns["ts"][-1] - columns["ts"][0]
+    print(f"共 {len(kinds)} 个事件，时间跨度 {span:.1f} 秒")
+    print(f"{'类型':<14}{'次数':>8}{'平均耗时(ms)':>14}{'最大耗时(ms)':>14}")
+    for kind in sorted(counts):
+        values = timings[kind]
+        mean = sum(values) / len(values) * 1000 if values else float("nan")
+        peak = max(values) * 1000 if values else float("nan")
+        print(f"{kind:<14}{counts[kind]:>8}{mean:>14.1f}{peak:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()